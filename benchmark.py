@@ -0,0 +1,237 @@
+# cognitive_weave_poc/benchmark.py
+
+import argparse
+import random
+import resource
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from cognitive_weave import utils
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.ingestion import parse_conversation_log
+from cognitive_weave.offline_provider import OfflineProvider, offline_enrichment
+from cognitive_weave.providers import LLMProvider, RecordReplayProvider
+from main import ConversationalAgent, TURN_ORDERING_SEQUENTIAL
+
+DEFAULT_LOGS = ["conversation_legal.log", "conversation_medical.log"]
+SYNTHETIC_TIMESTAMP = "2025-01-01T00:00:00"
+STAGES = ["enrich", "store", "retrieve", "prompt_build", "respond", "synthesize"]
+
+
+class ScriptedProvider(OfflineProvider):
+    """
+    OfflineProvider that answers conversational prompts with the responses recorded in
+    the logs, optionally after a fixed delay standing in for model latency.
+    """
+    name = "scripted"
+
+    def __init__(self, responses: Dict[str, str], latency_seconds: float = 0.0):
+        super().__init__()
+        self.responses = responses
+        self.latency_seconds = latency_seconds
+
+    def complete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        recorded = self.responses.get(messages[-1]["content"]) if not json_mode else None
+        if recorded is not None:
+            return recorded
+        return super().complete(messages, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode, model=model)
+
+
+class StageTimer:
+    """
+    Wraps agent methods to record the exclusive wall time of each pipeline stage.
+
+    Time spent in a nested timed stage is charged to that stage only, so e.g.
+    `prompt_build` excludes the retrieval it triggers.
+    """
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._child_time: List[float] = []
+
+    def wrap(self, owner, method_name: str, stage: str):
+        method = getattr(owner, method_name)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            self._child_time.append(0.0)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                exclusive = elapsed - self._child_time.pop()
+                self.samples[stage].append(exclusive)
+                if self._child_time:
+                    self._child_time[-1] += elapsed
+
+        setattr(owner, method_name, timed)
+
+    def instrument(self, agent: ConversationalAgent):
+        self.wrap(agent.soi, "enrich_text_to_ip_attributes", "enrich")
+        self.wrap(agent, "_store_enriched_particle", "store")
+        self.wrap(agent, "retrieve_relevant_insights", "retrieve")
+        self.wrap(agent, "_build_response_messages", "prompt_build")
+        self.wrap(agent, "generate_response", "respond")
+        self.wrap(agent, "_attempt_ia_synthesis", "synthesize")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Count plus p50/p90/p99/max of a list of durations, in milliseconds."""
+    if not samples:
+        return {"n": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    values = np.asarray(samples) * 1000.0
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"n": len(samples), "p50": p50, "p90": p90, "p99": p99, "max": float(values.max())}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def memory_snapshot(agent: ConversationalAgent) -> Dict[str, float]:
+    aggregates = sum(1 for ip in agent.memory_store if ip.is_aggregate)
+    return {
+        "particles": len(agent.memory_store) - aggregates,
+        "aggregates": aggregates,
+        "embedding_mb": agent.embedding_store._vectors.nbytes / (1024 * 1024),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_agent(provider: LLMProvider, compact: bool, timer: StageTimer, defer_indexing: bool = False) -> ConversationalAgent:
+    # Sequential turns with inline synthesis keep the stage timings on the measuring thread
+    agent = ConversationalAgent(provider=provider, compact_memory=compact, defer_indexing=defer_indexing)
+    agent.turn_ordering = TURN_ORDERING_SEQUENTIAL
+    timer.instrument(agent)
+    return agent
+
+
+def replay_session(agent: ConversationalAgent, turns: List[Tuple[str, str]]) -> Dict:
+    """Drives the agent through one session and returns retrieval cost and memory growth."""
+    postings_touched = []
+    growth = []
+    for user_input, _ in turns:
+        postings_touched.append(agent.keyword_index.postings_touched(agent._preprocess_query_for_keywords(user_input)))
+        agent.chat_turn(user_input)
+        growth.append(len(agent.memory_store))
+    return {"postings_touched": postings_touched, "memory_growth": growth}
+
+
+def synthetic_particles(turns: List[Tuple[str, str]], count: int, seed: int = 0) -> List[InsightParticle]:
+    """
+    Scales the sessions up to `count` particles.
+
+    Each particle is a logged utterance enriched offline, with a few extra resonance keys
+    drawn from a Zipf-distributed vocabulary so posting lists get a realistic skew.
+    """
+    rng = random.Random(seed)
+    texts = [text for turn in turns for text in turn]
+    base_attributes = [offline_enrichment(text) for text in texts]
+    vocabulary = [f"topic{i}" for i in range(max(100, count // 20))]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    particles = []
+    for i in range(count):
+        attributes = base_attributes[i % len(texts)]
+        extra_keys = rng.choices(vocabulary, weights=weights, k=3)
+        particles.append(InsightParticle.model_construct(
+            particle_id=f"IP_synthetic_{i}",
+            core_data=texts[i % len(texts)],
+            resonance_keys=attributes["resonance_keys"] + extra_keys,
+            signifiers=attributes["signifiers"],
+            situational_imprint=f"{attributes['situational_imprint']} ({' '.join(extra_keys)})",
+            extracted_entities=attributes["extracted_entities"],
+            creation_timestamp=SYNTHETIC_TIMESTAMP,
+            modification_timestamp=None,
+            last_access_timestamp=None,
+            relational_strands=[],
+            access_frequency=0,
+            importance_score=0.0,
+            is_aggregate=False,
+            derived_from_ids=[],
+        ))
+    return particles
+
+
+def print_stage_table(title: str, timer: StageTimer):
+    print(f"\n{title}")
+    print(f"  {'stage':<14}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        stats = percentiles(timer.samples.get(stage, []))
+        print(f"  {stage:<14}{stats['n']:>6}{stats['p50']:>10.2f}{stats['p90']:>10.2f}{stats['p99']:>10.2f}{stats['max']:>10.2f}")
+
+
+def run_session_benchmark(sessions: Dict[str, List[Tuple[str, str]]], make_provider: Callable[[], LLMProvider],
+                          compact: bool):
+    for name, turns in sessions.items():
+        timer = StageTimer()
+        agent = build_agent(make_provider(), compact, timer)
+        result = replay_session(agent, turns)
+        print_stage_table(f"== Session {name}: {len(turns)} turns", timer)
+        print(f"  memory growth: {result['memory_growth']}")
+        print(f"  postings touched per retrieval: {result['postings_touched']}")
+        print(f"  memory: {memory_snapshot(agent)}")
+
+
+def run_scaling_benchmark(turns: List[Tuple[str, str]], make_provider: Callable[[], LLMProvider], scales: List[int],
+                          compact: bool):
+    for scale in scales:
+        timer = StageTimer()
+        agent = build_agent(make_provider(), compact, timer, defer_indexing=True)
+        # The synthetic particles copy the logged utterances; with deduplication every replayed
+        # turn would merge into one of them and the enrich/store path would go unmeasured
+        agent.deduplicator = None
+        particles = synthetic_particles(turns, scale)
+        started = time.perf_counter()
+        agent.memory_store.extend(particles)
+        agent.build_indexes()
+        index_seconds = time.perf_counter() - started
+        del particles
+
+        result = replay_session(agent, turns)
+        print_stage_table(f"== Scale {scale} particles (index build {index_seconds:.1f}s)", timer)
+        touched = result["postings_touched"]
+        print(f"  postings touched per retrieval: mean {np.mean(touched):.0f}, max {max(touched)}")
+        print(f"  consolidation clusters: {agent.consolidation.cluster_count}")
+        print(f"  memory: {memory_snapshot(agent)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the shipped conversation logs through ConversationalAgent")
+    parser.add_argument("logs", nargs="*", default=DEFAULT_LOGS, help="conversation logs to replay")
+    parser.add_argument("--scales", default="10000,100000",
+                        help="comma-separated synthetic memory sizes (e.g. 10000,100000,1000000); empty to skip")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency of each LLM call")
+    parser.add_argument("--recording", metavar="PATH",
+                        help="replay the sessions' LLM responses from a recording made with main.py --recording")
+    parser.add_argument("--compact", action="store_true", help="use the columnar memory store")
+    args = parser.parse_args()
+
+    sessions = {path: parse_conversation_log(path) for path in args.logs}
+    all_turns = [turn for turns in sessions.values() for turn in turns]
+    responses = {user_input: response for user_input, response in all_turns}
+
+    def make_scripted_provider() -> LLMProvider:
+        return ScriptedProvider(responses, latency_seconds=args.latency_ms / 1000.0)
+
+    def make_session_provider() -> LLMProvider:
+        # A recording only covers the prompts of the recorded sessions, not the scaled-up memories
+        if args.recording:
+            return RecordReplayProvider(args.recording, mode="replay")
+        return make_scripted_provider()
+
+    utils.set_log_level("ERROR")
+    run_session_benchmark(sessions, make_session_provider, args.compact)
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    if scales:
+        run_scaling_benchmark(all_turns, make_scripted_provider, scales, args.compact)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# cognitive_weave_poc/cognitive_weave/async_semantic_oracle.py
+
+import asyncio
+from typing import TYPE_CHECKING, List, Dict, Optional
+
+from .telemetry import METRICS, traced
+from .utils import log_info, log_error
+from .data_structures import InsightAggregateAttributes
+from .semantic_oracle import (
+    ENRICHMENT_TEMPERATURE, ENRICHMENT_MAX_TOKENS, SYNTHESIS_TEMPERATURE, SYNTHESIS_MAX_TOKENS,
+    BATCH_ENRICHMENT_TOKEN_BUDGET, BATCH_ENRICHMENT_OUTPUT_TOKENS_PER_ITEM, BATCH_ENRICHMENT_MAX_OUTPUT_TOKENS,
+    build_enrichment_messages, parse_enrichment_response,
+    build_batch_enrichment_messages, parse_batch_enrichment_response, plan_enrichment_batches,
+    build_synthesis_messages, parse_synthesis_response,
+    OracleCacheMixin,
+)
+from .oracle_cache import OracleCache
+from .providers import LLMProvider, OpenAICompatibleProvider
+from .resilience import ResilientProvider
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+
+
+class AsyncSemanticOracleInterface(OracleCacheMixin):
+    """
+    asyncio variant of the SemanticOracleInterface.
+
+    Uses the same prompts and validation as the blocking SOI, but issues requests through
+    the provider's async methods (by default an AsyncAzureOpenAI client on the shared
+    connection pool). A semaphore caps the number
+    of in-flight LLM requests, so many turns or ingestion jobs can overlap their
+    round-trips without flooding the deployment. An OracleCache can be shared with
+    sync SOI instances.
+    """
+    def __init__(self, client: Optional["AsyncAzureOpenAI"] = None, max_concurrency: int = 8,
+                 cache: Optional[OracleCache] = None, provider: Optional[LLMProvider] = None):
+        self.provider: LLMProvider = provider if provider is not None else ResilientProvider(OpenAICompatibleProvider(async_client=client))
+        self.cache: Optional[OracleCache] = cache
+        self.model_deployment: str = self.provider.chat_model
+        self.embedding_deployment: str = self.provider.embedding_model
+        self.max_concurrency = max_concurrency
+        self.limiter = asyncio.Semaphore(max_concurrency)
+
+    async def _json_completion(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        async with self.limiter:
+            return await self.provider.acomplete(messages, temperature=temperature, max_tokens=max_tokens,
+                                                 json_mode=True, model=self.model_deployment)
+
+    @traced("soi.enrich")
+    async def enrich_text_to_ip_attributes(self, raw_text: str) -> Optional[Dict]:
+        """
+        Async counterpart of SemanticOracleInterface.enrich_text_to_ip_attributes.
+
+        Returns:
+            A dictionary containing the structured attributes for the IP,
+            or None if an error occurs.
+        """
+        log_info(f"SOI(async): Enriching text to IP attributes. Input text length: {len(raw_text)} chars.")
+
+        cached_attributes = self._cached_enrichment(raw_text)
+        if cached_attributes is not None:
+            log_info("SOI(async): IP attributes served from cache.")
+            return cached_attributes
+
+        try:
+            enriched_attributes_json_str = await self._json_completion(
+                build_enrichment_messages(raw_text), ENRICHMENT_TEMPERATURE, ENRICHMENT_MAX_TOKENS
+            )
+            log_info("SOI(async): Successfully received IP attributes from LLM.")
+            enriched_attributes = parse_enrichment_response(enriched_attributes_json_str)
+            self._store_enrichment(raw_text, enriched_attributes)
+            return enriched_attributes
+        except Exception as e:
+            log_error(f"SOI(async): An error occurred during API call for IP enrichment: {e}")
+            return None
+
+    async def enrich_texts_concurrently(self, raw_texts: List[str]) -> List[Optional[Dict]]:
+        """Enriches several texts at once; results keep the input order."""
+        return list(await asyncio.gather(*(self.enrich_text_to_ip_attributes(text) for text in raw_texts)))
+
+    @traced("soi.enrich_batch")
+    async def _enrich_batch(self, raw_texts: List[str]) -> List[Optional[Dict]]:
+        """Sends one packed enrichment request, falling back to individual calls for failed items."""
+        if len(raw_texts) == 1:
+            return [await self.enrich_text_to_ip_attributes(raw_texts[0])]
+
+        log_info(f"SOI(async): Enriching batch of {len(raw_texts)} texts in a single request.")
+        try:
+            batch_json_str = await self._json_completion(
+                build_batch_enrichment_messages(raw_texts), ENRICHMENT_TEMPERATURE,
+                min(BATCH_ENRICHMENT_MAX_OUTPUT_TOKENS, BATCH_ENRICHMENT_OUTPUT_TOKENS_PER_ITEM * len(raw_texts))
+            )
+            results = parse_batch_enrichment_response(batch_json_str, len(raw_texts))
+            for raw_text, attributes in zip(raw_texts, results):
+                self._store_enrichment(raw_text, attributes)
+        except Exception as e:
+            log_error(f"SOI(async): An error occurred during API call for batched IP enrichment: {e}")
+            results = [None] * len(raw_texts)
+
+        failed = [position for position, attributes in enumerate(results) if attributes is None]
+        if failed:
+            log_info(f"SOI(async): Falling back to individual enrichment calls for {len(failed)} text(s).")
+            METRICS.inc("cognitive_weave_soi_retries_total", len(failed), kind="enrich")
+            retried = await asyncio.gather(*(self.enrich_text_to_ip_attributes(raw_texts[position]) for position in failed))
+            for position, attributes in zip(failed, retried):
+                results[position] = attributes
+        return results
+
+    async def enrich_texts_to_ip_attributes(self, raw_texts: List[str],
+                                            token_budget: int = BATCH_ENRICHMENT_TOKEN_BUDGET) -> List[Optional[Dict]]:
+        """
+        Async counterpart of SemanticOracleInterface.enrich_texts_to_ip_attributes.
+        Token-budgeted batches are sent concurrently; results keep the input order.
+        """
+        results: List[Optional[Dict]] = [None] * len(raw_texts)
+        pending: List[int] = []
+        for position, raw_text in enumerate(raw_texts):
+            results[position] = self._cached_enrichment(raw_text)
+            if results[position] is None:
+                pending.append(position)
+        if len(pending) < len(raw_texts):
+            log_info(f"SOI(async): {len(raw_texts) - len(pending)} of {len(raw_texts)} texts served from cache.")
+
+        batches = [[pending[idx] for idx in batch]
+                   for batch in plan_enrichment_batches([raw_texts[position] for position in pending], token_budget)]
+        batch_results = await asyncio.gather(*(self._enrich_batch([raw_texts[p] for p in batch]) for batch in batches))
+        for batch, attributes_list in zip(batches, batch_results):
+            for position, attributes in zip(batch, attributes_list):
+                results[position] = attributes
+        return results
+
+    @traced("soi.synthesize")
+    async def synthesize_ia_from_imprints(self, ip_imprints: List[str]) -> Optional[InsightAggregateAttributes]:
+        """
+        Async counterpart of SemanticOracleInterface.synthesize_ia_from_imprints.
+
+        Returns:
+            An InsightAggregateAttributes object, or None if an error occurs.
+        """
+        if not ip_imprints:
+            log_error("SOI(async): No IP imprints provided for IA synthesis.")
+            return None
+
+        log_info(f"SOI(async): Synthesizing IA from {len(ip_imprints)} IP imprints.")
+
+        cached_ia = self._cached_synthesis(ip_imprints)
+        if cached_ia is not None:
+            log_info("SOI(async): IA attributes served from cache.")
+            return cached_ia
+
+        try:
+            synthesized_ia_json_str = await self._json_completion(
+                build_synthesis_messages(ip_imprints), SYNTHESIS_TEMPERATURE, SYNTHESIS_MAX_TOKENS
+            )
+            log_info("SOI(async): Successfully received IA attributes from LLM.")
+            ia_attributes = parse_synthesis_response(synthesized_ia_json_str)
+            if ia_attributes is not None:
+                self._store_synthesis(ip_imprints, synthesized_ia_json_str)
+            return ia_attributes
+        except Exception as e:
+            log_error(f"SOI(async): An error occurred during API call for IA synthesis: {e}")
+            return None
+
+    @traced("soi.embed")
+    async def embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Async counterpart of SemanticOracleInterface.embed_texts."""
+        if not texts:
+            return []
+
+        log_info(f"SOI(async): Embedding {len(texts)} text(s).")
+        try:
+            async with self.limiter:
+                return await self.provider.aembed(texts, model=self.embedding_deployment)
+        except Exception as e:
+            log_error(f"SOI(async): An error occurred during API call for embeddings: {e}")
+            return None
@@ -0,0 +1,364 @@
+# cognitive_weave_poc/cognitive_weave/columnar_store.py
+
+import re
+import uuid
+import weakref
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .data_structures import InsightParticle
+from .utils import log_info
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_TIME = -(2 ** 63)  # Sentinel for a None timestamp
+_PARTICLE_ID_RE = re.compile(r'^IP_([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$')
+
+TERM_LIST_FIELDS = ("resonance_keys", "signifiers", "extracted_entities")
+TIMESTAMP_FIELDS = ("creation_timestamp", "modification_timestamp", "last_access_timestamp")
+
+
+class StringTable:
+    """Interns strings to dense integer IDs so each distinct string is stored once."""
+    def __init__(self):
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def intern(self, string: str) -> int:
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._ids[string] = string_id
+        return string_id
+
+
+class ListColumn:
+    """
+    Variable-length lists of interned IDs for every row, kept in one flat array.
+
+    Each row points at a (start, length) slice. A row that is rewritten with a longer
+    list gets a new slice at the end; the old one is simply abandoned.
+    """
+    def __init__(self):
+        self.values = array('I')
+        self.starts = array('I')
+        self.lengths = array('H')
+
+    def append(self, ids: List[int]):
+        self.starts.append(len(self.values))
+        self.lengths.append(len(ids))
+        self.values.extend(ids)
+
+    def set(self, row: int, ids: List[int]):
+        if len(ids) > self.lengths[row]:
+            self.starts[row] = len(self.values)
+            self.values.extend(ids)
+        else:
+            start = self.starts[row]
+            self.values[start:start + len(ids)] = array('I', ids)
+        self.lengths[row] = len(ids)
+
+    def get(self, row: int) -> array:
+        start = self.starts[row]
+        return self.values[start:start + self.lengths[row]]
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.values, self.starts, self.lengths))
+
+
+def _encode_timestamp(value: Optional[str]) -> Optional[int]:
+    """ISO timestamp -> epoch microseconds; None if the value does not round-trip."""
+    if value is None:
+        return _NO_TIME
+    try:
+        encoded = (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+    except (TypeError, ValueError):
+        return None
+    return encoded if _decode_timestamp(encoded) == value else None
+
+
+def _decode_timestamp(value: int) -> Optional[str]:
+    if value == _NO_TIME:
+        return None
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+class ColumnarMemoryStore:
+    """
+    Compact, column-oriented in-memory store for InsightParticles, usable as
+    `ConversationalAgent.memory_store`.
+
+    Instead of one pydantic model per particle, every field lives in a column:
+    particle IDs as 16-byte UUIDs, keys/signifiers/entities as interned string IDs in
+    flat arrays, provenance and strand targets as integer row IDs, timestamps as
+    epoch-microsecond ints, and statistics in int/float arrays.
+
+    Particles are handed out as InsightParticle views built on demand and shared
+    through an identity map while referenced; mutated views are written back with
+    `update`, as with PersistentMemoryStore. Values that do not fit a column (custom
+    IDs, non-ISO timestamps, strands with extra keys) are kept verbatim on the side.
+    """
+    def __init__(self):
+        self.terms = StringTable()
+        self.references = StringTable()  # Referenced particle IDs that are not rows of this store
+
+        self._uuid_bytes = bytearray()
+        self._row_of_uuid: Dict[int, int] = {}
+        self._row_of_custom_id: Dict[str, int] = {}
+        self._is_aggregate = bytearray()
+        self._live = bytearray()
+        self._access_frequency = array('q')
+        self._importance_score = array('d')
+        self._timestamps = {name: array('q') for name in TIMESTAMP_FIELDS}
+        self._term_lists = {name: ListColumn() for name in TERM_LIST_FIELDS}
+        self._derived_from = ListColumn()
+        self._strands = ListColumn()  # Flattened (type term ID, target reference ID) pairs
+        self._situational_imprints: List[Optional[str]] = []
+        self._core_data: List[Any] = []
+        self._overflow: Dict[Tuple[int, str], Any] = {}
+
+        self._count = 0
+        # Live row IDs in insertion order; None while no row has been removed (position == row)
+        self._rows: Optional[array] = None
+        self._identity: "weakref.WeakValueDictionary[int, InsightParticle]" = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    @property
+    def row_count(self) -> int:
+        """Rows ever allocated, including removed ones."""
+        return len(self._live)
+
+    # --- Encoding ---
+
+    def _encode_strands(self, row: int, strands: List[Dict[str, str]]) -> List[int]:
+        if any(set(strand) != {"type", "target_id"} for strand in strands):
+            self._overflow[(row, "relational_strands")] = [dict(strand) for strand in strands]
+            return []
+        self._overflow.pop((row, "relational_strands"), None)
+        encoded = []
+        for strand in strands:
+            encoded.append(self.terms.intern(strand["type"]))
+            encoded.append(self._encode_reference(strand["target_id"]))
+        return encoded
+
+    def _encode_timestamp_column(self, row: int, name: str, value: Optional[str]) -> int:
+        encoded = _encode_timestamp(value)
+        if encoded is None:
+            self._overflow[(row, name)] = value
+            return _NO_TIME
+        self._overflow.pop((row, name), None)
+        return encoded
+
+    def _encode_term_list(self, row: int, name: str, values: Optional[List[str]]) -> List[int]:
+        if values is None:
+            self._overflow[(row, name)] = None
+            return []
+        self._overflow.pop((row, name), None)
+        return [self.terms.intern(value) for value in values]
+
+    def _register_id(self, row: int, particle_id: str) -> bytes:
+        match = _PARTICLE_ID_RE.match(particle_id)
+        if match:
+            uuid_value = uuid.UUID(match.group(1))
+            self._row_of_uuid[uuid_value.int] = row
+            return uuid_value.bytes
+        self._row_of_custom_id[particle_id] = row
+        self._overflow[(row, "particle_id")] = particle_id
+        return bytes(16)
+
+    def _row_of(self, particle_id: str) -> Optional[int]:
+        match = _PARTICLE_ID_RE.match(particle_id)
+        if match:
+            return self._row_of_uuid.get(uuid.UUID(match.group(1)).int)
+        return self._row_of_custom_id.get(particle_id)
+
+    def _encode_reference(self, particle_id: str) -> int:
+        """A referenced particle ID as an even row ID when it is stored here, else an odd table ID."""
+        row = self._row_of(particle_id)
+        if row is not None:
+            return row << 1
+        return (self.references.intern(particle_id) << 1) | 1
+
+    def _decode_reference(self, value: int) -> str:
+        if value & 1:
+            return self.references[value >> 1]
+        return self._particle_id(value >> 1)
+
+    def _particle_id(self, row: int) -> str:
+        custom_id = self._overflow.get((row, "particle_id"))
+        if custom_id is not None:
+            return custom_id
+        return f"IP_{uuid.UUID(bytes=bytes(self._uuid_bytes[16 * row:16 * row + 16]))}"
+
+    # --- Views ---
+
+    def _materialize(self, row: int) -> InsightParticle:
+        ip = self._identity.get(row)
+        if ip is not None:
+            return ip
+
+        overflow = self._overflow
+        fields: Dict[str, Any] = {
+            "particle_id": self._particle_id(row),
+            "core_data": self._core_data[row],
+            "situational_imprint": self._situational_imprints[row],
+            "access_frequency": self._access_frequency[row],
+            "importance_score": self._importance_score[row],
+            "is_aggregate": bool(self._is_aggregate[row]),
+            "derived_from_ids": [self._decode_reference(i) for i in self._derived_from.get(row)],
+        }
+        for name, column in self._term_lists.items():
+            key = (row, name)
+            fields[name] = overflow[key] if key in overflow else [self.terms[i] for i in column.get(row)]
+        for name, column in self._timestamps.items():
+            key = (row, name)
+            fields[name] = overflow[key] if key in overflow else _decode_timestamp(column[row])
+        key = (row, "relational_strands")
+        if key in overflow:
+            fields["relational_strands"] = [dict(strand) for strand in overflow[key]]
+        else:
+            pairs = self._strands.get(row)
+            fields["relational_strands"] = [{"type": self.terms[pairs[i]], "target_id": self._decode_reference(pairs[i + 1])}
+                                            for i in range(0, len(pairs), 2)]
+
+        ip = InsightParticle.model_construct(**fields)
+        self._identity[row] = ip
+        return ip
+
+    def _row_at(self, position: int) -> int:
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("memory store index out of range")
+        return self._rows[position] if self._rows is not None else position
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        return self._materialize(self._row_at(position))
+
+    def __iter__(self) -> Iterator[InsightParticle]:
+        rows = self._rows if self._rows is not None else range(len(self._live))
+        for row in rows:
+            yield self._materialize(row)
+
+    def get(self, particle_id: str) -> Optional[InsightParticle]:
+        row = self._row_of(particle_id)
+        return self._materialize(row) if row is not None else None
+
+    def last(self, is_aggregate: Optional[bool] = None) -> Optional[InsightParticle]:
+        """Most recently appended particle, optionally restricted to IPs or IAs."""
+        for position in range(self._count - 1, -1, -1):
+            row = self._row_at(position)
+            if is_aggregate is None or bool(self._is_aggregate[row]) == is_aggregate:
+                return self._materialize(row)
+        return None
+
+    # --- Mutation ---
+
+    def append(self, ip: InsightParticle):
+        if self._row_of(ip.particle_id) is not None:
+            raise ValueError(f"{ip.particle_id} is already in the memory store")
+        row = len(self._live)
+        self._uuid_bytes += self._register_id(row, ip.particle_id)
+        self._live.append(1)
+        self._is_aggregate.append(int(ip.is_aggregate))
+        self._access_frequency.append(ip.access_frequency)
+        self._importance_score.append(ip.importance_score)
+        for name, column in self._timestamps.items():
+            column.append(self._encode_timestamp_column(row, name, getattr(ip, name)))
+        for name, column in self._term_lists.items():
+            column.append(self._encode_term_list(row, name, getattr(ip, name)))
+        self._derived_from.append([self._encode_reference(pid) for pid in ip.derived_from_ids])
+        self._strands.append(self._encode_strands(row, ip.relational_strands))
+        self._situational_imprints.append(ip.situational_imprint)
+        self._core_data.append(ip.core_data)
+
+        if self._rows is not None:
+            self._rows.append(row)
+        self._count += 1
+        # The caller's instance becomes the shared view until it is dropped
+        self._identity[row] = ip
+
+    def extend(self, ips):
+        for ip in ips:
+            self.append(ip)
+
+    def update(self, ip: InsightParticle):
+        """Writes in-place changes of a particle view back into the columns."""
+        row = self._row_of(ip.particle_id)
+        if row is None:
+            raise KeyError(ip.particle_id)
+        self._is_aggregate[row] = int(ip.is_aggregate)
+        self._access_frequency[row] = ip.access_frequency
+        self._importance_score[row] = ip.importance_score
+        for name, column in self._timestamps.items():
+            column[row] = self._encode_timestamp_column(row, name, getattr(ip, name))
+        for name, column in self._term_lists.items():
+            column.set(row, self._encode_term_list(row, name, getattr(ip, name)))
+        self._derived_from.set(row, [self._encode_reference(pid) for pid in ip.derived_from_ids])
+        self._strands.set(row, self._encode_strands(row, ip.relational_strands))
+        self._situational_imprints[row] = ip.situational_imprint
+        self._core_data[row] = ip.core_data
+
+    def remove(self, particle_id: str):
+        self.remove_many([particle_id])
+
+    def remove_many(self, particle_ids: Iterable[str]):
+        """Removes several particles, rebuilding the live-row order once; raises ValueError for unknown IDs."""
+        rows = []
+        for particle_id in particle_ids:
+            row = self._row_of(particle_id)
+            if row is None:
+                raise ValueError(f"{particle_id} not in memory store")
+            self._drop_row(row, particle_id)
+            rows.append(row)
+        if not rows:
+            return
+        removed = set(rows)
+        live_rows = self._rows if self._rows is not None else range(len(self._live))
+        self._rows = array('q', (row for row in live_rows if row not in removed))
+
+    def _drop_row(self, row: int, particle_id: str):
+        match = _PARTICLE_ID_RE.match(particle_id)
+        if match:
+            del self._row_of_uuid[uuid.UUID(match.group(1)).int]
+        else:
+            del self._row_of_custom_id[particle_id]
+        self._live[row] = 0
+        self._core_data[row] = None
+        self._situational_imprints[row] = None
+        for key in [key for key in self._overflow if key[0] == row and key[1] != "particle_id"]:
+            del self._overflow[key]
+        self._identity.pop(row, None)
+        self._count -= 1
+
+    # --- Introspection ---
+
+    def column_nbytes(self) -> int:
+        """Approximate size of the fixed-width columns and string tables (content excluded)."""
+        fixed = (len(self._uuid_bytes) + len(self._is_aggregate) + len(self._live)
+                 + self._access_frequency.itemsize * len(self._access_frequency)
+                 + self._importance_score.itemsize * len(self._importance_score)
+                 + sum(column.itemsize * len(column) for column in self._timestamps.values()))
+        lists = sum(column.nbytes() for column in self._term_lists.values())
+        lists += self._derived_from.nbytes() + self._strands.nbytes()
+        strings = sum(len(s.encode("utf-8")) for table in (self.terms, self.references) for s in table._strings)
+        return fixed + lists + strings
+
+    def log_stats(self):
+        log_info(f"ColumnarMemoryStore: {self._count} particles, {len(self.terms)} distinct terms, "
+                 f"{len(self.references)} referenced IDs, ~{self.column_nbytes() / 1024:.1f} KiB of columns.")
@@ -0,0 +1,204 @@
+# cognitive_weave_poc/cognitive_weave/consolidation.py
+
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .data_structures import InsightParticle
+
+# How much a shared term of each field counts towards joining a cluster
+FIELD_LINK_WEIGHTS: Dict[str, int] = {
+    "resonance_keys": 2,
+    "extracted_entities": 2,
+    "signifiers": 1,
+}
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+class SynthesisJob(NamedTuple):
+    """One planned IA synthesis (or refresh) call for a single cluster."""
+    cluster_id: int
+    member_ids: Tuple[str, ...]  # IPs whose imprints are in this call
+    imprints: Tuple[str, ...]  # For a refresh, the current IA summary first, then the member imprints
+    aggregate_id: Optional[str]  # Existing IA to refresh, or None to create one
+
+
+class ParticleCluster:
+    """A group of IPs that share resonance keys, signifiers or entities."""
+    __slots__ = ("cluster_id", "member_ids", "pending_ids", "aggregate_id", "summary")
+
+    def __init__(self, cluster_id: int):
+        self.cluster_id = cluster_id
+        self.member_ids: List[str] = []
+        # Members with an imprint that the cluster's IA does not summarize yet, oldest first
+        self.pending_ids: List[str] = []
+        self.aggregate_id: Optional[str] = None
+        self.summary: Optional[str] = None  # core_data of the cluster's IA
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending_ids)
+
+
+class ConsolidationEngine:
+    """
+    Incremental, cluster-scoped planner for Insight Aggregate synthesis.
+
+    Each new IP joins the existing cluster it shares the most weighted terms with (or
+    starts a new one), found through a term -> clusters inverted index, so assignment
+    never scans memory. Joining takes at least `min_shared_terms` distinct shared terms
+    worth `link_threshold` in field weights, so a single common key cannot chain
+    loosely related IPs into one ever-growing cluster. Clusters track the members their IA does not summarize yet;
+    only clusters with such pending members are planned, each capped to
+    `max_imprints_per_call` imprints (oldest pending first), which keeps every synthesis
+    prompt bounded no matter how long the session runs. A refresh feeds the current IA
+    summary back in alongside the new imprints, so the refreshed IA still covers every
+    IP it was derived from; pending members beyond the cap wait for the next run.
+    Aggregates are never clustered themselves.
+    """
+    def __init__(self, max_imprints_per_call: int = 12, min_cluster_size: int = 2,
+                 link_threshold: int = 3, min_shared_terms: int = 2, max_jobs_per_run: int = 4):
+        self.max_imprints_per_call = max_imprints_per_call
+        self.min_cluster_size = min_cluster_size
+        self.link_threshold = link_threshold
+        self.min_shared_terms = min_shared_terms
+        self.max_jobs_per_run = max_jobs_per_run
+
+        self._clusters: List[ParticleCluster] = []
+        # term -> {cluster ID: members carrying the term}, pruned as members are removed
+        self._term_clusters: Dict[str, Dict[int, int]] = {}
+        self._terms_of: Dict[str, Tuple[str, ...]] = {}
+        self._cluster_of: Dict[str, int] = {}
+        self._imprints: Dict[str, str] = {}
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._clusters)
+
+    def cluster_of(self, particle_id: str) -> Optional[int]:
+        return self._cluster_of.get(particle_id)
+
+    def members(self, cluster_id: int) -> List[str]:
+        return list(self._clusters[cluster_id].member_ids)
+
+    def dirty_clusters(self) -> List[int]:
+        return [cluster.cluster_id for cluster in self._clusters if cluster.dirty]
+
+    @staticmethod
+    def weighted_terms(ip: InsightParticle) -> Dict[str, int]:
+        """Normalized linking terms of a particle with their field weights."""
+        terms: Dict[str, int] = {}
+        for field, weight in FIELD_LINK_WEIGHTS.items():
+            for term in getattr(ip, field) or []:
+                normalized = _normalize_term(term)
+                if normalized:
+                    terms[normalized] = max(terms.get(normalized, 0), weight)
+        return terms
+
+    def _best_cluster(self, terms: Dict[str, int]) -> Optional[int]:
+        scores: Counter = Counter()
+        shared: Counter = Counter()
+        for term, weight in terms.items():
+            for cluster_id in self._term_clusters.get(term, ()):
+                scores[cluster_id] += weight
+                shared[cluster_id] += 1
+        eligible = [(score, cluster_id) for cluster_id, score in scores.items()
+                    if score >= self.link_threshold and shared[cluster_id] >= self.min_shared_terms]
+        # Highest score wins; ties go to the most recently created cluster
+        return max(eligible)[1] if eligible else None
+
+    def add_particle(self, ip: InsightParticle) -> Optional[int]:
+        """Assigns an IP to a cluster and marks that cluster dirty. Returns the cluster ID."""
+        if ip.is_aggregate:
+            return None
+        if ip.particle_id in self._cluster_of:
+            return self._cluster_of[ip.particle_id]
+
+        terms = self.weighted_terms(ip)
+        cluster_id = self._best_cluster(terms)
+        if cluster_id is None:
+            cluster_id = len(self._clusters)
+            self._clusters.append(ParticleCluster(cluster_id))
+        cluster = self._clusters[cluster_id]
+
+        cluster.member_ids.append(ip.particle_id)
+        for term in terms:
+            counts = self._term_clusters.setdefault(term, {})
+            counts[cluster_id] = counts.get(cluster_id, 0) + 1
+        self._terms_of[ip.particle_id] = tuple(terms)
+        self._cluster_of[ip.particle_id] = cluster_id
+        if ip.situational_imprint:
+            self._imprints[ip.particle_id] = ip.situational_imprint
+            cluster.pending_ids.append(ip.particle_id)
+        return cluster_id
+
+    def remove_particle(self, particle_id: str):
+        """
+        Forgets a collected IP. Its cluster is not marked dirty: the IP was already
+        summarized by the cluster's IA. Terms no other member of the cluster carries
+        stop linking new IPs to it.
+        """
+        cluster_id = self._cluster_of.pop(particle_id, None)
+        self._imprints.pop(particle_id, None)
+        if cluster_id is None:
+            return
+        for term in self._terms_of.pop(particle_id, ()):
+            counts = self._term_clusters[term]
+            counts[cluster_id] -= 1
+            if not counts[cluster_id]:
+                del counts[cluster_id]
+                if not counts:
+                    del self._term_clusters[term]
+        cluster = self._clusters[cluster_id]
+        cluster.member_ids.remove(particle_id)
+        if particle_id in cluster.pending_ids:
+            cluster.pending_ids.remove(particle_id)
+
+    def register_aggregate(self, ia: InsightParticle):
+        """
+        Re-attaches an existing IA (e.g. after a warm start) to the cluster of its sources.
+        Members that the IA was not derived from stay pending.
+        """
+        cluster_ids = Counter(self._cluster_of[pid] for pid in ia.derived_from_ids if pid in self._cluster_of)
+        if not cluster_ids:
+            return
+        cluster_id = cluster_ids.most_common(1)[0][0]
+        self._attach(self._clusters[cluster_id], ia, ia.derived_from_ids)
+
+    @staticmethod
+    def _attach(cluster: ParticleCluster, ia: InsightParticle, summarized_ids):
+        summarized = set(summarized_ids)
+        cluster.aggregate_id = ia.particle_id
+        cluster.summary = str(ia.core_data)
+        cluster.pending_ids = [pid for pid in cluster.pending_ids if pid not in summarized]
+
+    def plan(self) -> List[SynthesisJob]:
+        """
+        Plans synthesis for dirty clusters, largest backlog first, at most
+        `max_jobs_per_run` jobs with at most `max_imprints_per_call` imprints each
+        (the summary fed into a refresh counts as one).
+        """
+        candidates = [cluster for cluster in self._clusters
+                      if cluster.dirty and len(cluster.member_ids) >= self.min_cluster_size]
+        candidates.sort(key=lambda cluster: len(cluster.pending_ids), reverse=True)
+
+        jobs = []
+        for cluster in candidates[:self.max_jobs_per_run]:
+            refresh = cluster.summary is not None
+            batch_ids = cluster.pending_ids[:self.max_imprints_per_call - (1 if refresh else 0)]
+            if not refresh and len(batch_ids) < self.min_cluster_size:
+                continue
+            imprints = tuple(self._imprints[pid] for pid in batch_ids)
+            jobs.append(SynthesisJob(
+                cluster_id=cluster.cluster_id,
+                member_ids=tuple(batch_ids),
+                imprints=((cluster.summary,) + imprints) if refresh else imprints,
+                aggregate_id=cluster.aggregate_id,
+            ))
+        return jobs
+
+    def mark_synthesized(self, job: SynthesisJob, aggregate: InsightParticle):
+        """Records the IA produced for a job; its members stop being pending, later ones keep the cluster dirty."""
+        self._attach(self._clusters[job.cluster_id], aggregate, job.member_ids)
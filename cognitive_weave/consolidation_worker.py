@@ -0,0 +1,336 @@
+# cognitive_weave_poc/cognitive_weave/consolidation_worker.py
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .consolidation import SynthesisJob
+from .data_structures import InsightAggregateAttributes
+from .telemetry import METRICS
+from .utils import estimate_token_count, log_info, log_error
+
+# Expected completion size of one synthesis call, charged against the token budget
+SYNTHESIS_OUTPUT_TOKEN_ESTIMATE = 300
+
+PlanFn = Callable[[], List[SynthesisJob]]
+PublishFn = Callable[[Optional[InsightAggregateAttributes], SynthesisJob], Any]
+
+
+def estimate_job_tokens(job: SynthesisJob) -> int:
+    """Rough prompt + completion token cost of one synthesis job."""
+    return sum(estimate_token_count(imprint) for imprint in job.imprints) + SYNTHESIS_OUTPUT_TOKEN_ESTIMATE
+
+
+class ConsolidationScheduler:
+    """
+    Scheduling state shared by the thread and asyncio consolidation workers.
+
+    Synthesis requests coalesce: while one is pending, further requests only bump a
+    counter, because a run plans from the consolidation engine's dirty clusters and
+    therefore covers everything that changed up to that point. Runs are spaced at least
+    `min_interval_seconds` apart, and `token_budget_per_hour` (if set) caps the
+    estimated tokens spent in any rolling hour; jobs that do not fit are deferred and
+    their clusters stay dirty until budget frees up. A job estimated above the whole
+    budget is charged exactly the budget, so it runs alone in an otherwise empty hour.
+    """
+    def __init__(self, plan: PlanFn, publish: PublishFn, min_interval_seconds: float = 5.0,
+                 token_budget_per_hour: Optional[int] = None):
+        self._plan = plan
+        self._publish = publish
+        self.min_interval_seconds = min_interval_seconds
+        self.token_budget_per_hour = token_budget_per_hour
+
+        self._pending_since: Optional[float] = None
+        self._last_run_at: Optional[float] = None
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._jobs_in_flight = 0
+        self._run_requested_at: Optional[float] = None
+        self._deferred_until = 0.0
+
+        self.requests = 0
+        self.coalesced_requests = 0
+        self.runs = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.jobs_deferred = 0
+        self.tokens_spent = 0
+        self.last_lag_seconds = 0.0
+        self.last_run_seconds = 0.0
+
+    def _note_request(self, now: float):
+        self.requests += 1
+        if self._pending_since is None:
+            self._pending_since = now
+        else:
+            self.coalesced_requests += 1
+
+    def _spent_in_window(self, now: float) -> int:
+        while self._spent and now - self._spent[0][0] >= 3600:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    def _seconds_until_runnable(self, now: float) -> float:
+        """How long the pending request has to wait for the rate limit and token budget."""
+        wait = 0.0
+        if self._last_run_at is not None:
+            wait = self._last_run_at + self.min_interval_seconds - now
+        return max(wait, self._deferred_until - now, 0.0)
+
+    def _job_cost(self, job: SynthesisJob) -> int:
+        """
+        Tokens a job is charged against the budget. An estimate above the whole hourly
+        budget is clamped to it, so the job runs once the window is empty instead of
+        being deferred forever.
+        """
+        tokens = estimate_job_tokens(job)
+        if self.token_budget_per_hour is not None and tokens > self.token_budget_per_hour:
+            return self.token_budget_per_hour
+        return tokens
+
+    def _affordable(self, jobs: List[SynthesisJob], now: float) -> Tuple[List[SynthesisJob], int]:
+        """Splits planned jobs into those that fit the token budget and a count of deferred ones."""
+        if self.token_budget_per_hour is None:
+            return jobs, 0
+        remaining = self.token_budget_per_hour - self._spent_in_window(now)
+        affordable = []
+        for job in jobs:
+            cost = self._job_cost(job)
+            if cost > remaining:
+                break
+            remaining -= cost
+            affordable.append(job)
+        return affordable, len(jobs) - len(affordable)
+
+    def _take_request(self, now: float) -> Optional[float]:
+        """Claims the pending request for a run starting now and returns when it was made."""
+        requested_at = self._pending_since
+        self._pending_since = None
+        self._last_run_at = now
+        self.runs += 1
+        return requested_at
+
+    def _admit(self, jobs: List[SynthesisJob], requested_at: Optional[float], now: float) -> List[SynthesisJob]:
+        """Charges the affordable jobs of a run to the budget and defers the rest."""
+        jobs, deferred = self._affordable(jobs, now)
+        if deferred:
+            self.jobs_deferred += deferred
+            METRICS.inc("cognitive_weave_synthesis_jobs_total", deferred, result="deferred")
+            # Re-queue the request; the deferred clusters stay dirty and are replanned later
+            if requested_at is not None and (self._pending_since is None or requested_at < self._pending_since):
+                self._pending_since = requested_at
+        for job in jobs:
+            tokens = self._job_cost(job)
+            if tokens < estimate_job_tokens(job):
+                log_info(f"Consolidation: Synthesis job for cluster {job.cluster_id} exceeds the hourly token budget; "
+                         f"charging it the whole budget.")
+            self._spent.append((now, tokens))
+            self.tokens_spent += tokens
+            METRICS.inc("cognitive_weave_synthesis_budget_tokens_total", tokens)
+        if deferred:
+            # Retry once the oldest spend in the window has expired
+            self._deferred_until = self._spent[0][0] + 3600 if self._spent else now
+            log_info(f"Consolidation: Token budget exhausted; deferring {deferred} synthesis job(s).")
+        self._jobs_in_flight = len(jobs)
+        self._run_requested_at = requested_at
+        return jobs
+
+    def _finish_job(self, ia_attributes: Optional[InsightAggregateAttributes], job: SynthesisJob):
+        self._count_job(self._publish_job(ia_attributes, job))
+
+    def _publish_job(self, ia_attributes: Optional[InsightAggregateAttributes], job: SynthesisJob) -> Any:
+        """Publishes a job's IA; returns what `publish` returned, or None if it failed."""
+        try:
+            return self._publish(ia_attributes, job)
+        except Exception as e:
+            log_error(f"Consolidation: Publishing IA for cluster {job.cluster_id} failed: {e}")
+            return None
+
+    def _count_job(self, published: Any):
+        if published is None:
+            self.jobs_failed += 1
+        else:
+            self.jobs_completed += 1
+        METRICS.inc("cognitive_weave_synthesis_jobs_total", result="failed" if published is None else "completed")
+        self._jobs_in_flight -= 1
+
+    def _end_run(self, started: float):
+        finished = time.monotonic()
+        self.last_run_seconds = finished - started
+        if self._run_requested_at is not None:
+            self.last_lag_seconds = finished - self._run_requested_at
+            METRICS.observe("cognitive_weave_consolidation_lag_seconds", self.last_lag_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput counters."""
+        now = time.monotonic()
+        return {
+            "queue_depth": (1 if self._pending_since is not None else 0) + self._jobs_in_flight,
+            "lag_seconds": (now - self._pending_since) if self._pending_since is not None else 0.0,
+            "last_lag_seconds": self.last_lag_seconds,
+            "last_run_seconds": self.last_run_seconds,
+            "requests": self.requests,
+            "coalesced_requests": self.coalesced_requests,
+            "runs": self.runs,
+            "jobs_completed": self.jobs_completed,
+            "jobs_failed": self.jobs_failed,
+            "jobs_deferred": self.jobs_deferred,
+            "tokens_spent": self.tokens_spent,
+        }
+
+
+class ConsolidationWorker(ConsolidationScheduler):
+    """
+    Daemon thread that runs IA synthesis off the chat turn.
+
+    `plan` and `publish` are expected to take the agent's memory lock themselves, so a
+    new or refreshed IA becomes visible to retrieval in one step; the synthesis LLM
+    call in between runs without holding it.
+    """
+    def __init__(self, plan: PlanFn, synthesize: Callable[[List[str]], Optional[InsightAggregateAttributes]],
+                 publish: PublishFn, **scheduler_options):
+        super().__init__(plan, publish, **scheduler_options)
+        self._synthesize = synthesize
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="consolidation-worker", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Queues a synthesis run without blocking; coalesces with any pending request."""
+        with self._cond:
+            self._note_request(time.monotonic())
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopping and self._pending_since is None:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                wait = self._seconds_until_runnable(time.monotonic())
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+            self._run_once()
+
+    def _run_once(self):
+        started = time.monotonic()
+        try:
+            with self._cond:
+                requested_at = self._take_request(started)
+            # Planning takes the agent's memory lock, so it must not run under our condition
+            jobs = self._plan()
+            with self._cond:
+                jobs = self._admit(jobs, requested_at, started)
+            for job in jobs:
+                try:
+                    ia_attributes = self._synthesize(list(job.imprints))
+                except Exception as e:
+                    log_error(f"Consolidation: Synthesis for cluster {job.cluster_id} failed: {e}")
+                    ia_attributes = None
+                self._finish_job(ia_attributes, job)
+        except Exception as e:
+            log_error(f"Consolidation: Run failed: {e}")
+        finally:
+            self._jobs_in_flight = 0
+            self._end_run(started)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the thread after the current run; pending clusters stay dirty for next time."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class AsyncConsolidationWorker(ConsolidationScheduler):
+    """
+    asyncio task that runs IA synthesis off the chat turn.
+
+    Jobs of one run are synthesized concurrently. `plan` and `publish` take the agent's
+    memory lock and write to its store, so they run on worker threads and never block
+    the event loop; each IA is still committed to memory atomically under that lock.
+    """
+    def __init__(self, plan: PlanFn, synthesize: Callable[[List[str]], Awaitable[Optional[InsightAggregateAttributes]]],
+                 publish: PublishFn, **scheduler_options):
+        super().__init__(plan, publish, **scheduler_options)
+        self._synthesize = synthesize
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Starts the worker task on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    def request(self):
+        self._note_request(time.monotonic())
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _loop(self):
+        while True:
+            if self._pending_since is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            wait = self._seconds_until_runnable(time.monotonic())
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run_once()
+
+    async def _synthesize_job(self, job: SynthesisJob):
+        try:
+            ia_attributes = await self._synthesize(list(job.imprints))
+        except Exception as e:
+            log_error(f"Consolidation: Synthesis for cluster {job.cluster_id} failed: {e}")
+            ia_attributes = None
+        self._count_job(await asyncio.to_thread(self._publish_job, ia_attributes, job))
+
+    async def _run_once(self):
+        started = time.monotonic()
+        try:
+            requested_at = self._take_request(started)
+            jobs = self._admit(await asyncio.to_thread(self._plan), requested_at, started)
+            await asyncio.gather(*(self._synthesize_job(job) for job in jobs))
+        except Exception as e:
+            log_error(f"Consolidation: Run failed: {e}")
+        finally:
+            self._jobs_in_flight = 0
+            self._end_run(started)
+
+    async def stop(self):
+        """Cancels the worker task; pending clusters stay dirty for next time."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
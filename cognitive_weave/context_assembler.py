@@ -0,0 +1,118 @@
+# cognitive_weave_poc/cognitive_weave/context_assembler.py
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set
+
+from .data_structures import InsightParticle
+from .telemetry import METRICS, TOKEN_BUCKETS
+from .temporal_index import to_epoch
+from .utils import estimate_token_count
+
+# Instructions that open every conversational system prompt; kept byte-identical across
+# turns so provider-side prompt caching can reuse them
+RESPONSE_SYSTEM_PREFIX = """You are a helpful AI assistant.
+You have access to some memories from previous interactions or synthesized insights.
+Use these memories to provide a comprehensive and contextually relevant answer to the user's query.
+If the memories are not directly relevant, answer the query based on your general knowledge but acknowledge if you are not using specific memories.
+
+Available Memories:
+---
+"""
+RESPONSE_SYSTEM_SUFFIX = "\n---\n"
+NO_MEMORIES_CONTEXT = "No specific memories retrieved for this query."
+
+CoveringFn = Callable[[str], List[InsightParticle]]
+
+
+def format_memory(position: int, ip: InsightParticle) -> str:
+    """One line of the memory block."""
+    context = f"Memory {position} (Type: {'Aggregate' if ip.is_aggregate else 'Particle'}): "
+    if ip.is_aggregate:
+        return context + f"Synthesized Insight: \"{ip.core_data}\" (Summary: \"{ip.situational_imprint}\")"
+    return context + f"\"{ip.situational_imprint}\" (Keywords: {ip.resonance_keys})"
+
+
+class AssembledContext(NamedTuple):
+    system_prompt: str
+    particles: List[InsightParticle]  # In prompt order
+    tokens: int  # Estimated tokens of the memory block
+    dropped: int  # Candidates left out (over budget or summarized by an included IA); graph-only IAs not counted
+
+
+class ContextAssembler:
+    """
+    Packs retrieved memories into a token budget for the conversational system prompt.
+
+    Candidates are valued by retrieval rank (1 / (rank + 1)). An IA is worth the value of
+    every candidate IP it was derived from, plus its own, so it is packed ahead of them
+    (ties included) and its sources are then left out, or taken back out if they were
+    packed first: the aggregate already says what they say, usually in fewer tokens. `covering_aggregates` (particle ID -> IAs derived from it) also brings
+    in IAs that retrieval did not return. If an IA does not fit, its sources compete on
+    their own. Tokens are estimated locally with estimate_token_count.
+
+    The prompt is RESPONSE_SYSTEM_PREFIX followed by the packed memories in creation
+    order rather than rank order, so a memory that stays relevant keeps its place and
+    consecutive turns share the longest possible byte-identical prefix.
+    """
+    def __init__(self, token_budget: int = 1500,
+                 count_tokens: Callable[[str], int] = estimate_token_count):
+        self.token_budget = token_budget
+        self._count_tokens = count_tokens
+
+    def assemble(self, candidates: Sequence[InsightParticle],
+                 covering_aggregates: Optional[CoveringFn] = None) -> AssembledContext:
+        """
+        Args:
+            candidates: Retrieved particles, best first.
+            covering_aggregates: Optional lookup of the IAs derived from a particle.
+
+        Returns:
+            The system prompt and the particles it shows.
+        """
+        particles: Dict[str, InsightParticle] = {}
+        values: Dict[str, float] = {}
+        for rank, ip in enumerate(candidates):
+            if ip.particle_id not in particles:
+                particles[ip.particle_id] = ip
+                values[ip.particle_id] = 1.0 / (rank + 1)
+        candidate_ids = set(particles)
+        if covering_aggregates is not None:
+            for ip in [ip for ip in particles.values() if not ip.is_aggregate]:
+                for ia in covering_aggregates(ip.particle_id):
+                    if ia.particle_id not in particles:
+                        particles[ia.particle_id] = ia
+                        values[ia.particle_id] = 0.0
+        for ia in particles.values():
+            if ia.is_aggregate:
+                values[ia.particle_id] += sum(values[pid] for pid in candidate_ids.intersection(ia.derived_from_ids))
+
+        # Sorting is stable, so equal values keep retrieval order; an IA goes ahead of an equally valued IP
+        ranked = sorted(particles.values(), key=lambda ip: (-values[ip.particle_id], not ip.is_aggregate))
+        packed: Dict[str, InsightParticle] = {}
+        costs: Dict[str, int] = {}
+        summarized: Set[str] = set()
+        used = 0
+        for ip in ranked:
+            if ip.particle_id in summarized:
+                continue
+            cost = self._count_tokens(format_memory(len(packed) + 1, ip)) + 1
+            if used + cost > self.token_budget:
+                continue
+            packed[ip.particle_id] = ip
+            costs[ip.particle_id] = cost
+            used += cost
+            if ip.is_aggregate:
+                summarized.update(ip.derived_from_ids)
+                for source_id in packed.keys() & set(ip.derived_from_ids):  # Packed before its IA
+                    del packed[source_id]
+                    used -= costs.pop(source_id)
+        chosen = list(packed.values())
+        chosen.sort(key=lambda ip: (to_epoch(ip.creation_timestamp) or 0.0, ip.particle_id))
+
+        memory_block = "\n".join(format_memory(position, ip) for position, ip in enumerate(chosen, start=1))
+        METRICS.observe("cognitive_weave_context_tokens", used, buckets=TOKEN_BUCKETS)
+        return AssembledContext(
+            system_prompt=RESPONSE_SYSTEM_PREFIX + (memory_block or NO_MEMORIES_CONTEXT) + RESPONSE_SYSTEM_SUFFIX,
+            particles=chosen,
+            tokens=used,
+            dropped=len(candidate_ids.difference(ip.particle_id for ip in chosen)),
+        )
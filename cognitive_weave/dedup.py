@@ -0,0 +1,282 @@
+# cognitive_weave_poc/cognitive_weave/dedup.py
+
+import hashlib
+import re
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from .data_structures import InsightParticle
+
+# Matches of the duplicate detector, by how they were found
+MATCH_EXACT = "exact"
+MATCH_NEAR = "near"
+MATCH_IMPRINT = "imprint"
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SHINGLE_BASE = 1_114_111  # above every code point
+_WORD_RE = re.compile(r"\w+(?:['’]\w+)*")
+_NEGATIONS = frozenset({"no", "not", "never", "none", "nobody", "nothing", "nowhere", "neither", "nor", "without", "cannot"})
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace- and case-insensitive form of a text used for exact deduplication."""
+    return " ".join(text.split()).casefold()
+
+
+def normalize_words(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a text, the input of shingling."""
+    return " ".join(_NON_WORD_RE.sub(" ", text.casefold()).split())
+
+
+def fact_tokens(text: str) -> Tuple[Tuple[str, ...], int]:
+    """
+    The tokens of a text that carry its facts but barely move its shingle similarity:
+    the words containing digits (dates, amounts, doses), in order, and the number of
+    negations ("not", "never", "isn't", ...). Two texts can only restate each other if
+    these are equal.
+    """
+    numbers = []
+    negations = 0
+    for word in _WORD_RE.findall(text.casefold()):
+        if any(char.isdigit() for char in word):
+            numbers.append(word)
+        elif word in _NEGATIONS or word.replace("\u2019", "'").endswith("n't"):
+            negations += 1
+    return tuple(numbers), negations
+
+
+def content_particle_id(text: str) -> str:
+    """Content-addressed particle ID: texts that normalize to the same string get the same ID."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+    return f"IP_{uuid.UUID(bytes=digest[:16])}"
+
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles of normalized text.
+
+    Shingles are hashed with a vectorized polynomial hash over the text's code points and
+    each of the `num_perm` multiply-shift hash functions ((a*x + b mod 2^64) >> 32) is applied to
+    all of them at once with NumPy; the fraction of equal signature
+    positions estimates the Jaccard similarity of two texts' shingle sets.
+    """
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = (rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        codes = np.frombuffer(normalize_words(text).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        count = max(len(codes) - self.shingle_size + 1, 1 if len(codes) else 0)
+        hashes = np.zeros(count, dtype=np.uint64)
+        # Polynomial hash of every shingle at once; repeated shingles do not change a minimum
+        for offset in range(min(self.shingle_size, len(codes))):
+            hashes = (hashes * _SHINGLE_BASE + codes[offset:offset + count]) % _MERSENNE_PRIME
+        return hashes
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """The text's signature, or None for a text without content."""
+        hashes = self._shingle_hashes(text)
+        if not len(hashes):
+            return None
+        # Multiply-shift hashing: the uint64 products wrap around, which is the intended modulus
+        permuted = (self._a[:, None] * hashes + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.count_nonzero(a == b)) / len(a)
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hash index over MinHash signatures.
+
+    A signature is cut into `bands` bands of num_perm / bands rows; two signatures
+    become candidates when any band matches exactly, so a query only inspects the
+    particles sharing one of its band buckets instead of the whole memory. With the
+    default 16 bands of 4 rows, pairs at Jaccard 0.8 are found with probability
+    above 0.99 while pairs below 0.3 rarely collide. Signatures live in a dense
+    matrix (swap-on-remove, like EmbeddingStore) for candidate verification.
+    """
+    def __init__(self, num_perm: int = 64, bands: int = 16, initial_capacity: int = 1024):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._signatures = np.zeros((max(1, initial_capacity), num_perm), dtype=np.uint32)
+        self._size = 0
+        self._row_ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, particle_id: str) -> bool:
+        return particle_id in self._row_by_id
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, particle_id: str, signature: np.ndarray):
+        if particle_id in self._row_by_id:
+            self.remove(particle_id)
+        if self._size == self._signatures.shape[0]:
+            grown = np.zeros((self._size * 2, self._signatures.shape[1]), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        row = self._size
+        self._signatures[row] = signature
+        self._row_ids.append(particle_id)
+        self._row_by_id[particle_id] = row
+        self._size += 1
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].append(particle_id)
+
+    def remove(self, particle_id: str):
+        row = self._row_by_id.pop(particle_id, None)
+        if row is None:
+            return
+        for band, key in enumerate(self._band_keys(self._signatures[row])):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.remove(particle_id)
+                if not bucket:
+                    del self._buckets[band][key]
+        last = self._size - 1
+        if row != last:
+            moved_id = self._row_ids[last]
+            self._signatures[row] = self._signatures[last]
+            self._row_ids[row] = moved_id
+            self._row_by_id[moved_id] = row
+        self._row_ids.pop()
+        self._size -= 1
+
+    def signature_of(self, particle_id: str) -> Optional[np.ndarray]:
+        row = self._row_by_id.get(particle_id)
+        return self._signatures[row] if row is not None else None
+
+    def query(self, signature: np.ndarray, threshold: float,
+              accept: Optional[Callable[[str], bool]] = None) -> Optional[Tuple[str, float]]:
+        """
+        The most similar indexed particle at or above `threshold` (and, if given, for
+        which `accept` holds), as (particle ID, similarity).
+        """
+        candidates: Set[str] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket:
+                candidates.update(bucket)
+        if not candidates:
+            return None
+        ids = list(candidates)
+        rows = np.fromiter((self._row_by_id[pid] for pid in ids), dtype=np.int64, count=len(ids))
+        similarities = (self._signatures[rows] == signature).mean(axis=1)
+        for best in np.argsort(-similarities, kind="stable"):
+            if similarities[best] < threshold:
+                return None
+            if accept is None or accept(ids[best]):
+                return ids[best], float(similarities[best])
+        return None
+
+
+class DuplicateMatch(NamedTuple):
+    particle_id: str
+    kind: str
+    similarity: float
+
+
+class DuplicateDetector:
+    """
+    Finds stored IPs that a new text restates, so it can be merged instead of appended.
+
+    Three checks, cheapest first:
+    - exact: the normalized text (case and whitespace folded) was stored before
+    - near: the MinHash estimate of the `core_data` shingle Jaccard similarity reaches
+      `near_threshold` (found through an LSH band index, not a scan)
+    - imprint: after enrichment, the situational imprints are near-identical
+      (`imprint_threshold`) and the texts still overlap (`imprint_core_threshold`)
+
+    The first two run before enrichment, so a restatement costs no LLM call. A merged
+    text is not stored, so near and imprint matches also need the same fact_tokens
+    (numbers and negations): "is not allergic" or "ends in March 2024" is a new fact,
+    however similar its shingles are. Aggregates are never indexed; only IPs are merge targets.
+    """
+    def __init__(self, near_threshold: float = 0.95, imprint_threshold: float = 0.9,
+                 imprint_core_threshold: float = 0.5, num_perm: int = 64, bands: int = 16):
+        self.near_threshold = near_threshold
+        self.imprint_threshold = imprint_threshold
+        self.imprint_core_threshold = imprint_core_threshold
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._exact: Dict[str, str] = {}
+        self._exact_key_by_id: Dict[str, str] = {}
+        self._facts: Dict[str, Tuple[Tuple[str, ...], int]] = {}
+        self._core = LSHIndex(num_perm, bands)
+        self._imprints = LSHIndex(num_perm, bands)
+
+    def __len__(self) -> int:
+        return len(self._exact_key_by_id)
+
+    @staticmethod
+    def _exact_key(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def add(self, ip: InsightParticle):
+        if ip.is_aggregate or not isinstance(ip.core_data, str):
+            return
+        key = self._exact_key(ip.core_data)
+        self._exact.setdefault(key, ip.particle_id)
+        self._exact_key_by_id[ip.particle_id] = key
+        self._facts[ip.particle_id] = fact_tokens(ip.core_data)
+        signature = self.hasher.signature(ip.core_data)
+        if signature is not None:
+            self._core.add(ip.particle_id, signature)
+        imprint_signature = self.hasher.signature(ip.situational_imprint) if ip.situational_imprint else None
+        if imprint_signature is not None:
+            self._imprints.add(ip.particle_id, imprint_signature)
+
+    def remove(self, particle_id: str):
+        key = self._exact_key_by_id.pop(particle_id, None)
+        if key is not None and self._exact.get(key) == particle_id:
+            del self._exact[key]
+        self._facts.pop(particle_id, None)
+        self._core.remove(particle_id)
+        self._imprints.remove(particle_id)
+
+    def match_text(self, text: str) -> Optional[DuplicateMatch]:
+        """Exact or near-exact match of a raw text, checked before enrichment."""
+        particle_id = self._exact.get(self._exact_key(text))
+        if particle_id is not None:
+            return DuplicateMatch(particle_id, MATCH_EXACT, 1.0)
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        found = self._core.query(signature, self.near_threshold, self._same_facts_as(text))
+        return DuplicateMatch(found[0], MATCH_NEAR, found[1]) if found else None
+
+    def _same_facts_as(self, text: str) -> Callable[[str], bool]:
+        facts = fact_tokens(text)
+        return lambda particle_id: self._facts.get(particle_id) == facts
+
+    def match_enriched(self, text: str, situational_imprint: Optional[str]) -> Optional[DuplicateMatch]:
+        """Match on the enriched imprint, for restatements worded too differently for match_text."""
+        if not situational_imprint:
+            return None
+        imprint_signature = self.hasher.signature(situational_imprint)
+        core_signature = self.hasher.signature(text)
+        if imprint_signature is None or core_signature is None:
+            return None
+        found = self._imprints.query(imprint_signature, self.imprint_threshold, self._same_facts_as(text))
+        if found is None:
+            return None
+        stored_core = self._core.signature_of(found[0])
+        if stored_core is None or MinHasher.similarity(core_signature, stored_core) < self.imprint_core_threshold:
+            return None
+        return DuplicateMatch(found[0], MATCH_IMPRINT, found[1])
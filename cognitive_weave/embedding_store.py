@@ -0,0 +1,217 @@
+# cognitive_weave_poc/cognitive_weave/embedding_store.py
+
+import inspect
+import math
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_structures import InsightParticle
+from .utils import log_error, log_info
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def particle_embedding_text(ip: InsightParticle) -> str:
+    """Builds the text that represents a particle in the vector space."""
+    parts = [ip.situational_imprint or ""]
+    parts.extend(ip.resonance_keys)
+    parts.extend(ip.signifiers)
+    parts.extend(ip.extracted_entities or [])
+    if ip.is_aggregate:
+        parts.append(str(ip.core_data))
+    return " . ".join(part for part in parts if part)
+
+
+class HashingEmbedder:
+    """
+    Local, offline embedder based on signed feature hashing.
+
+    Word unigrams and bigrams are hashed into a fixed number of buckets with
+    sublinear term frequency, so no vocabulary has to be fitted or stored.
+    """
+    def __init__(self, dim: int = 256, use_bigrams: bool = True):
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = list(tokens)
+        if self.use_bigrams:
+            features.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                bucket = h % self.dim
+                sign = 1.0 if (h >> 31) & 1 == 0 else -1.0
+                counts[bucket] = counts.get(bucket, 0.0) + sign
+            for bucket, value in counts.items():
+                if value:
+                    vectors[row, bucket] = math.copysign(1.0 + math.log(abs(value)), value)
+        return vectors
+
+
+class OracleEmbedder:
+    """
+    Embedder that delegates to the embedding deployment behind the SemanticOracleInterface.
+
+    Failed calls yield zero vectors so a transient error never blocks ingestion;
+    such particles are simply invisible to vector recall.
+
+    Embedding runs inline with indexing and retrieval, so the SOI must be the blocking
+    SemanticOracleInterface. An AsyncSemanticOracleInterface is rejected; wrap its
+    provider in a SemanticOracleInterface instead (async agents index on the event loop,
+    so each embedding call then blocks it for one request).
+    """
+    def __init__(self, soi, dim: int = 1536):
+        if inspect.iscoroutinefunction(getattr(soi, "embed_texts", None)):
+            raise TypeError("OracleEmbedder needs a blocking SOI; use "
+                            "OracleEmbedder(SemanticOracleInterface(provider=soi.provider)) for an async one.")
+        self.soi = soi
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        embeddings = self.soi.embed_texts(list(texts))
+        if embeddings is None:
+            log_error(f"EmbeddingStore: Oracle embedding failed for {len(texts)} text(s); using zero vectors.")
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class EmbeddingStore:
+    """
+    Contiguous matrix of L2-normalized particle embeddings with top-k cosine search.
+
+    Rows live in a pre-allocated float32 matrix that doubles its capacity when full,
+    so appends never rebuild the existing rows and search is a single mat-vec
+    (or mat-mat for batches) followed by argpartition.
+    """
+    def __init__(self, embedder=None, initial_capacity: int = 1024):
+        self.embedder = embedder if embedder is not None else HashingEmbedder()
+        self.dim: int = self.embedder.dim
+        self._vectors = np.zeros((max(1, initial_capacity), self.dim), dtype=np.float32)
+        self._size = 0
+        self._row_ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, particle_id: str) -> bool:
+        return particle_id in self._row_by_id
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _ensure_capacity(self, needed: int):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+    def add_vectors(self, particle_ids: Sequence[str], vectors: np.ndarray):
+        """Appends (or overwrites, for known IDs) pre-computed vectors."""
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(particle_ids), self.dim))
+        new_rows = [pid for pid in particle_ids if pid not in self._row_by_id]
+        self._ensure_capacity(self._size + len(new_rows))
+        for pid, vector in zip(particle_ids, vectors):
+            row = self._row_by_id.get(pid)
+            if row is None:
+                row = self._size
+                self._row_by_id[pid] = row
+                self._row_ids.append(pid)
+                self._size += 1
+            self._vectors[row] = vector
+
+    def add_particles(self, ips: Sequence[InsightParticle]):
+        """Embeds the given particles in one batch and appends them."""
+        if not ips:
+            return
+        texts = [particle_embedding_text(ip) for ip in ips]
+        self.add_vectors([ip.particle_id for ip in ips], self.embedder.embed(texts))
+
+    def add_particle(self, ip: InsightParticle):
+        self.add_particles([ip])
+
+    def remove(self, particle_ids: Sequence[str]):
+        """Drops particles' rows, moving the last row into each freed slot so the matrix stays dense."""
+        for pid in particle_ids:
+            row = self._row_by_id.pop(pid, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                moved_id = self._row_ids[last]
+                self._vectors[row] = self._vectors[last]
+                self._row_ids[row] = moved_id
+                self._row_by_id[moved_id] = row
+            self._row_ids.pop()
+            self._size -= 1
+
+    def _top_k_rows(self, scores: np.ndarray, top_k: int) -> np.ndarray:
+        if top_k >= scores.shape[-1]:
+            return np.argsort(-scores, axis=-1, kind="stable")
+        partitioned = np.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+        order = np.argsort(-np.take_along_axis(scores, partitioned, axis=-1), axis=-1, kind="stable")
+        return np.take_along_axis(partitioned, order, axis=-1)
+
+    def search_vectors(self, query_vectors: np.ndarray, top_k: int,
+                       min_similarity: Optional[float] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Batched top-k cosine search for a matrix of query vectors.
+
+        Returns:
+            One list of (particle_id, similarity) pairs per query, best match first.
+        """
+        query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        if self._size == 0 or top_k <= 0:
+            return [[] for _ in range(query_vectors.shape[0])]
+
+        queries = self._normalize(query_vectors)
+        scores = queries @ self._vectors[:self._size].T
+        top_rows = self._top_k_rows(scores, top_k)
+
+        results = []
+        for query_idx, rows in enumerate(top_rows):
+            hits = []
+            for row in rows:
+                similarity = float(scores[query_idx, row])
+                if min_similarity is not None and similarity < min_similarity:
+                    break
+                hits.append((self._row_ids[row], similarity))
+            results.append(hits)
+        return results
+
+    def search_batch(self, query_texts: Sequence[str], top_k: int = 10,
+                     min_similarity: Optional[float] = None) -> List[List[Tuple[str, float]]]:
+        """Embeds all query texts in one call and searches them together."""
+        if not query_texts:
+            return []
+        return self.search_vectors(self.embedder.embed(list(query_texts)), top_k, min_similarity)
+
+    def search(self, query_text: str, top_k: int = 10,
+               min_similarity: Optional[float] = None) -> List[Tuple[str, float]]:
+        return self.search_batch([query_text], top_k, min_similarity)[0]
+
+    def rebuild(self, ips: Sequence[InsightParticle]):
+        """Re-embeds all particles from scratch, e.g. after switching embedders."""
+        log_info(f"EmbeddingStore: Rebuilding vectors for {len(ips)} particles.")
+        self._vectors = np.zeros((max(1, len(ips)), self.dim), dtype=np.float32)
+        self._size = 0
+        self._row_ids = []
+        self._row_by_id = {}
+        self.add_particles(list(ips))
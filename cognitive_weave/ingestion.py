@@ -0,0 +1,426 @@
+# cognitive_weave_poc/cognitive_weave/ingestion.py
+
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .async_semantic_oracle import AsyncSemanticOracleInterface
+from .data_structures import InsightParticle
+from .dedup import content_particle_id
+from .embedding_store import HashingEmbedder, particle_embedding_text
+from .telemetry import METRICS, span
+from .utils import estimate_token_count, log_error, log_info
+
+if TYPE_CHECKING:
+    from main import ConversationalAgent
+
+TRANSCRIPT_EXTENSIONS = {".log"}
+RECORD_EXTENSIONS = {".jsonl", ".ndjson"}
+DOCUMENT_EXTENSIONS = {".txt", ".md"}
+# Documents are split on blank lines into passages of at most this many (estimated) tokens
+DEFAULT_PASSAGE_TOKENS = 300
+CHECKPOINT_VERSION = 1
+
+_USER_LINE_RE = re.compile(r"^You: (.*)$")
+_AGENT_LINE_RE = re.compile(r"^Agent: (.*)$")
+# Lines that end an agent response in the logs: log output, the next prompt, or a banner
+_END_OF_RESPONSE_RE = re.compile(r"^(\[INFO\]|\[ERROR\]|You: |={10,}|\(\w+\) )")
+
+
+class SourceRecord(NamedTuple):
+    """One text to ingest and its position in the input (used for checkpoints and error reports)."""
+    source: str
+    index: int
+    text: str
+
+
+def parse_conversation_log(path: str) -> List[Tuple[str, str]]:
+    """
+    Extracts the (user input, agent response) turns of a recorded session.
+
+    Empty inputs, 'quit' and turns without a recorded response are skipped.
+    """
+    turns: List[Tuple[str, str]] = []
+    user_input: Optional[str] = None
+    response_lines: Optional[List[str]] = None
+
+    def close_response():
+        if user_input and response_lines is not None:
+            turns.append((user_input, "\n".join(response_lines).strip()))
+
+    with open(path, "r", encoding="utf-8") as f:
+        for raw_line in f:
+            line = raw_line.rstrip("\n")
+            if response_lines is not None and not _END_OF_RESPONSE_RE.match(line):
+                response_lines.append(line)
+                continue
+            user_match = _USER_LINE_RE.match(line)
+            agent_match = _AGENT_LINE_RE.match(line)
+            if user_match:
+                close_response()
+                response_lines = None
+                text = user_match.group(1).strip()
+                user_input = text if text and not text.startswith("[") and text.lower() != "quit" else None
+            elif agent_match:
+                response_lines = [agent_match.group(1)]
+            elif response_lines is not None:
+                close_response()
+                user_input, response_lines = None, None
+    close_response()
+    return turns
+
+
+def _iter_passages(path: str, max_tokens: int) -> Iterator[str]:
+    """Streams a text document as blank-line separated paragraphs packed into passages of up to `max_tokens`."""
+    passage: List[str] = []
+    passage_tokens = 0
+    paragraph: List[str] = []
+
+    def take_paragraph() -> Optional[str]:
+        text = " ".join(line.strip() for line in paragraph).strip()
+        paragraph.clear()
+        return text or None
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                paragraph.append(line)
+                continue
+            text = take_paragraph()
+            if text is None:
+                continue
+            tokens = estimate_token_count(text)
+            if passage and passage_tokens + tokens > max_tokens:
+                yield "\n\n".join(passage)
+                passage, passage_tokens = [], 0
+            passage.append(text)
+            passage_tokens += tokens
+    text = take_paragraph()
+    if text is not None:
+        passage.append(text)
+    if passage:
+        yield "\n\n".join(passage)
+
+
+def iter_source_texts(path: str, include_responses: bool = False,
+                      passage_tokens: int = DEFAULT_PASSAGE_TOKENS) -> Iterator[str]:
+    """
+    Streams the texts of one input file.
+
+    - `.log`: the user turns of a recorded session (plus the agent's responses with
+      `include_responses`)
+    - `.jsonl` / `.ndjson`: one record per line, either a string or an object with a
+      `text` (or `core_data`) field
+    - anything else: a plain-text document split into passages
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TRANSCRIPT_EXTENSIONS:
+        for user_input, response in parse_conversation_log(path):
+            yield user_input
+            if include_responses and response:
+                yield response
+    elif extension in RECORD_EXTENSIONS:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    log_error(f"Ingestion: skipping malformed line {line_number} of {path}: {e}")
+                    continue
+                text = record if isinstance(record, str) else record.get("text", record.get("core_data"))
+                if isinstance(text, str) and text.strip():
+                    yield text
+    else:
+        yield from _iter_passages(path, passage_tokens)
+
+
+def discover_sources(paths: Sequence[str]) -> List[str]:
+    """Expands directories into the ingestible files below them, in a stable (sorted) order."""
+    extensions = TRANSCRIPT_EXTENSIONS | RECORD_EXTENSIONS | DOCUMENT_EXTENSIONS
+    sources: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, file_names in sorted(os.walk(path)):
+                sources.extend(os.path.join(directory, name) for name in sorted(file_names)
+                               if os.path.splitext(name)[1].lower() in extensions)
+        else:
+            sources.append(path)
+    return sources
+
+
+# --- CPU-bound stages, run in worker processes ---
+
+def prepare_texts(texts: List[str]) -> List[Tuple[str, int]]:
+    """Hashes and sizes a chunk of raw texts: one (content ID, estimated tokens) pair per text."""
+    return [(content_particle_id(text), estimate_token_count(text)) for text in texts]
+
+
+def build_particles(rows: List[Tuple[str, str, Dict]], timestamp: str,
+                    embedder: Optional[HashingEmbedder]) -> Tuple[List[InsightParticle], Optional[np.ndarray]]:
+    """
+    Builds particles from (particle ID, text, enrichment attributes) rows and, with a
+    local embedder, their embedding vectors.
+    """
+    ips = [
+        InsightParticle(
+            particle_id=particle_id,
+            core_data=text,
+            resonance_keys=attributes.get("resonance_keys", []),
+            signifiers=attributes.get("signifiers", []),
+            situational_imprint=attributes.get("situational_imprint"),
+            extracted_entities=attributes.get("extracted_entities", []),
+            creation_timestamp=timestamp,
+        )
+        for particle_id, text, attributes in rows
+    ]
+    vectors = embedder.embed([particle_embedding_text(ip) for ip in ips]) if embedder is not None and ips else None
+    return ips, vectors
+
+
+class IngestCheckpoint:
+    """
+    Resume point of a bulk ingestion job, kept in a small JSON file.
+
+    Sources are read in a fixed order and chunks are committed in that order, so the
+    position of the last committed record (plus the sources already finished) is
+    enough to resume. The file is replaced atomically after every committed chunk.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.completed_sources: Set[str] = set()
+        self.source: Optional[str] = None
+        self.records = 0
+        self.last_particle_id: Optional[str] = None
+        self.stats: Dict[str, int] = {"records": 0, "ingested": 0, "duplicates": 0, "failed": 0}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"Unsupported ingestion checkpoint version in {path}")
+            self.completed_sources = set(state["completed_sources"])
+            self.source = state["position"]["source"]
+            self.records = state["position"]["records"]
+            self.last_particle_id = state["position"].get("last_particle_id")
+            self.stats.update(state["stats"])
+
+    def resume_offset(self, source: str) -> int:
+        """Records of `source` that were already committed."""
+        return self.records if source == self.source else 0
+
+    def save(self):
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "completed_sources": sorted(self.completed_sources),
+            "position": {"source": self.source, "records": self.records, "last_particle_id": self.last_particle_id},
+            "stats": self.stats,
+        }
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.path)
+
+
+class _Chunk:
+    __slots__ = ("number", "records", "end_source", "end_records", "completed_sources", "ids", "tokens",
+                 "new_positions", "links", "committed", "succeeded")
+
+    def __init__(self, number: int, records: List[SourceRecord]):
+        self.number = number
+        self.records = records
+        self.end_source = records[-1].source if records else None
+        self.end_records = records[-1].index + 1 if records else 0
+        self.completed_sources: List[str] = []
+        self.ids: List[str] = []
+        self.tokens: List[int] = []
+        # Positions in `records` of the texts that are not duplicates
+        self.new_positions: List[int] = []
+        self.links: List[Tuple[str, str]] = []
+        self.committed = asyncio.Event()
+        self.succeeded = False
+
+
+class BulkIngestor:
+    """
+    Loads large corpora into an agent's memory in chunks.
+
+    Input files are streamed record by record and grouped into chunks of `chunk_size`.
+    For each chunk, hashing, sizing and (with the local HashingEmbedder) particle and
+    embedding construction run in a process pool. Enrichment goes through the async
+    SOI, whose semaphore bounds the LLM requests in flight, while up to
+    `max_chunks_in_flight` chunks are enriched concurrently. Finished chunks are
+    committed strictly in input order with one bulk write to the store and the indexes
+    (ConversationalAgent.add_particles_bulk), and the checkpoint is advanced after
+    each commit, so an interrupted job resumes at the first uncommitted chunk.
+
+    Particle IDs are derived from the normalized text, which makes deduplication
+    exact and restart-safe: texts already in memory, or seen earlier in the run, are
+    skipped before enrichment, and a chunk re-read after a crash between its commit
+    and the checkpoint write is recognized as already stored. Consecutive new records
+    of a source are chained with temporal_next strands.
+    """
+    def __init__(self, agent: "ConversationalAgent", soi: AsyncSemanticOracleInterface,
+                 checkpoint_path: Optional[str] = None, chunk_size: int = 256, max_chunks_in_flight: int = 4,
+                 executor: Optional[Executor] = None, include_responses: bool = False,
+                 passage_tokens: int = DEFAULT_PASSAGE_TOKENS):
+        self.agent = agent
+        self.soi = soi
+        self.checkpoint = IngestCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.chunk_size = chunk_size
+        self.max_chunks_in_flight = max_chunks_in_flight
+        self.executor = executor
+        self.include_responses = include_responses
+        self.passage_tokens = passage_tokens
+        self.stats: Dict[str, int] = dict(self.checkpoint.stats) if self.checkpoint else {
+            "records": 0, "ingested": 0, "duplicates": 0, "failed": 0}
+        # IDs of chunks read but not yet committed, for deduplication within the run
+        self._pending_ids: Set[str] = set()
+        self._last_particle_id: Optional[str] = self.checkpoint.last_particle_id if self.checkpoint else None
+        self._last_source: Optional[str] = self.checkpoint.source if self.checkpoint else None
+
+    def _read_chunks(self, sources: List[str]) -> Iterator[Tuple[List[SourceRecord], List[str]]]:
+        """Yields (records, sources finished within them) in chunk_size groups across all sources."""
+        records: List[SourceRecord] = []
+        finished: List[str] = []
+        for source in sources:
+            if self.checkpoint is not None and source in self.checkpoint.completed_sources:
+                continue
+            skip = self.checkpoint.resume_offset(source) if self.checkpoint is not None else 0
+            try:
+                texts = iter_source_texts(source, self.include_responses, self.passage_tokens)
+                for index, text in enumerate(texts):
+                    if index < skip:
+                        continue
+                    records.append(SourceRecord(source, index, text))
+                    if len(records) >= self.chunk_size:
+                        yield records, finished
+                        records, finished = [], []
+            except OSError as e:
+                log_error(f"Ingestion: cannot read {source}: {e}")
+            finished.append(source)
+        if records or finished:
+            yield records, finished
+
+    async def _run_cpu(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _prepare(self, chunk: _Chunk):
+        """Hashes the chunk and drops texts that are already stored or pending, then plans temporal links."""
+        prepared = await self._run_cpu(prepare_texts, [record.text for record in chunk.records])
+        chunk.ids = [particle_id for particle_id, _ in prepared]
+        chunk.tokens = [tokens for _, tokens in prepared]
+        stored = await asyncio.to_thread(self.agent.existing_particle_ids, set(chunk.ids))
+        for position, (record, particle_id) in enumerate(zip(chunk.records, chunk.ids)):
+            if particle_id not in stored and particle_id not in self._pending_ids:
+                self._pending_ids.add(particle_id)
+                chunk.new_positions.append(position)
+                if record.source == self._last_source and self._last_particle_id is not None:
+                    chunk.links.append((self._last_particle_id, particle_id))
+            # A duplicate continues the chain from its stored copy (e.g. records re-read after a crash)
+            self._last_source, self._last_particle_id = record.source, particle_id
+
+    async def _process(self, chunk: _Chunk, previous: Optional[_Chunk]):
+        try:
+            texts = [chunk.records[position].text for position in chunk.new_positions]
+            with span("ingest.enrich", chunk=chunk.number, texts=len(texts)):
+                all_attributes = await self.soi.enrich_texts_to_ip_attributes(texts) if texts else []
+
+            rows, failed_ids = [], set()
+            for position, attributes in zip(chunk.new_positions, all_attributes):
+                record = chunk.records[position]
+                if attributes:
+                    rows.append((chunk.ids[position], record.text, attributes))
+                else:
+                    failed_ids.add(chunk.ids[position])
+                    log_error(f"Ingestion: enrichment failed for record {record.index} of {record.source}; skipped.")
+            embedder = self.agent.embedding_store.embedder if self.agent._indexes_built else None
+            if not isinstance(embedder, HashingEmbedder):
+                embedder = None
+            ips, vectors = await self._run_cpu(build_particles, rows, datetime.utcnow().isoformat(), embedder)
+            links = [(previous_id, next_id) for previous_id, next_id in chunk.links
+                     if previous_id not in failed_ids and next_id not in failed_ids]
+
+            if previous is not None:
+                await previous.committed.wait()
+                if not previous.succeeded:  # Committing past a lost chunk would skip it on resume
+                    raise RuntimeError(f"Ingestion: chunk {previous.number} was not committed")
+            with span("ingest.commit", chunk=chunk.number, particles=len(ips)):
+                await asyncio.to_thread(self.agent.add_particles_bulk, ips, vectors, links)
+            chunk.succeeded = True
+            self._record_commit(chunk, len(ips), len(failed_ids))
+        finally:
+            for position in chunk.new_positions:
+                self._pending_ids.discard(chunk.ids[position])
+            chunk.committed.set()
+
+    def _record_commit(self, chunk: _Chunk, ingested: int, failed: int):
+        self.stats["records"] += len(chunk.records)
+        self.stats["ingested"] += ingested
+        self.stats["duplicates"] += len(chunk.records) - len(chunk.new_positions)
+        self.stats["failed"] += failed
+        METRICS.inc("cognitive_weave_ingest_records_total", len(chunk.records))
+        METRICS.inc("cognitive_weave_ingest_particles_total", ingested)
+        METRICS.inc("cognitive_weave_ingest_duplicates_total", len(chunk.records) - len(chunk.new_positions))
+        if failed:
+            METRICS.inc("cognitive_weave_ingest_failed_total", failed)
+        if self.checkpoint is None:
+            return
+        self.checkpoint.completed_sources.update(chunk.completed_sources)
+        if chunk.end_source is not None:
+            self.checkpoint.source, self.checkpoint.records = chunk.end_source, chunk.end_records
+        if chunk.ids:
+            self.checkpoint.last_particle_id = chunk.ids[-1]
+        self.checkpoint.stats = dict(self.stats)
+        self.checkpoint.save()
+
+    async def run(self, paths: Sequence[str]) -> Dict[str, int]:
+        """Ingests every file under `paths` (resuming from the checkpoint, if any); returns the job totals."""
+        sources = discover_sources(paths)
+        log_info(f"Ingestion: {len(sources)} source file(s), chunks of {self.chunk_size} records.")
+        started = time.perf_counter()
+        in_flight: Set[asyncio.Task] = set()
+        previous: Optional[_Chunk] = None
+        try:
+            for number, (records, finished) in enumerate(self._read_chunks(sources)):
+                while len(in_flight) >= self.max_chunks_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                chunk = _Chunk(number, records)
+                chunk.completed_sources = finished
+                await self._prepare(chunk)
+                in_flight.add(asyncio.create_task(self._process(chunk, previous)))
+                previous = chunk
+            if in_flight:
+                for task in await asyncio.gather(*in_flight, return_exceptions=True):
+                    if isinstance(task, BaseException):
+                        raise task
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            raise
+        elapsed = time.perf_counter() - started
+        log_info(f"Ingestion finished in {elapsed:.1f}s: {self.stats}")
+        return dict(self.stats)
+
+
+def default_worker_count() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def make_process_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """Process pool for the CPU-bound ingestion stages, or None to run them inline (workers=0)."""
+    workers = default_worker_count() if workers is None else workers
+    return ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
@@ -0,0 +1,268 @@
+# cognitive_weave_poc/cognitive_weave/keyword_index.py
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .data_structures import InsightParticle
+from .utils import extract_keywords
+
+# Fields of an InsightParticle ranked by BM25FIndex, in column order
+BM25F_FIELDS = ("resonance_keys", "signifiers", "situational_imprint", "extracted_entities")
+DEFAULT_FIELD_WEIGHTS = {"resonance_keys": 2.0, "signifiers": 1.0, "situational_imprint": 1.0, "extracted_entities": 1.0}
+DEFAULT_FIELD_B = {"resonance_keys": 0.5, "signifiers": 0.5, "situational_imprint": 0.75, "extracted_entities": 0.5}
+
+
+class _TermColumn:
+    """One term's column of the term-document matrix: document rows and per-field frequencies."""
+    __slots__ = ("rows", "frequencies", "size")
+
+    def __init__(self, field_count: int):
+        self.rows = np.empty(4, dtype=np.int64)
+        self.frequencies = np.empty((4, field_count), dtype=np.float32)
+        self.size = 0
+
+    def append(self, row: int, frequencies: List[float]):
+        if self.size == len(self.rows):
+            self.rows = np.resize(self.rows, self.size * 2)
+            self.frequencies = np.resize(self.frequencies, (self.size * 2, self.frequencies.shape[1]))
+        self.rows[self.size] = row
+        self.frequencies[self.size] = frequencies
+        self.size += 1
+
+
+class BM25FIndex:
+    """
+    Incremental BM25F ranker over the resonance-key, signifier, imprint and entity fields.
+
+    Term frequencies are kept in a sparse term-document matrix stored column by column:
+    every term owns NumPy arrays of the rows it occurs in and its frequency in each field.
+    At query time each field frequency is length-normalized against that field's average
+    length, the fields are combined with their weights and the sum is saturated once
+    (BM25F), then scaled by the term's IDF, so words most particles share count little.
+    Document frequencies and field lengths are maintained on every add/remove, so adding
+    a particle only appends to its terms' columns. Removed rows are masked and compacted
+    away in bulk.
+
+    `search` returns (particle, score) pairs best first; `search_many` and `score_many`
+    rank a batch of queries with one sparse product, sharing the column work of terms
+    that several queries use.
+    """
+    def __init__(self, tokenizer: Callable[[str], Set[str]] = extract_keywords,
+                 resolver: Optional[Callable[[str], Optional[InsightParticle]]] = None,
+                 field_weights: Optional[Dict[str, float]] = None, field_b: Optional[Dict[str, float]] = None,
+                 k1: float = 1.2, initial_capacity: int = 1024):
+        self._tokenize = tokenizer
+        self._resolve = resolver
+        field_weights = {**DEFAULT_FIELD_WEIGHTS, **(field_weights or {})}
+        field_b = {**DEFAULT_FIELD_B, **(field_b or {})}
+        self._weights = np.array([field_weights[field] for field in BM25F_FIELDS], dtype=np.float32)
+        self._b = np.array([field_b[field] for field in BM25F_FIELDS], dtype=np.float32)
+        self.k1 = k1
+        self._columns: Dict[str, _TermColumn] = {}
+        self._document_frequency: Dict[str, int] = {}
+        self._particles: Dict[str, Optional[InsightParticle]] = {}
+        self._indexed_terms: Dict[str, List[str]] = {}
+        self._row_by_id: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        capacity = max(1, initial_capacity)
+        self._lengths = np.zeros((capacity, len(BM25F_FIELDS)), dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._order = np.zeros(capacity, dtype=np.int64)
+        self._length_sums = np.zeros(len(BM25F_FIELDS), dtype=np.float64)
+        self._dead_rows = 0
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._particles)
+
+    def __contains__(self, particle_id: str) -> bool:
+        return particle_id in self._particles
+
+    def field_frequencies(self, ip: InsightParticle) -> Tuple[Dict[str, List[float]], List[float]]:
+        """Per-term frequency in each field, and each field's length in terms."""
+        fields = (ip.resonance_keys, ip.signifiers,
+                  [ip.situational_imprint] if ip.situational_imprint else [], ip.extracted_entities or [])
+        frequencies: Dict[str, List[float]] = {}
+        lengths = [0.0] * len(BM25F_FIELDS)
+        for field, entries in enumerate(fields):
+            for entry in entries:
+                terms = self._tokenize(entry)
+                lengths[field] += len(terms)
+                for term in terms:
+                    counts = frequencies.get(term)
+                    if counts is None:
+                        counts = frequencies[term] = [0.0] * len(BM25F_FIELDS)
+                    counts[field] += 1
+        return frequencies, lengths
+
+    def add(self, ip: InsightParticle):
+        """Indexes a particle. Re-adding a known particle refreshes its postings and keeps its rank order."""
+        previous_row = self._row_by_id.get(ip.particle_id)
+        if previous_row is not None:
+            order = int(self._order[previous_row])
+            self.remove(ip.particle_id)
+        else:
+            order = self._next_order
+            self._next_order += 1
+
+        row = len(self._row_ids)
+        if row == len(self._alive):
+            self._grow_rows(row * 2)
+        frequencies, lengths = self.field_frequencies(ip)
+        self._row_ids.append(ip.particle_id)
+        self._row_by_id[ip.particle_id] = row
+        self._alive[row] = True
+        self._order[row] = order
+        self._lengths[row] = lengths
+        self._length_sums += lengths
+        self._particles[ip.particle_id] = ip if self._resolve is None else None
+        self._indexed_terms[ip.particle_id] = list(frequencies)
+        for term, counts in frequencies.items():
+            column = self._columns.get(term)
+            if column is None:
+                column = self._columns[term] = _TermColumn(len(BM25F_FIELDS))
+            column.append(row, counts)
+            self._document_frequency[term] = self._document_frequency.get(term, 0) + 1
+
+    def add_many(self, ips: Iterable[InsightParticle]):
+        for ip in ips:
+            self.add(ip)
+
+    def remove(self, particle_id: str):
+        """Masks a particle's row; its column entries are dropped at the next compaction."""
+        row = self._row_by_id.pop(particle_id, None)
+        if row is None:
+            return
+        del self._particles[particle_id]
+        self._alive[row] = False
+        self._row_ids[row] = None
+        self._length_sums -= self._lengths[row]
+        self._dead_rows += 1
+        for term in self._indexed_terms.pop(particle_id, []):
+            remaining = self._document_frequency.get(term, 0) - 1
+            if remaining > 0:
+                self._document_frequency[term] = remaining
+            else:
+                self._document_frequency.pop(term, None)
+                self._columns.pop(term, None)
+        if self._dead_rows > max(1024, len(self._particles)):
+            self._compact()
+
+    def _grow_rows(self, capacity: int):
+        self._lengths = np.resize(self._lengths, (capacity, len(BM25F_FIELDS)))
+        self._alive = np.resize(self._alive, capacity)
+        self._alive[len(self._row_ids):] = False
+        self._order = np.resize(self._order, capacity)
+
+    def _compact(self):
+        """Drops removed rows from every column and renumbers the remaining rows densely."""
+        live_rows = len(self._row_ids)
+        alive = self._alive[:live_rows]
+        new_row = np.cumsum(alive) - 1
+        for column in self._columns.values():
+            rows = column.rows[:column.size]
+            keep = alive[rows]
+            column.rows = new_row[rows[keep]]
+            column.frequencies = column.frequencies[:column.size][keep]
+            column.size = len(column.rows)
+        kept = np.flatnonzero(alive)
+        self._lengths[:len(kept)] = self._lengths[kept]
+        self._order[:len(kept)] = self._order[kept]
+        self._alive[:live_rows] = False
+        self._alive[:len(kept)] = True
+        self._row_ids = [self._row_ids[row] for row in kept]
+        self._row_by_id = {particle_id: row for row, particle_id in enumerate(self._row_ids)}
+        self._dead_rows = 0
+
+    def _term_scores(self, term: str, average_lengths: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """The rows containing `term` and the term's BM25F contribution to each of them."""
+        column = self._columns.get(term)
+        if column is None:
+            return None
+        rows = column.rows[:column.size]
+        frequencies = column.frequencies[:column.size]
+        alive = self._alive[rows]
+        if not alive.all():
+            rows, frequencies = rows[alive], frequencies[alive]
+        document_frequency = self._document_frequency[term]
+        idf = np.log1p((len(self._particles) - document_frequency + 0.5) / (document_frequency + 0.5))
+        normalization = (1.0 - self._b) + self._b * (self._lengths[rows] / average_lengths)
+        pseudo_frequency = (frequencies / normalization) @ self._weights
+        return rows, idf * pseudo_frequency * (self.k1 + 1.0) / (self.k1 + pseudo_frequency)
+
+    def _score_batch(self, queries: Sequence[Set[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sparse product of the query-term matrix with the term-document matrix.
+
+        Returns parallel arrays (query position, row, score) with one entry per query and
+        row that share a term. Each term's column is scored once for the whole batch.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        if not self._particles:
+            return empty
+        average_lengths = (self._length_sums / len(self._particles)).astype(np.float32)
+        average_lengths[average_lengths <= 0] = 1.0
+        term_scores: Dict[str, Optional[Tuple[np.ndarray, np.ndarray]]] = {}
+        query_parts, row_parts, score_parts = [], [], []
+        for position, query_keywords in enumerate(queries):
+            for term in query_keywords:
+                if term not in term_scores:
+                    term_scores[term] = self._term_scores(term, average_lengths)
+                scored = term_scores[term]
+                if scored is None:
+                    continue
+                query_parts.append(np.full(len(scored[0]), position, dtype=np.int64))
+                row_parts.append(scored[0])
+                score_parts.append(scored[1])
+        if not row_parts:
+            return empty
+        stride = len(self._row_ids)
+        keys, inverse = np.unique(np.concatenate(query_parts) * stride + np.concatenate(row_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        return keys // stride, keys % stride, scores
+
+    def score(self, query_keywords: Set[str]) -> Dict[str, float]:
+        """BM25F score of every particle that shares at least one query keyword."""
+        return self.score_many([query_keywords])[0]
+
+    def score_many(self, queries: Sequence[Set[str]]) -> List[Dict[str, float]]:
+        """`score` for a batch of queries, in query order."""
+        results: List[Dict[str, float]] = [{} for _ in queries]
+        for position, row, score in zip(*(array.tolist() for array in self._score_batch(queries))):
+            results[position][self._row_ids[row]] = score
+        return results
+
+    def postings_touched(self, query_keywords: Set[str]) -> int:
+        """Number of column entries a query scores, i.e. the work `score` does for it."""
+        return sum(self._columns[term].size for term in query_keywords if term in self._columns)
+
+    def search(self, query_keywords: Set[str], top_k: Optional[int] = None) -> List[Tuple[InsightParticle, float]]:
+        """
+        Ranks particles by BM25F score.
+
+        Args:
+            query_keywords: Preprocessed query keywords.
+            top_k: Maximum number of results, or None for all matching particles.
+
+        Returns:
+            (particle, score) pairs sorted by score descending. Ties keep insertion order.
+        """
+        return self.search_many([query_keywords], top_k=top_k)[0]
+
+    def search_many(self, queries: Sequence[Set[str]],
+                    top_k: Optional[int] = None) -> List[List[Tuple[InsightParticle, float]]]:
+        """`search` for a batch of queries (e.g. offline evaluation or bulk re-ranking), in query order."""
+        positions, rows, scores = self._score_batch(queries)
+        ranking = np.lexsort((self._order[rows], -scores, positions))
+        positions, rows, scores = positions[ranking], rows[ranking], scores[ranking]
+        if top_k is not None:
+            group_starts = np.searchsorted(positions, positions, side="left")
+            keep = (np.arange(len(positions)) - group_starts) < top_k
+            positions, rows, scores = positions[keep], rows[keep], scores[keep]
+        results: List[List[Tuple[InsightParticle, float]]] = [[] for _ in queries]
+        for position, row, score in zip(positions.tolist(), rows.tolist(), scores.tolist()):
+            particle_id = self._row_ids[row]
+            ip = self._resolve(particle_id) if self._resolve is not None else self._particles[particle_id]
+            results[position].append((ip, score))
+        return results
@@ -0,0 +1,210 @@
+# cognitive_weave_poc/cognitive_weave/lifecycle.py
+
+import math
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .data_structures import InsightParticle
+from .telemetry import METRICS
+from .utils import log_info
+
+ResolveFn = Callable[[str], Optional[InsightParticle]]
+PersistFn = Callable[[List[InsightParticle]], None]
+RemoveFn = Callable[[List[str]], None]
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ImportanceModel:
+    """
+    Scores a particle in [0, 1] from recency, access frequency and IA provenance.
+
+    - recency halves every `half_life_hours` since the last access (or creation)
+    - frequency grows logarithmically with `access_frequency`, saturating at `frequency_saturation`
+    - provenance rewards IAs by the number of IPs they summarize; an IP already covered
+      by an IA gets none, an uncovered IP (the only copy of its content) gets half
+    """
+    def __init__(self, half_life_hours: float = 24 * 7, recency_weight: float = 0.45, frequency_weight: float = 0.35,
+                 provenance_weight: float = 0.2, frequency_saturation: int = 20, provenance_saturation: int = 10):
+        self.half_life_hours = half_life_hours
+        self.recency_weight = recency_weight
+        self.frequency_weight = frequency_weight
+        self.provenance_weight = provenance_weight
+        self.frequency_saturation = frequency_saturation
+        self.provenance_saturation = provenance_saturation
+
+    def score(self, ip: InsightParticle, now: datetime, covered: bool) -> float:
+        reference = (_parse_timestamp(ip.last_access_timestamp) or _parse_timestamp(ip.modification_timestamp)
+                     or _parse_timestamp(ip.creation_timestamp) or now)
+        age_hours = max(0.0, (now - reference).total_seconds() / 3600.0)
+        recency = 0.5 ** (age_hours / self.half_life_hours)
+        frequency = min(1.0, math.log1p(ip.access_frequency) / math.log1p(self.frequency_saturation))
+        if ip.is_aggregate:
+            provenance = min(1.0, math.log1p(len(ip.derived_from_ids)) / math.log1p(self.provenance_saturation))
+        else:
+            provenance = 0.0 if covered else 0.5
+        return (self.recency_weight * recency + self.frequency_weight * frequency
+                + self.provenance_weight * provenance)
+
+
+class TieredMemoryManager:
+    """
+    Access tracking, importance decay and tiered eviction for one agent's memory.
+
+    Retrieval only bumps an in-memory counter per hit; every `flush_interval` recorded
+    accesses (and before maintenance) the counts are applied to the particles'
+    `access_frequency`, `last_access_timestamp` and `importance_score` and persisted in
+    one batch. With `hot_capacity` set (durable memory), the most recently used
+    particles are pinned in RAM and colder ones are demoted to the store, which
+    re-materializes them on demand. `collect_garbage` removes IPs that an IA already
+    covers once their importance decays below `gc_threshold`; it examines at most
+    `gc_batch_size` of them per call, oldest coverage first, so its cost is bounded
+    regardless of memory size. IAs and uncovered IPs are never collected.
+    """
+    def __init__(self, resolve: ResolveFn, persist: PersistFn, remove: RemoveFn,
+                 model: Optional[ImportanceModel] = None, hot_capacity: Optional[int] = None,
+                 flush_interval: int = 256, gc_threshold: float = 0.1, gc_batch_size: int = 500):
+        self.resolve = resolve
+        self.persist = persist
+        self.remove = remove
+        self.model = model if model is not None else ImportanceModel()
+        self.hot_capacity = hot_capacity
+        self.flush_interval = flush_interval
+        self.gc_threshold = gc_threshold
+        self.gc_batch_size = gc_batch_size
+
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._pending_total = 0
+        self._hot: "OrderedDict[str, InsightParticle]" = OrderedDict()
+        # IPs derived into some IA, in the order they were first covered
+        self._covered: "OrderedDict[str, None]" = OrderedDict()
+        self.collected_count = 0
+        self.demoted_count = 0
+
+    @property
+    def hot_count(self) -> int:
+        return len(self._hot)
+
+    def is_covered(self, particle_id: str) -> bool:
+        return particle_id in self._covered
+
+    def note_aggregate(self, ia: InsightParticle, source_ids: Optional[Iterable[str]] = None):
+        """
+        Marks IPs an IA summarizes as covered, and so eligible for collection.
+
+        Args:
+            ia: A new, refreshed or warm-started IA.
+            source_ids: The IPs whose imprints went into the IA's current content; for a
+                refresh these are only the newly synthesized ones (the earlier sources were
+                covered when they went in). Defaults to all of `ia.derived_from_ids`.
+        """
+        for particle_id in (ia.derived_from_ids if source_ids is None else source_ids):
+            self._covered.setdefault(particle_id, None)
+
+    def admit(self, ip: InsightParticle):
+        """Pins a particle in the hot set, demoting the least recently used ones beyond capacity."""
+        if self.hot_capacity is None:
+            return
+        with self._lock:
+            self._hot[ip.particle_id] = ip
+            self._hot.move_to_end(ip.particle_id)
+            demoted = 0
+            while len(self._hot) > self.hot_capacity:
+                self._hot.popitem(last=False)
+                demoted += 1
+        if demoted:
+            self.demoted_count += demoted
+            METRICS.inc("cognitive_weave_memory_demotions_total", demoted)
+
+    def record_access(self, ips: List[InsightParticle]) -> bool:
+        """Counts one access per retrieved particle. Returns True once a flush is due."""
+        with self._lock:
+            for ip in ips:
+                self._pending[ip.particle_id] += 1
+                self._pending_total += 1
+            due = self._pending_total >= self.flush_interval
+        for ip in ips:
+            self.admit(ip)
+        return due
+
+    def flush(self, now: Optional[datetime] = None) -> int:
+        """Applies the pending access counts and persists the touched particles in one batch."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_total = 0
+        if not pending:
+            return 0
+        now = now or datetime.utcnow()
+        timestamp = now.isoformat()
+        touched = []
+        for particle_id, count in pending.items():
+            ip = self.resolve(particle_id)
+            if ip is None:  # Collected since it was retrieved
+                continue
+            ip.access_frequency += count
+            ip.last_access_timestamp = timestamp
+            ip.importance_score = self.model.score(ip, now, self.is_covered(particle_id))
+            touched.append(ip)
+        self.persist(touched)
+        METRICS.inc("cognitive_weave_memory_access_flushes_total")
+        return len(touched)
+
+    def collect_garbage(self, protected: Set[str] = frozenset(), now: Optional[datetime] = None) -> List[str]:
+        """
+        Re-scores up to `gc_batch_size` covered IPs and removes those below `gc_threshold`.
+
+        Survivors move to the back of the queue with their refreshed score persisted.
+        """
+        now = now or datetime.utcnow()
+        batch = []
+        for particle_id in self._covered:
+            if len(batch) >= self.gc_batch_size:
+                break
+            batch.append(particle_id)
+
+        collected, rescored = [], []
+        for particle_id in batch:
+            del self._covered[particle_id]
+            ip = self.resolve(particle_id)
+            if ip is None or ip.is_aggregate:
+                continue
+            score = self.model.score(ip, now, covered=True)
+            if score < self.gc_threshold and particle_id not in protected:
+                collected.append(particle_id)
+                continue
+            self._covered[particle_id] = None
+            if score != ip.importance_score:
+                ip.importance_score = score
+                rescored.append(ip)
+
+        if rescored:
+            self.persist(rescored)
+        if collected:
+            with self._lock:
+                for particle_id in collected:
+                    self._hot.pop(particle_id, None)
+                    self._pending.pop(particle_id, None)
+            self.remove(collected)
+            self.collected_count += len(collected)
+            METRICS.inc("cognitive_weave_memory_gc_collected_total", len(collected))
+            log_info(f"Lifecycle: collected {len(collected)} low-importance IPs covered by aggregates.")
+        return collected
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hot": len(self._hot),
+            "covered": len(self._covered),
+            "pending_accesses": self._pending_total,
+            "demoted": self.demoted_count,
+            "collected": self.collected_count,
+        }
@@ -0,0 +1,144 @@
+# cognitive_weave_poc/cognitive_weave/offline_provider.py
+
+import json
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .embedding_store import HashingEmbedder
+from .providers import LLMProvider, Messages
+from .semantic_oracle import ENRICHMENT_SYSTEM_PROMPT, SYNTHESIS_SYSTEM_PROMPT
+from .utils import STOPWORDS
+
+# Fixed label set the offline model draws signifiers from
+OFFLINE_SIGNIFIERS = [
+    "personal update", "health", "work", "planning", "technical issue", "user feedback",
+    "project management", "learning", "finance", "travel", "relationships", "strategic decision",
+    "daily routine", "problem report", "preference", "question",
+]
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9'-]*")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_SINGLE_TEXT_RE = re.compile(r"Text for Analysis:\n---\n(.*)\n---\n", re.DOTALL)
+_BATCH_TEXT_RE = re.compile(r"\[Text (\d+)\]\n(.*?)\n\[End of Text \1\]", re.DOTALL)
+_IMPRINT_RE = re.compile(r'^- Imprint \d+: "(.*)"$', re.MULTILINE)
+_QUERY_MEMORY_RE = re.compile(r"^Memory \d+", re.MULTILINE)
+
+
+def _stable_hash(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _ranked_keywords(text: str, limit: int) -> List[str]:
+    """Content words by frequency, ties broken by first occurrence."""
+    words = [word.lower() for word in _WORD_RE.findall(text)]
+    words = [word for word in words if word not in STOPWORDS and len(word) > 2]
+    counts = Counter(words)
+    first_seen = {}
+    for position, word in enumerate(words):
+        first_seen.setdefault(word, position)
+    return sorted(counts, key=lambda word: (-counts[word], first_seen[word]))[:limit]
+
+
+def _signifiers(keywords: List[str], count: int) -> List[str]:
+    labels = []
+    for keyword in keywords:
+        label = OFFLINE_SIGNIFIERS[_stable_hash(keyword) % len(OFFLINE_SIGNIFIERS)]
+        if label not in labels:
+            labels.append(label)
+        if len(labels) == count:
+            break
+    return labels or [OFFLINE_SIGNIFIERS[0]]
+
+
+def _first_sentence(text: str, limit: int = 200) -> str:
+    sentence = _SENTENCE_END_RE.split(text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + "..."
+
+
+def offline_enrichment(text: str) -> Dict:
+    """Deterministic, schema-valid IP enrichment of one text."""
+    keywords = _ranked_keywords(text, 7)
+    entities = []
+    for match in _WORD_RE.finditer(text):
+        word = match.group(0)
+        preceding = text[:match.start()].rstrip()
+        # Capitalized words that do not start a sentence are treated as named entities
+        if word[0].isupper() and preceding and preceding[-1] not in ".!?" and word not in entities:
+            entities.append(word)
+    return {
+        "resonance_keys": keywords or ["note"],
+        "signifiers": _signifiers(keywords, 3),
+        "situational_imprint": _first_sentence(text) or "Empty note.",
+        "extracted_entities": entities[:5],
+    }
+
+
+def offline_synthesis(imprints: List[str]) -> Dict:
+    """Deterministic, schema-valid IA synthesis from situational imprints."""
+    themes = _ranked_keywords(" ".join(imprints), 5) or ["notes"]
+    theme_text = ", ".join(themes[:3])
+    return {
+        "ia_core_data": f"Across {len(imprints)} related notes the recurring themes are {theme_text}.",
+        "ia_resonance_keys": themes,
+        "ia_signifiers": _signifiers(themes, 2),
+        "ia_situational_imprint": f"Synthesis of {len(imprints)} related notes about {theme_text}.",
+    }
+
+
+class OfflineProvider(LLMProvider):
+    """
+    Deterministic, network-free provider for benchmarks, load tests and CI.
+
+    It recognises the SOI's enrichment (single and batched) and synthesis prompts and
+    answers them with schema-valid JSON derived from the input text alone: keyword
+    frequency for keys, a fixed label set for signifiers, the first sentence as the
+    imprint. Conversational prompts get a short templated reply, and embeddings come
+    from the local HashingEmbedder. The same input always yields the same output.
+    """
+    name = "offline"
+
+    def __init__(self, embedding_dim: int = 256):
+        self.chat_model = "offline-deterministic"
+        self.embedding_model = f"offline-hashing-{embedding_dim}"
+        self._embedder = HashingEmbedder(dim=embedding_dim)
+
+    def complete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                 json_mode: bool = False, model: Optional[str] = None) -> str:
+        system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        user = messages[-1]["content"] if messages else ""
+
+        if system == ENRICHMENT_SYSTEM_PROMPT:
+            batch = _BATCH_TEXT_RE.findall(user)
+            if batch:
+                results = [dict(offline_enrichment(text), index=int(index)) for index, text in batch]
+                return json.dumps({"results": results})
+            match = _SINGLE_TEXT_RE.search(user)
+            return json.dumps(offline_enrichment(match.group(1) if match else user))
+        if system == SYNTHESIS_SYSTEM_PROMPT:
+            return json.dumps(offline_synthesis(_IMPRINT_RE.findall(user)))
+
+        memory_count = len(_QUERY_MEMORY_RE.findall(system))
+        keywords = _ranked_keywords(user, 3)
+        reply = f"(offline) You asked about {', '.join(keywords) if keywords else 'that'}; I found {memory_count} related memories."
+        return json.dumps({"response": reply}) if json_mode else reply
+
+    def stream_complete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                        model: Optional[str] = None):
+        text = self.complete(messages, temperature=temperature, max_tokens=max_tokens, model=model)
+        for word in re.findall(r"\S+\s*", text):
+            yield word
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        return self._embedder.embed(texts).tolist()
+
+    async def acomplete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        return self.complete(messages, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode, model=model)
+
+    async def astream_complete(self, messages, *, temperature, max_tokens, model=None):
+        for delta in self.stream_complete(messages, temperature=temperature, max_tokens=max_tokens, model=model):
+            yield delta
+
+    async def aembed(self, texts, *, model=None) -> List[List[float]]:
+        return self.embed(texts, model=model)
@@ -0,0 +1,162 @@
+# cognitive_weave_poc/cognitive_weave/oracle_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .telemetry import METRICS
+from .utils import log_info, log_error
+
+
+def make_cache_key(kind: str, template_version: str, model_deployment: str, temperature: float, payload: Any) -> str:
+    """
+    Content address for an SOI request: a SHA-256 over the prompt template version,
+    model deployment, temperature and the canonical JSON form of the input.
+    """
+    material = json.dumps([kind, template_version, model_deployment, temperature, payload],
+                          ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class OracleCache:
+    """
+    Content-addressed cache for validated SOI outputs.
+
+    An in-memory LRU front holds the most recent entries; an optional SQLite back end
+    (WAL mode) keeps a larger, persistent tier that survives restarts. Both tiers are
+    size-bounded: the LRU evicts the least recently used entry, and the disk tier drops
+    its least recently accessed rows in bulk once it exceeds `max_disk_entries`.
+
+    Values are JSON strings of outputs that already passed validation; a hit is
+    re-parsed through the same validation as a fresh LLM response.
+    """
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None, max_disk_entries: int = 1000000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, disk_path: str):
+        directory = os.path.dirname(os.path.abspath(disk_path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS oracle_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS oracle_cache_last_access ON oracle_cache(last_access)")
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM oracle_cache").fetchone()[0]
+        log_info(f"OracleCache: Opened disk tier at {disk_path} with {self._disk_count} entries.")
+
+    def _remember(self, key: str, value: str):
+        """Inserts into the LRU front, evicting the least recently used entries. Caller holds the lock."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value for `key`, or None on a miss."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                METRICS.inc("cognitive_weave_oracle_cache_lookups_total", result="memory_hit")
+                return value
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value FROM oracle_cache WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        self._db.execute("UPDATE oracle_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                        self._remember(key, row[0])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        METRICS.inc("cognitive_weave_oracle_cache_lookups_total", result="disk_hit")
+                        return row[0]
+                except sqlite3.Error as e:
+                    log_error(f"OracleCache: Disk lookup failed: {e}")
+
+            self.misses += 1
+            METRICS.inc("cognitive_weave_oracle_cache_lookups_total", result="miss")
+            return None
+
+    def put(self, key: str, value: str):
+        """Stores a validated value in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+            if self._db is None:
+                return
+            try:
+                now = time.time()
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO oracle_cache (key, value, last_access) VALUES (?, ?, ?)",
+                    (key, value, now)
+                )
+                if cursor.rowcount > 0:
+                    self._disk_count += 1
+                else:
+                    self._db.execute("UPDATE oracle_cache SET value = ?, last_access = ? WHERE key = ?", (value, now, key))
+                if self._disk_count > self.max_disk_entries:
+                    self._evict_disk()
+            except sqlite3.Error as e:
+                log_error(f"OracleCache: Disk write failed: {e}")
+
+    def _evict_disk(self):
+        """Drops the least recently accessed ~10% of the disk tier. Caller holds the lock."""
+        excess = self._disk_count - self.max_disk_entries
+        batch = max(excess, self.max_disk_entries // 10, 1)
+        self._db.execute(
+            "DELETE FROM oracle_cache WHERE key IN"
+            " (SELECT key FROM oracle_cache ORDER BY last_access ASC LIMIT ?)", (batch,)
+        )
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM oracle_cache").fetchone()[0]
+        self.disk_evictions += batch
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_count,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM oracle_cache")
+                self._disk_count = 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,374 @@
+# cognitive_weave_poc/cognitive_weave/persistence.py
+
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.request import pathname2url
+
+from pydantic import PrivateAttr
+
+from .data_structures import InsightParticle
+from .utils import log_info
+
+# Every InsightParticle field except core_data, which lives in its own table
+METADATA_FIELDS = [name for name in InsightParticle.model_fields if name != "core_data"]
+
+
+class StoredInsightParticle(InsightParticle):
+    """
+    InsightParticle materialized from a ParticleStore.
+
+    Built from metadata only; `core_data` is fetched from the store the first time
+    it is accessed and then kept on the instance.
+    """
+    _store: Any = PrivateAttr(default=None)
+    _seq: int = PrivateAttr(default=0)
+
+    def __getattr__(self, name: str):
+        if name == "core_data":
+            value = self._store.load_core_data(self._seq)
+            self.__dict__["core_data"] = value
+            return value
+        return super().__getattr__(name)
+
+    @property
+    def core_data_loaded(self) -> bool:
+        return "core_data" in self.__dict__
+
+
+def _particle_metadata(ip: InsightParticle) -> str:
+    return json.dumps({name: getattr(ip, name) for name in METADATA_FIELDS}, ensure_ascii=False, default=str)
+
+
+class ParticleStore:
+    """
+    Append-only, crash-safe SQLite store for InsightParticle records.
+
+    The database runs in WAL mode, so every committed append survives a process crash
+    and readers never block the writer. Particle metadata and `core_data` payloads are
+    kept in separate tables: warm starts and index rebuilds only scan the compact
+    metadata table, and payloads are read one row at a time on demand.
+
+    With `read_only`, an existing database is opened through a `mode=ro` URI: every
+    write fails and `checkpoint` does nothing, so the file is never modified.
+    """
+    def __init__(self, path: str, synchronous: str = "NORMAL", read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        if read_only:
+            uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+            self._db = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+            return
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS particles ("
+            " seq INTEGER PRIMARY KEY,"
+            " particle_id TEXT NOT NULL UNIQUE,"
+            " is_aggregate INTEGER NOT NULL,"
+            " metadata TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS particles_kind ON particles(is_aggregate, seq)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS payloads (seq INTEGER PRIMARY KEY, core_data TEXT NOT NULL)")
+
+    def _insert(self, ip: InsightParticle) -> int:
+        cursor = self._db.execute(
+            "INSERT INTO particles (particle_id, is_aggregate, metadata) VALUES (?, ?, ?)",
+            (ip.particle_id, int(ip.is_aggregate), _particle_metadata(ip))
+        )
+        seq = cursor.lastrowid
+        self._db.execute("INSERT INTO payloads (seq, core_data) VALUES (?, ?)",
+                         (seq, json.dumps(ip.core_data, ensure_ascii=False, default=str)))
+        return seq
+
+    def append(self, ip: InsightParticle) -> int:
+        """Durably appends one particle and returns its sequence number."""
+        return self.append_many([ip])[0]
+
+    def append_many(self, ips: Iterable[InsightParticle]) -> List[int]:
+        """Appends several particles in a single transaction."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                seqs = [self._insert(ip) for ip in ips]
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return seqs
+
+    def update(self, ip: InsightParticle, seq: Optional[int] = None):
+        """Rewrites a particle's metadata (and its payload, if it has been loaded or set)."""
+        self.update_many([(ip, seq)])
+
+    def update_many(self, updates: Iterable[Tuple[InsightParticle, Optional[int]]]):
+        """Rewrites several particles (with their seq, if known) in a single transaction."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for ip, seq in updates:
+                    if seq is None:
+                        seq = self.seq_of(ip.particle_id)
+                        if seq is None:
+                            raise KeyError(ip.particle_id)
+                    self._db.execute("UPDATE particles SET is_aggregate = ?, metadata = ? WHERE seq = ?",
+                                     (int(ip.is_aggregate), _particle_metadata(ip), seq))
+                    if not isinstance(ip, StoredInsightParticle) or ip.core_data_loaded:
+                        self._db.execute("UPDATE payloads SET core_data = ? WHERE seq = ?",
+                                         (json.dumps(ip.core_data, ensure_ascii=False, default=str), seq))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, seq: int):
+        self.delete_many([seq])
+
+    def delete_many(self, seqs: List[int]):
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("DELETE FROM particles WHERE seq = ?", ((seq,) for seq in seqs))
+            self._db.executemany("DELETE FROM payloads WHERE seq = ?", ((seq,) for seq in seqs))
+            self._db.execute("COMMIT")
+
+    def seq_of(self, particle_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute("SELECT seq FROM particles WHERE particle_id = ?", (particle_id,)).fetchone()
+        return row[0] if row else None
+
+    def existing_ids(self, particle_ids: Iterable[str], batch_size: int = 500) -> Set[str]:
+        """The subset of `particle_ids` that is stored, looked up in batches."""
+        particle_ids = list(particle_ids)
+        found: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(particle_ids), batch_size):
+                batch = particle_ids[start:start + batch_size]
+                placeholders = ",".join("?" * len(batch))
+                found.update(row[0] for row in self._db.execute(
+                    f"SELECT particle_id FROM particles WHERE particle_id IN ({placeholders})", batch))
+        return found
+
+    def stats(self) -> Tuple[int, int, int]:
+        """Returns (row count, min seq, max seq)."""
+        with self._lock:
+            count, min_seq, max_seq = self._db.execute("SELECT COUNT(*), MIN(seq), MAX(seq) FROM particles").fetchone()
+        return count, min_seq or 0, max_seq or 0
+
+    def all_seqs(self) -> array:
+        with self._lock:
+            return array('q', (row[0] for row in self._db.execute("SELECT seq FROM particles ORDER BY seq")))
+
+    def last_seq(self, is_aggregate: Optional[bool] = None) -> Optional[int]:
+        with self._lock:
+            if is_aggregate is None:
+                row = self._db.execute("SELECT MAX(seq) FROM particles").fetchone()
+            else:
+                row = self._db.execute("SELECT MAX(seq) FROM particles WHERE is_aggregate = ?", (int(is_aggregate),)).fetchone()
+        return row[0] if row else None
+
+    def load_metadata(self, seq: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT metadata FROM particles WHERE seq = ?", (seq,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_metadata(self, batch_size: int = 10000) -> Iterator[Tuple[int, Dict]]:
+        """Streams (seq, metadata) pairs in append order without touching payloads."""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT seq, metadata FROM particles WHERE seq > ? ORDER BY seq LIMIT ?", (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, metadata in rows:
+                yield seq, json.loads(metadata)
+            last_seq = rows[-1][0]
+
+    def iter_records(self, batch_size: int = 10000) -> Iterator[Tuple[int, Dict, Any]]:
+        """Streams (seq, metadata, core_data) triples in append order, payloads included."""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT p.seq, p.metadata, d.core_data FROM particles p JOIN payloads d ON d.seq = p.seq"
+                    " WHERE p.seq > ? ORDER BY p.seq LIMIT ?", (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, metadata, core_data in rows:
+                yield seq, json.loads(metadata), json.loads(core_data)
+            last_seq = rows[-1][0]
+
+    def load_core_data(self, seq: int) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT core_data FROM payloads WHERE seq = ?", (seq,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def checkpoint(self):
+        """Folds the WAL back into the main database file (a compacted snapshot)."""
+        if self.read_only:
+            return
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class PersistentMemoryStore:
+    """
+    List-like memory store backed by a ParticleStore, usable as `ConversationalAgent.memory_store`.
+
+    Opening the store only counts rows, so start-up time does not depend on memory
+    size. Particles are materialized on access as StoredInsightParticles (metadata
+    only, `core_data` deferred) through an identity map, so every holder of a
+    particle sees the same instance. Mutated particles are written back with `update`.
+    With `read_only` the underlying ParticleStore rejects every write.
+    """
+    def __init__(self, path: str, checkpoint_interval: int = 1000, read_only: bool = False):
+        self.store = ParticleStore(path, read_only=read_only)
+        self.checkpoint_interval = checkpoint_interval
+        self._appends_since_checkpoint = 0
+        self._identity: "weakref.WeakValueDictionary[int, InsightParticle]" = weakref.WeakValueDictionary()
+        # Index builds materialize particles on their own thread; one instance per particle either way
+        self._identity_lock = threading.Lock()
+        self._seq_by_id: Dict[str, int] = {}
+
+        count, min_seq, max_seq = self.store.stats()
+        self._count = count
+        # While rows are gap-free, position i maps to seq min_seq + i without loading any index
+        self._first_seq = min_seq if count else 1
+        self._seqs: Optional[array] = None if count == 0 or max_seq - min_seq + 1 == count else self.store.all_seqs()
+        log_info(f"PersistentMemoryStore: Opened {path}{' read-only' if read_only else ''} with {count} stored particles.")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _seq_at(self, position: int) -> int:
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("memory store index out of range")
+        if self._seqs is not None:
+            return self._seqs[position]
+        return self._first_seq + position
+
+    def _materialize(self, seq: int, metadata: Optional[Dict] = None) -> InsightParticle:
+        ip = self._identity.get(seq)
+        if ip is not None:
+            return ip
+        if metadata is None:
+            metadata = self.store.load_metadata(seq)
+        with self._identity_lock:
+            ip = self._identity.get(seq)
+            if ip is None:
+                ip = StoredInsightParticle.model_construct(**metadata)
+                ip._store = self.store
+                ip._seq = seq
+                self._identity[seq] = ip
+                self._seq_by_id[ip.particle_id] = seq
+        return ip
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        return self._materialize(self._seq_at(position))
+
+    def __iter__(self) -> Iterator[InsightParticle]:
+        for seq, metadata in self.store.iter_metadata():
+            yield self._materialize(seq, metadata)
+
+    def iter_with_core_data(self) -> Iterator[InsightParticle]:
+        """Like iteration, but fetches every payload in the same batched scan (for full-text index builds)."""
+        for seq, metadata, core_data in self.store.iter_records():
+            ip = self._materialize(seq, metadata)
+            if isinstance(ip, StoredInsightParticle) and not ip.core_data_loaded:
+                ip.__dict__["core_data"] = core_data
+            yield ip
+
+    def get(self, particle_id: str) -> Optional[InsightParticle]:
+        seq = self._seq_by_id.get(particle_id)
+        if seq is None:
+            seq = self.store.seq_of(particle_id)
+        return self._materialize(seq) if seq is not None else None
+
+    def last(self, is_aggregate: Optional[bool] = None) -> Optional[InsightParticle]:
+        """Most recently appended particle, optionally restricted to IPs or IAs."""
+        seq = self.store.last_seq(is_aggregate)
+        return self._materialize(seq) if seq is not None else None
+
+    def _register_appended(self, ips: List[InsightParticle], seqs: List[int]):
+        expected = self._first_seq + self._count
+        if self._seqs is not None:
+            self._seqs.extend(seqs)
+        elif seqs != list(range(expected, expected + len(seqs))):
+            self._seqs = self.store.all_seqs()
+        for ip, seq in zip(ips, seqs):
+            self._identity[seq] = ip
+            self._seq_by_id[ip.particle_id] = seq
+        self._count += len(seqs)
+
+        self._appends_since_checkpoint += len(seqs)
+        if self._appends_since_checkpoint >= self.checkpoint_interval:
+            self.store.checkpoint()
+            self._appends_since_checkpoint = 0
+
+    def append(self, ip: InsightParticle):
+        self._register_appended([ip], [self.store.append(ip)])
+
+    def extend(self, ips: Iterable[InsightParticle]):
+        ips = list(ips)
+        self._register_appended(ips, self.store.append_many(ips))
+
+    def existing_ids(self, particle_ids: Iterable[str]) -> Set[str]:
+        return self.store.existing_ids(particle_ids)
+
+    def update(self, ip: InsightParticle):
+        """Persists in-place changes to a particle (strands, statistics, refreshed content)."""
+        self.store.update(ip, self._seq_by_id.get(ip.particle_id))
+
+    def update_many(self, ips: Iterable[InsightParticle]):
+        """Persists several changed particles in one transaction (e.g. batched access statistics)."""
+        self.store.update_many([(ip, self._seq_by_id.get(ip.particle_id)) for ip in ips])
+
+    def remove(self, particle_id: str):
+        self.remove_many([particle_id])
+
+    def remove_many(self, particle_ids: Iterable[str]):
+        """Deletes several particles in one transaction; raises ValueError for unknown IDs."""
+        seqs = []
+        for particle_id in particle_ids:
+            seq = self._seq_by_id.pop(particle_id, None)
+            if seq is None:
+                seq = self.store.seq_of(particle_id)
+            if seq is None:
+                raise ValueError(f"{particle_id} not in memory store")
+            seqs.append(seq)
+        if not seqs:
+            return
+        self.store.delete_many(seqs)
+        if self._seqs is None:
+            self._seqs = self.store.all_seqs()
+        else:
+            removed = set(seqs)
+            self._seqs = array('q', (seq for seq in self._seqs if seq not in removed))
+        for seq in seqs:
+            self._identity.pop(seq, None)
+        self._count -= len(seqs)
+
+    def close(self):
+        self.store.checkpoint()
+        self.store.close()
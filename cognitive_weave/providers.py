@@ -0,0 +1,302 @@
+# cognitive_weave_poc/cognitive_weave/providers.py
+
+import asyncio
+import json
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from .oracle_cache import make_cache_key
+from .streaming import chunk_delta
+from .telemetry import METRICS, record_token_usage
+from .utils import (
+    AZURE_OAI_DEPLOYMENT_GPT4, AZURE_OAI_DEPLOYMENT_EMBEDDING,
+    get_azure_openai_client, get_async_azure_openai_client, get_shared_async_http_client,
+    log_info,
+)
+
+Messages = List[Dict[str, str]]
+
+
+class LLMProvider:
+    """
+    Backend for chat completions (optionally in JSON mode) and embeddings.
+
+    The SOI and the conversational agents talk to models only through a provider, so
+    the backend can be swapped for a local server, an offline deterministic model or a
+    recording without touching memory code. Subclasses implement `complete` and
+    `embed`; streaming and the async methods fall back to those by default.
+
+    Attributes:
+        chat_model: Model/deployment name used when a call does not name one. Also part
+                    of SOI cache keys, so outputs of different backends never mix.
+        embedding_model: Embedding model/deployment name.
+    """
+    name = "provider"
+    chat_model: str = AZURE_OAI_DEPLOYMENT_GPT4
+    embedding_model: str = AZURE_OAI_DEPLOYMENT_EMBEDDING
+
+    def complete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                 json_mode: bool = False, model: Optional[str] = None) -> str:
+        """Returns the text (a JSON object in json_mode) of one chat completion."""
+        raise NotImplementedError
+
+    def stream_complete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                        model: Optional[str] = None) -> Iterator[str]:
+        """Yields the text deltas of a chat completion."""
+        yield self.complete(messages, temperature=temperature, max_tokens=max_tokens, model=model)
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        """Returns one embedding vector per input text, in input order."""
+        raise NotImplementedError
+
+    async def acomplete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                        json_mode: bool = False, model: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self.complete, messages, temperature=temperature, max_tokens=max_tokens,
+                                       json_mode=json_mode, model=model)
+
+    async def astream_complete(self, messages: Messages, *, temperature: float, max_tokens: int,
+                               model: Optional[str] = None) -> AsyncIterator[str]:
+        yield await self.acomplete(messages, temperature=temperature, max_tokens=max_tokens, model=model)
+
+    async def aembed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed, texts, model=model)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Provider for any OpenAI-compatible chat/embeddings API.
+
+    By default it uses the Azure OpenAI clients configured in utils.py (created on first
+    use). `from_base_url` points it at any OpenAI-compatible HTTP server instead, such
+    as a local vLLM, llama.cpp or Ollama endpoint.
+    """
+    name = "openai-compatible"
+
+    def __init__(self, client=None, async_client=None, chat_model: Optional[str] = None,
+                 embedding_model: Optional[str] = None):
+        self._client = client
+        self._async_client = async_client
+        self.chat_model = chat_model or AZURE_OAI_DEPLOYMENT_GPT4
+        self.embedding_model = embedding_model or AZURE_OAI_DEPLOYMENT_EMBEDDING
+
+    @classmethod
+    def from_base_url(cls, base_url: str, api_key: Optional[str] = None, chat_model: Optional[str] = None,
+                      embedding_model: Optional[str] = None) -> "OpenAICompatibleProvider":
+        from openai import OpenAI, AsyncOpenAI
+        api_key = api_key or os.environ.get("OPENAI_API_KEY", "not-needed")
+        return cls(
+            client=OpenAI(base_url=base_url, api_key=api_key, max_retries=0),
+            async_client=AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=get_shared_async_http_client(),
+                                     max_retries=0),
+            chat_model=chat_model,
+            embedding_model=embedding_model,
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_azure_openai_client()
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = get_async_azure_openai_client()
+        return self._async_client
+
+    def _request(self, messages: Messages, temperature: float, max_tokens: int, json_mode: bool,
+                 model: Optional[str]) -> Dict[str, Any]:
+        request = {
+            "model": model or self.chat_model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def _completion_text(self, response, kind: str, model: Optional[str]) -> str:
+        self._count_request(kind, model or self.chat_model, getattr(response, "usage", None))
+        return response.choices[0].message.content
+
+    def _embedding_vectors(self, response, model: Optional[str]) -> List[List[float]]:
+        self._count_request("embed", model or self.embedding_model, getattr(response, "usage", None))
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    @staticmethod
+    def _count_request(kind: str, model: str, usage=None):
+        METRICS.inc("cognitive_weave_llm_requests_total", kind=kind, model=model)
+        record_token_usage(usage, kind, model)
+
+    def complete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        response = self.client.chat.completions.create(**self._request(messages, temperature, max_tokens, json_mode, model))
+        return self._completion_text(response, "json" if json_mode else "chat", model)
+
+    def stream_complete(self, messages, *, temperature, max_tokens, model=None) -> Iterator[str]:
+        stream = self.client.chat.completions.create(stream=True, **self._request(messages, temperature, max_tokens, False, model))
+        self._count_request("stream", model or self.chat_model)
+        for chunk in stream:
+            # Usage arrives in a final chunk only when the server is asked for it (stream_options)
+            record_token_usage(getattr(chunk, "usage", None), "stream", model or self.chat_model)
+            yield chunk_delta(chunk)
+
+    def embed(self, texts, *, model=None) -> List[List[float]]:
+        response = self.client.embeddings.create(model=model or self.embedding_model, input=texts)
+        return self._embedding_vectors(response, model)
+
+    async def acomplete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        response = await self.async_client.chat.completions.create(**self._request(messages, temperature, max_tokens, json_mode, model))
+        return self._completion_text(response, "json" if json_mode else "chat", model)
+
+    async def astream_complete(self, messages, *, temperature, max_tokens, model=None) -> AsyncIterator[str]:
+        stream = await self.async_client.chat.completions.create(stream=True, **self._request(messages, temperature, max_tokens, False, model))
+        self._count_request("stream", model or self.chat_model)
+        async for chunk in stream:
+            record_token_usage(getattr(chunk, "usage", None), "stream", model or self.chat_model)
+            yield chunk_delta(chunk)
+
+    async def aembed(self, texts, *, model=None) -> List[List[float]]:
+        response = await self.async_client.embeddings.create(model=model or self.embedding_model, input=texts)
+        return self._embedding_vectors(response, model)
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+RECORDING_MODES = ("record", "replay", "auto")
+
+
+class RecordReplayProvider(LLMProvider):
+    """
+    Captures the responses of another provider to a JSONL file and plays them back.
+
+    Requests are keyed by a hash of the call kind, model, sampling settings and
+    messages/inputs. In "record" mode every call goes to the wrapped provider and is
+    appended to the file; in "replay" mode calls are answered from the file only (a
+    miss raises ReplayMissError); "auto" replays when possible and records otherwise.
+    Replayed runs are reproducible and free, which makes them suitable for perf work.
+    The file starts with a header naming the recorded models, so a replay-only
+    provider reports (and keys requests by) the same model names as the recording.
+    """
+    name = "record-replay"
+
+    def __init__(self, path: str, inner: Optional[LLMProvider] = None, mode: str = "auto"):
+        if mode not in RECORDING_MODES:
+            raise ValueError(f"Unknown recording mode: {mode}")
+        if mode != "replay" and inner is None:
+            raise ValueError(f"Recording mode '{mode}' needs a provider to record from.")
+        self.path = path
+        self.inner = inner
+        self.mode = mode
+        self.chat_model = inner.chat_model if inner is not None else LLMProvider.chat_model
+        self.embedding_model = inner.embedding_model if inner is not None else LLMProvider.embedding_model
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, Any] = {}
+        self.hits = 0
+        self.recorded = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry["kind"] == "models":
+                        if self.inner is None:
+                            self.chat_model = entry["response"]["chat_model"]
+                            self.embedding_model = entry["response"]["embedding_model"]
+                        continue
+                    self._recordings[entry["key"]] = entry["response"]
+        log_info(f"RecordReplayProvider: Loaded {len(self._recordings)} recorded responses from {self.path}.")
+
+    def _key(self, kind: str, model: Optional[str], payload: Any, **settings) -> str:
+        return make_cache_key(kind, "", model or self.chat_model, json.dumps(settings, sort_keys=True), payload)
+
+    def _lookup(self, key: str):
+        if self.mode != "record":
+            with self._lock:
+                if key in self._recordings:
+                    self.hits += 1
+                    METRICS.inc("cognitive_weave_replay_lookups_total", result="hit")
+                    return True, self._recordings[key]
+            METRICS.inc("cognitive_weave_replay_lookups_total", result="miss")
+            if self.mode == "replay":
+                raise ReplayMissError(f"No recorded response for request {key[:12]} in {self.path}")
+        return False, None
+
+    def _record(self, key: str, kind: str, response: Any):
+        with self._lock:
+            self._recordings[key] = response
+            self.recorded += 1
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", encoding="utf-8") as f:
+                if new_file:
+                    models = {"chat_model": self.chat_model, "embedding_model": self.embedding_model}
+                    f.write(json.dumps({"key": "", "kind": "models", "response": models}) + "\n")
+                f.write(json.dumps({"key": key, "kind": kind, "response": response}, ensure_ascii=False) + "\n")
+
+    def complete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        key = self._key("complete", model, messages, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+        found, response = self._lookup(key)
+        if not found:
+            response = self.inner.complete(messages, temperature=temperature, max_tokens=max_tokens,
+                                           json_mode=json_mode, model=model)
+            self._record(key, "complete", response)
+        return response
+
+    def stream_complete(self, messages, *, temperature, max_tokens, model=None) -> Iterator[str]:
+        key = self._key("stream", model, messages, temperature=temperature, max_tokens=max_tokens)
+        found, deltas = self._lookup(key)
+        if not found:
+            deltas = []
+            for delta in self.inner.stream_complete(messages, temperature=temperature, max_tokens=max_tokens, model=model):
+                deltas.append(delta)
+                yield delta
+            self._record(key, "stream", deltas)
+            return
+        yield from deltas
+
+    def embed(self, texts, *, model=None) -> List[List[float]]:
+        key = self._key("embed", model or self.embedding_model, texts)
+        found, response = self._lookup(key)
+        if not found:
+            response = self.inner.embed(texts, model=model)
+            self._record(key, "embed", response)
+        return response
+
+    async def acomplete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        key = self._key("complete", model, messages, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+        found, response = self._lookup(key)
+        if not found:
+            response = await self.inner.acomplete(messages, temperature=temperature, max_tokens=max_tokens,
+                                                  json_mode=json_mode, model=model)
+            self._record(key, "complete", response)
+        return response
+
+    async def astream_complete(self, messages, *, temperature, max_tokens, model=None) -> AsyncIterator[str]:
+        key = self._key("stream", model, messages, temperature=temperature, max_tokens=max_tokens)
+        found, deltas = self._lookup(key)
+        if not found:
+            deltas = []
+            async for delta in self.inner.astream_complete(messages, temperature=temperature, max_tokens=max_tokens, model=model):
+                deltas.append(delta)
+                yield delta
+            self._record(key, "stream", deltas)
+            return
+        for delta in deltas:
+            yield delta
+
+    async def aembed(self, texts, *, model=None) -> List[List[float]]:
+        key = self._key("embed", model or self.embedding_model, texts)
+        found, response = self._lookup(key)
+        if not found:
+            response = await self.inner.aembed(texts, model=model)
+            self._record(key, "embed", response)
+        return response
@@ -0,0 +1,464 @@
+# cognitive_weave_poc/cognitive_weave/resilience.py
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from .oracle_cache import make_cache_key
+from .providers import LLMProvider, Messages
+from .telemetry import METRICS
+from .utils import estimate_token_count, log_error, log_info
+
+T = TypeVar("T")
+
+# Status codes worth another attempt: timeouts, conflicts, throttling and server-side failures
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Transport errors of the openai SDK, matched by name so the SDK is not imported here
+_RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+_STREAM_END = object()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without a network call while a deployment's circuit breaker is open."""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed call may succeed if repeated (throttling, 5xx, timeouts, dropped connections)."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The server's requested delay from `retry-after-ms` or `retry-after` (seconds or HTTP date), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000.0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_reason(error: BaseException) -> str:
+    status = _status_code(error)
+    return str(status) if status is not None else type(error).__name__
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff ("full jitter": a uniform delay up to base * 2^attempt,
+    capped at `max_delay`). A server's Retry-After is honoured as a lower bound, up to
+    `max_retry_after`.
+    """
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 20.0,
+                 max_retry_after: float = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        jittered = random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            return max(jittered, min(requested, self.max_retry_after))
+        return jittered
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`.
+
+    `reserve` debits the cost immediately (the balance may go negative) and returns how
+    long the caller must wait before sending, so sync and async callers share one
+    bucket and are served in arrival order. `pause` blocks the bucket for a while, e.g.
+    after the server answered 429.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            wait = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures and rejects calls for
+    `reset_timeout` seconds; then a single probe call decides whether it closes again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            # A probe that never reported back (e.g. its task was cancelled) is replaced after reset_timeout
+            if self.state == self.HALF_OPEN and (not self._probe_in_flight
+                                                 or time.monotonic() - self._probe_started >= self.reset_timeout):
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Counts a transient failure. Returns True if this failure opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+                return True
+            return False
+
+
+class DeploymentGuard:
+    """Rate limits (requests and tokens per minute) and circuit breaker of one model deployment."""
+    def __init__(self, model: str, requests_per_minute: Optional[float], tokens_per_minute: Optional[float],
+                 failure_threshold: int, reset_timeout: float):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute / 60.0, requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def reserve(self, token_cost: int) -> float:
+        wait = self.requests.reserve(1) if self.requests is not None else 0.0
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(token_cost))
+        return wait
+
+    def pause(self, seconds: float):
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.pause(seconds)
+
+
+# Process-wide guards keyed by deployment, so every provider, SOI and agent shares one budget
+_guards: Dict[str, DeploymentGuard] = {}
+_guards_lock = threading.Lock()
+_limit_settings: Dict[Optional[str], Dict[str, Any]] = {
+    None: {"requests_per_minute": None, "tokens_per_minute": None, "failure_threshold": 5, "reset_timeout": 30.0}
+}
+
+
+def configure_deployment_limits(model: Optional[str] = None, requests_per_minute: Optional[float] = None,
+                                tokens_per_minute: Optional[float] = None, failure_threshold: Optional[int] = None,
+                                reset_timeout: Optional[float] = None):
+    """
+    Sets the rate limits and circuit-breaker thresholds of one deployment, or the
+    defaults of all deployments without settings of their own when `model` is None.
+    Guards are rebuilt on their next use.
+    """
+    with _guards_lock:
+        settings = dict(_limit_settings.get(model) or _limit_settings[None])
+        updates = {"requests_per_minute": requests_per_minute, "tokens_per_minute": tokens_per_minute,
+                   "failure_threshold": failure_threshold, "reset_timeout": reset_timeout}
+        settings.update({name: value for name, value in updates.items() if value is not None})
+        _limit_settings[model] = settings
+        if model is None:
+            _guards.clear()
+        else:
+            _guards.pop(model, None)
+
+
+def deployment_guard(model: str) -> DeploymentGuard:
+    with _guards_lock:
+        guard = _guards.get(model)
+        if guard is None:
+            guard = _guards[model] = DeploymentGuard(model, **(_limit_settings.get(model) or _limit_settings[None]))
+        return guard
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with the same key share its result."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            METRICS.inc("cognitive_weave_llm_deduplicated_total")
+            return call.result()
+        try:
+            result = fn()
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight."""
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is not None:
+            METRICS.inc("cognitive_weave_llm_deduplicated_total")
+            return await asyncio.shield(call)
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                call.cancel()
+            else:
+                call.set_exception(e)
+                call.exception()  # Retrieved here so an unshared failure is not reported as unhandled
+            raise
+        finally:
+            del self._calls[key]
+
+
+def _message_tokens(messages: Messages) -> int:
+    return sum(estimate_token_count(message.get("content") or "") for message in messages)
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Wraps a provider with the call layer shared by the SOI and the conversational agents.
+
+    Every call passes its deployment's token buckets (requests and prompt + max_tokens
+    per minute, see configure_deployment_limits) and circuit breaker, and transient
+    failures are retried with jittered exponential backoff that honours Retry-After.
+    A 429 also pauses the deployment's buckets, so concurrent callers back off together
+    instead of each spending its own retries. JSON-mode completions (enrichment,
+    synthesis) and embeddings are single-flighted: identical concurrent requests share
+    one network call. Streams are retried only until their first delta arrives.
+
+    Retries, throttling waits, rejected calls and shared results are counted in
+    METRICS (`cognitive_weave_llm_retries_total`, `cognitive_weave_llm_throttled_total`,
+    `cognitive_weave_llm_throttle_wait_seconds`, `cognitive_weave_llm_circuit_rejections_total`,
+    `cognitive_weave_llm_deduplicated_total`).
+    """
+    name = "resilient"
+
+    def __init__(self, inner: LLMProvider, policy: Optional[RetryPolicy] = None):
+        self.inner = inner
+        self.name = f"{inner.name}+resilient"
+        self.chat_model = inner.chat_model
+        self.embedding_model = inner.embedding_model
+        self.policy = policy if policy is not None else RetryPolicy()
+        self._flights = SingleFlight()
+        self._async_flights = AsyncSingleFlight()
+
+    # --- Shared retry bookkeeping ---
+
+    def _admit(self, guard: DeploymentGuard, kind: str, token_cost: int) -> float:
+        """Checks the circuit and reserves rate budget; returns the wait before sending."""
+        if not guard.breaker.allow():
+            METRICS.inc("cognitive_weave_llm_circuit_rejections_total", kind=kind, model=guard.model)
+            raise CircuitOpenError(f"Circuit open for deployment {guard.model}; call rejected.")
+        wait = guard.reserve(token_cost)
+        if wait > 0:
+            METRICS.inc("cognitive_weave_llm_throttled_total", kind=kind, model=guard.model, reason="rate_limit")
+            METRICS.observe("cognitive_weave_llm_throttle_wait_seconds", wait, model=guard.model)
+        return wait
+
+    def _retry_delay(self, guard: DeploymentGuard, kind: str, attempt: int, error: BaseException) -> Optional[float]:
+        """Records a failed attempt; returns the backoff before the next one, or None to give up."""
+        if isinstance(error, CircuitOpenError):
+            return None
+        if not is_retryable(error):
+            guard.breaker.record_success()  # The deployment answered; the request itself was rejected
+            return None
+        reason = _error_reason(error)
+        delay = self.policy.delay(attempt, error)
+        if _status_code(error) == 429:
+            METRICS.inc("cognitive_weave_llm_throttled_total", kind=kind, model=guard.model, reason="429")
+            guard.pause(delay)
+        elif guard.breaker.record_failure():
+            log_error(f"LLM call layer: circuit opened for {guard.model} after repeated failures ({reason}).")
+            return None
+        if attempt + 1 >= self.policy.max_attempts:
+            log_error(f"LLM call layer: giving up on {kind} call to {guard.model} after {attempt + 1} attempts ({reason}).")
+            return None
+        METRICS.inc("cognitive_weave_llm_retries_total", kind=kind, model=guard.model, reason=reason)
+        log_info(f"LLM call layer: {kind} call to {guard.model} failed ({reason}); retry {attempt + 1} in {delay:.2f}s.")
+        return delay
+
+    def _call(self, kind: str, model: str, token_cost: int, fn: Callable[[], T]) -> T:
+        guard = deployment_guard(model)
+        attempt = 0
+        while True:
+            wait = self._admit(guard, kind, token_cost)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(guard, kind, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            guard.breaker.record_success()
+            return result
+
+    async def _acall(self, kind: str, model: str, token_cost: int, fn: Callable[[], Awaitable[T]]) -> T:
+        guard = deployment_guard(model)
+        attempt = 0
+        while True:
+            wait = self._admit(guard, kind, token_cost)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._retry_delay(guard, kind, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            guard.breaker.record_success()
+            return result
+
+    def _flight_key(self, kind: str, model: str, payload: Any, **settings) -> str:
+        return make_cache_key(kind, "", model, json.dumps(settings, sort_keys=True), payload)
+
+    # --- LLMProvider ---
+
+    def complete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        model = model or self.chat_model
+
+        def call():
+            return self._call("json" if json_mode else "chat", model, _message_tokens(messages) + max_tokens,
+                              lambda: self.inner.complete(messages, temperature=temperature, max_tokens=max_tokens,
+                                                          json_mode=json_mode, model=model))
+        if not json_mode:
+            return call()
+        key = self._flight_key("complete", model, messages, temperature=temperature, max_tokens=max_tokens)
+        return self._flights.do(key, call)
+
+    def stream_complete(self, messages, *, temperature, max_tokens, model=None) -> Iterator[str]:
+        model = model or self.chat_model
+
+        def open_stream():
+            deltas = iter(self.inner.stream_complete(messages, temperature=temperature, max_tokens=max_tokens, model=model))
+            return next(deltas, _STREAM_END), deltas
+
+        first, deltas = self._call("stream", model, _message_tokens(messages) + max_tokens, open_stream)
+        if first is _STREAM_END:
+            return
+        yield first
+        yield from deltas
+
+    def embed(self, texts, *, model=None) -> List[List[float]]:
+        model = model or self.embedding_model
+        cost = sum(estimate_token_count(text) for text in texts)
+        return self._flights.do(self._flight_key("embed", model, texts),
+                                lambda: self._call("embed", model, cost, lambda: self.inner.embed(texts, model=model)))
+
+    async def acomplete(self, messages, *, temperature, max_tokens, json_mode=False, model=None) -> str:
+        model = model or self.chat_model
+
+        def call():
+            return self._acall("json" if json_mode else "chat", model, _message_tokens(messages) + max_tokens,
+                               lambda: self.inner.acomplete(messages, temperature=temperature, max_tokens=max_tokens,
+                                                            json_mode=json_mode, model=model))
+        if not json_mode:
+            return await call()
+        key = self._flight_key("complete", model, messages, temperature=temperature, max_tokens=max_tokens)
+        return await self._async_flights.do(key, call)
+
+    async def astream_complete(self, messages, *, temperature, max_tokens, model=None) -> AsyncIterator[str]:
+        model = model or self.chat_model
+
+        async def open_stream():
+            deltas = self.inner.astream_complete(messages, temperature=temperature, max_tokens=max_tokens, model=model)
+            try:
+                return await deltas.__anext__(), deltas
+            except StopAsyncIteration:
+                return _STREAM_END, deltas
+
+        first, deltas = await self._acall("stream", model, _message_tokens(messages) + max_tokens, open_stream)
+        if first is _STREAM_END:
+            return
+        yield first
+        async for delta in deltas:
+            yield delta
+
+    async def aembed(self, texts, *, model=None) -> List[List[float]]:
+        model = model or self.embedding_model
+        cost = sum(estimate_token_count(text) for text in texts)
+        return await self._async_flights.do(
+            self._flight_key("embed", model, texts),
+            lambda: self._acall("embed", model, cost, lambda: self.inner.aembed(texts, model=model)))
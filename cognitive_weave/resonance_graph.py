@@ -0,0 +1,253 @@
+# cognitive_weave_poc/cognitive_weave/resonance_graph.py
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .data_structures import InsightParticle
+
+# Built-in edge types. Any other `type` found in a relational strand is interned on first use.
+EDGE_SUPPORTS = "supports"
+EDGE_DERIVED_FROM = "derived_from"
+EDGE_TEMPORAL_NEXT = "temporal_next"
+EDGE_RELATED_TO = "related_to"
+
+DEFAULT_EDGE_TYPE_WEIGHTS: Dict[str, float] = {
+    EDGE_SUPPORTS: 1.0,
+    EDGE_DERIVED_FROM: 1.0,
+    EDGE_TEMPORAL_NEXT: 0.5,
+    EDGE_RELATED_TO: 0.75,
+}
+
+
+class ResonanceGraph:
+    """
+    In-memory relational layer of the Spatio-Temporal Resonance Graph (STRG).
+
+    Particles are mapped to compact integer node IDs. Edges are appended to flat typed
+    arrays (both directions, so traversal is symmetric) and merged lazily into a CSR
+    adjacency (indptr/indices) the first time the graph is read after a change; only the
+    new edges are sorted, so a read after a few additions stays linear in the edge count.
+    Traversal and spreading activation then operate on whole frontiers with NumPy
+    instead of walking per-node Python dicts.
+    """
+    def __init__(self, edge_type_weights: Optional[Dict[str, float]] = None):
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+
+        self._edge_type_names: List[str] = []
+        self._edge_type_index: Dict[str, int] = {}
+        self._edge_type_weights: List[float] = []
+        weights = dict(DEFAULT_EDGE_TYPE_WEIGHTS)
+        weights.update(edge_type_weights or {})
+        for edge_type, weight in weights.items():
+            self._intern_edge_type(edge_type, weight)
+
+        # Append-only edge log
+        self._src = array('i')
+        self._dst = array('i')
+        self._etype = array('H')
+        self._weight = array('f')
+
+        # CSR view over the edge log, merged up to date on demand
+        self._csr_edge_count = -1
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._csr_types = np.zeros(0, dtype=np.uint16)
+        self._csr_weights = np.zeros(0, dtype=np.float32)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of logical (undirected) edges."""
+        return len(self._src) // 2
+
+    def __contains__(self, particle_id: str) -> bool:
+        return particle_id in self._node_index
+
+    def _intern_edge_type(self, edge_type: str, weight: Optional[float] = None) -> int:
+        type_id = self._edge_type_index.get(edge_type)
+        if type_id is None:
+            type_id = len(self._edge_type_names)
+            self._edge_type_names.append(edge_type)
+            self._edge_type_index[edge_type] = type_id
+            self._edge_type_weights.append(DEFAULT_EDGE_TYPE_WEIGHTS[EDGE_RELATED_TO] if weight is None else weight)
+        elif weight is not None:
+            self._edge_type_weights[type_id] = weight
+        return type_id
+
+    def add_node(self, particle_id: str) -> int:
+        """Returns the integer node ID for a particle, allocating one if needed."""
+        node = self._node_index.get(particle_id)
+        if node is None:
+            node = len(self._node_ids)
+            self._node_ids.append(particle_id)
+            self._node_index[particle_id] = node
+        return node
+
+    def add_edge(self, source_id: str, target_id: str, edge_type: str = EDGE_RELATED_TO, weight: float = 1.0):
+        """Adds a typed edge. Unknown endpoints (e.g. dangling strand targets) become placeholder nodes."""
+        source = self.add_node(source_id)
+        target = self.add_node(target_id)
+        type_id = self._intern_edge_type(edge_type)
+        self._src.append(source)
+        self._dst.append(target)
+        self._src.append(target)
+        self._dst.append(source)
+        self._etype.extend((type_id, type_id))
+        self._weight.extend((weight, weight))
+
+    def add_particle(self, ip: InsightParticle):
+        """Adds a particle node plus the edges implied by its relational strands and IA provenance."""
+        self.add_node(ip.particle_id)
+        for strand in ip.relational_strands:
+            target_id = strand.get("target_id")
+            if target_id:
+                self.add_edge(ip.particle_id, target_id, strand.get("type", EDGE_RELATED_TO))
+        for source_id in ip.derived_from_ids:
+            self.add_edge(ip.particle_id, source_id, EDGE_DERIVED_FROM)
+
+    def _compact(self):
+        """
+        Brings the CSR view up to date with the edge log. Only the edges appended since
+        the last compaction are sorted; they are inserted at the end of their source
+        node's row, which is the order a stable sort of the whole log would give.
+        """
+        edge_count = len(self._src)
+        if edge_count == self._csr_edge_count and len(self._indptr) == self.node_count + 1:
+            return
+        start = max(self._csr_edge_count, 0)
+        indptr = np.concatenate((self._indptr, np.full(self.node_count + 1 - len(self._indptr),
+                                                       self._indptr[-1], dtype=np.int64)))
+        src = np.frombuffer(self._src, dtype=np.int32, count=edge_count)[start:]
+        if src.size:
+            order = np.argsort(src, kind="stable")
+            rows_end = indptr[src[order].astype(np.int64) + 1]
+            self._indices = np.insert(self._indices, rows_end,
+                                      np.frombuffer(self._dst, dtype=np.int32, count=edge_count)[start:][order])
+            self._csr_types = np.insert(self._csr_types, rows_end,
+                                        np.frombuffer(self._etype, dtype=np.uint16, count=edge_count)[start:][order])
+            self._csr_weights = np.insert(self._csr_weights, rows_end,
+                                          np.frombuffer(self._weight, dtype=np.float32, count=edge_count)[start:][order])
+            indptr[1:] += np.cumsum(np.bincount(src, minlength=self.node_count))
+        self._indptr = indptr
+        self._csr_edge_count = edge_count
+
+    def _type_mask(self, edge_types: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if edge_types is None:
+            return None
+        mask = np.zeros(len(self._edge_type_names), dtype=bool)
+        for edge_type in edge_types:
+            type_id = self._edge_type_index.get(edge_type)
+            if type_id is not None:
+                mask[type_id] = True
+        return mask
+
+    def _frontier_edges(self, frontier: np.ndarray, type_mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (source node, edge position) for every outgoing edge of the frontier."""
+        starts = self._indptr[frontier]
+        degrees = self._indptr[frontier + 1] - starts
+        total = int(degrees.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        sources = np.repeat(frontier, degrees)
+        offsets = np.arange(total) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+        positions = np.repeat(starts, degrees) + offsets
+        if type_mask is not None:
+            keep = type_mask[self._csr_types[positions]]
+            sources, positions = sources[keep], positions[keep]
+        return sources, positions
+
+    def _seed_nodes(self, seed_ids: Iterable[str]) -> np.ndarray:
+        return np.array(sorted({self._node_index[pid] for pid in seed_ids if pid in self._node_index}), dtype=np.int64)
+
+    def neighbors(self, particle_id: str, edge_types: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """Direct neighbours of a particle as (particle_id, edge_type) pairs."""
+        if particle_id not in self._node_index:
+            return []
+        self._compact()
+        _, positions = self._frontier_edges(self._seed_nodes([particle_id]), self._type_mask(edge_types))
+        return [(self._node_ids[self._indices[pos]], self._edge_type_names[self._csr_types[pos]]) for pos in positions]
+
+    def traverse(self, seed_ids: Iterable[str], max_hops: int = 2,
+                 edge_types: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Bounded breadth-first traversal from the seed particles.
+
+        Returns:
+            A mapping of every reached particle ID (seeds included) to its hop distance.
+        """
+        self._compact()
+        type_mask = self._type_mask(edge_types)
+        frontier = self._seed_nodes(seed_ids)
+        hops = np.full(self.node_count, -1, dtype=np.int32)
+        hops[frontier] = 0
+        for hop in range(1, max_hops + 1):
+            if frontier.size == 0:
+                break
+            _, positions = self._frontier_edges(frontier, type_mask)
+            targets = np.unique(self._indices[positions])
+            frontier = targets[hops[targets] < 0].astype(np.int64)
+            hops[frontier] = hop
+        reached = np.nonzero(hops >= 0)[0]
+        return {self._node_ids[node]: int(hops[node]) for node in reached}
+
+    def spread_activation(self, seed_scores: Dict[str, float], max_hops: int = 2, decay: float = 0.5,
+                          edge_types: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Resonance scoring: propagates activation from seed particles across the graph.
+
+        Each hop a node passes `decay` times its activation, split evenly across its
+        edges and scaled by edge and edge-type weights, to its neighbours.
+
+        Returns:
+            Accumulated activation per reached particle ID (seeds included).
+        """
+        self._compact()
+        if self.node_count == 0:
+            return {}
+        type_mask = self._type_mask(edge_types)
+        type_weights = np.asarray(self._edge_type_weights, dtype=np.float32)
+        degrees = np.diff(self._indptr).astype(np.float32)
+
+        activation = np.zeros(self.node_count, dtype=np.float32)
+        for pid, score in seed_scores.items():
+            node = self._node_index.get(pid)
+            if node is not None:
+                activation[node] += score
+        total = activation.copy()
+
+        for _ in range(max_hops):
+            frontier = np.nonzero(activation)[0]
+            if frontier.size == 0:
+                break
+            sources, positions = self._frontier_edges(frontier, type_mask)
+            if positions.size == 0:
+                break
+            contributions = (decay * activation[sources] / degrees[sources]
+                             * self._csr_weights[positions] * type_weights[self._csr_types[positions]])
+            activation = np.bincount(self._indices[positions], weights=contributions,
+                                     minlength=self.node_count).astype(np.float32)
+            total += activation
+
+        reached = np.nonzero(total)[0]
+        return {self._node_ids[node]: float(total[node]) for node in reached}
+
+    def expand(self, seed_ids: Sequence[str], top_k: int = 5, max_hops: int = 2, decay: float = 0.5,
+               edge_types: Optional[Iterable[str]] = None, exclude_ids: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Expands retrieval hits into their graph neighbourhood.
+
+        Seeds are weighted by rank (first hit strongest); the returned neighbours,
+        excluding the seeds themselves, are ordered by resonance activation.
+        """
+        seed_scores = {pid: 1.0 / (rank + 1) for rank, pid in enumerate(seed_ids)}
+        activations = self.spread_activation(seed_scores, max_hops=max_hops, decay=decay, edge_types=edge_types)
+        excluded = set(seed_ids) | (exclude_ids or set())
+        ranked = sorted(((pid, score) for pid, score in activations.items() if pid not in excluded),
+                        key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
@@ -0,0 +1,192 @@
+# cognitive_weave_poc/cognitive_weave/response_cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .data_structures import InsightParticle
+from .dedup import MinHasher, normalize_words
+from .telemetry import METRICS
+
+
+def particle_version(ip: InsightParticle) -> str:
+    """Fingerprint of everything a prompt can show of a particle; changes whenever any of it is edited."""
+    material = json.dumps([str(ip.core_data), ip.situational_imprint, ip.resonance_keys, ip.signifiers,
+                           ip.extracted_entities, ip.derived_from_ids, ip.modification_timestamp],
+                          ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def context_signature(scope: str, model: str, particles: Sequence[InsightParticle]) -> str:
+    """
+    Key of the memory context a response was generated from: the cache scope, the model,
+    and the IDs and versions of the retrieved particles in prompt order.
+    """
+    material = json.dumps([scope, model, [(ip.particle_id, particle_version(ip)) for ip in particles]],
+                          ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _CachedResponse:
+    __slots__ = ("entry_id", "context", "normalized_query", "signature", "response", "particle_ids", "expires_at")
+
+    def __init__(self, entry_id: int, context: str, normalized_query: str, signature: Optional[np.ndarray],
+                 response: str, particle_ids: List[str], expires_at: float):
+        self.entry_id = entry_id
+        self.context = context
+        self.normalized_query = normalized_query
+        self.signature = signature
+        self.response = response
+        self.particle_ids = particle_ids
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Semantic cache of conversational responses.
+
+    A response is reused only for the same memory context (see context_signature), so it
+    is never served once retrieval returns different particles or any of them changes.
+    Within a context, a query hits when its normalized form (case, punctuation and spacing
+    folded) equals a cached one, or when the MinHash estimate of their character-shingle
+    similarity reaches `similarity_threshold`.
+
+    Entries expire after `ttl_seconds` and the least recently used are evicted beyond
+    `max_entries`. `invalidate` drops every entry that used a particle, for callers that
+    change or remove particles (the agent does this for IA refreshes and collection).
+    Thread-safe; one instance can be shared by many agents, each with its own `scope`.
+    """
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0, similarity_threshold: float = 0.85,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.hasher = MinHasher()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _CachedResponse]" = OrderedDict()
+        self._by_context: Dict[str, Dict[int, _CachedResponse]] = {}
+        self._by_particle: Dict[str, Set[int]] = {}
+        self._next_entry_id = 0
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, entry: _CachedResponse):
+        """Removes an entry from every structure. Caller holds the lock."""
+        self._entries.pop(entry.entry_id, None)
+        siblings = self._by_context.get(entry.context)
+        if siblings is not None:
+            siblings.pop(entry.entry_id, None)
+            if not siblings:
+                del self._by_context[entry.context]
+        for particle_id in entry.particle_ids:
+            dependents = self._by_particle.get(particle_id)
+            if dependents is not None:
+                dependents.discard(entry.entry_id)
+                if not dependents:
+                    del self._by_particle[particle_id]
+
+    def get(self, query: str, context: str) -> Optional[str]:
+        """The cached response to `query` (or a near-identical query) in `context`, or None on a miss."""
+        normalized = normalize_words(query)
+        with self._lock:
+            now = self._clock()
+            best: Optional[_CachedResponse] = None
+            best_similarity = 0.0
+            signature = None
+            for entry in list(self._by_context.get(context, {}).values()):
+                if entry.expires_at <= now:
+                    self._drop(entry)
+                    self.expirations += 1
+                    continue
+                if entry.normalized_query == normalized:
+                    best, best_similarity = entry, 1.0
+                    break
+                if signature is None:
+                    signature = self.hasher.signature(normalized)
+                if signature is None or entry.signature is None:
+                    continue
+                similarity = MinHasher.similarity(signature, entry.signature)
+                if similarity >= self.similarity_threshold and similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None:
+                self.misses += 1
+                METRICS.inc("cognitive_weave_response_cache_lookups_total", result="miss")
+                return None
+            self._entries.move_to_end(best.entry_id)
+            self.hits += 1
+            if best_similarity < 1.0:
+                self.similar_hits += 1
+            METRICS.inc("cognitive_weave_response_cache_lookups_total",
+                        result="hit" if best_similarity == 1.0 else "similar_hit")
+            return best.response
+
+    def put(self, query: str, context: str, particle_ids: Iterable[str], response: str):
+        """Caches `response` to `query` for the memory `context` built from `particle_ids`."""
+        normalized = normalize_words(query)
+        signature = self.hasher.signature(normalized)
+        with self._lock:
+            for entry in list(self._by_context.get(context, {}).values()):
+                if entry.normalized_query == normalized:
+                    self._drop(entry)
+            entry = _CachedResponse(self._next_entry_id, context, normalized, signature, response,
+                                    list(dict.fromkeys(particle_ids)), self._clock() + self.ttl_seconds)
+            self._next_entry_id += 1
+            self._entries[entry.entry_id] = entry
+            self._by_context.setdefault(context, {})[entry.entry_id] = entry
+            for particle_id in entry.particle_ids:
+                self._by_particle.setdefault(particle_id, set()).add(entry.entry_id)
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, particle_ids: Iterable[str]) -> int:
+        """Drops every entry whose context includes one of `particle_ids`; returns how many."""
+        dropped = 0
+        with self._lock:
+            for particle_id in particle_ids:
+                for entry_id in list(self._by_particle.get(particle_id, ())):
+                    entry = self._entries.get(entry_id)
+                    if entry is not None:
+                        self._drop(entry)
+                        dropped += 1
+            self.invalidations += dropped
+        if dropped:
+            METRICS.inc("cognitive_weave_response_cache_invalidations_total", dropped)
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+            self._by_particle.clear()
@@ -1,23 +1,267 @@
 # cognitive_weave_poc/cognitive_weave/semantic_oracle.py
 
 import json
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 
-from openai import AzureOpenAI
-
-from .utils import get_azure_openai_client, AZURE_OAI_DEPLOYMENT_GPT4, log_info, log_error
+from .telemetry import METRICS, traced
+from .utils import AZURE_OAI_DEPLOYMENT_GPT4, log_info, log_error, estimate_token_count
 from .data_structures import InsightParticle, InsightAggregateAttributes
+from .oracle_cache import OracleCache, make_cache_key
+from .providers import LLMProvider, OpenAICompatibleProvider
+from .resilience import ResilientProvider
+
+if TYPE_CHECKING:
+    from openai import AzureOpenAI
+
+# Part of every cache key: bump whenever a prompt or its parser changes so stale outputs are not reused
+PROMPT_TEMPLATE_VERSION = "1"
+
+# Request settings shared by the sync and async SOI implementations
+ENRICHMENT_TEMPERATURE = 0.2  # Lower temperature for more deterministic and factual output
+ENRICHMENT_MAX_TOKENS = 1000  # Adjust as needed based on expected output size
+SYNTHESIS_TEMPERATURE = 0.5   # Slightly higher temperature for more abstractive/creative synthesis
+SYNTHESIS_MAX_TOKENS = 1500   # Adjust as needed
+
+# Batched enrichment: input token budget per request and output tokens reserved per item
+BATCH_ENRICHMENT_TOKEN_BUDGET = 6000
+BATCH_ENRICHMENT_MAX_ITEMS = 16
+BATCH_ENRICHMENT_OUTPUT_TOKENS_PER_ITEM = 250
+BATCH_ENRICHMENT_MAX_OUTPUT_TOKENS = 4096
+
+ENRICHMENT_EXPECTED_KEYS = {"resonance_keys", "signifiers", "situational_imprint", "extracted_entities"}
+
+ENRICHMENT_SYSTEM_PROMPT = "You are an AI assistant specialized in extracting structured information from text and outputting it in valid JSON format, adhering strictly to the specified schema."
+SYNTHESIS_SYSTEM_PROMPT = "You are an AI assistant specialized in synthesizing higher-level insights from related information snippets and outputting the result as a valid JSON object, adhering strictly to the specified schema."
+
+
+def build_enrichment_messages(raw_text: str) -> List[Dict[str, str]]:
+    """Builds the chat messages for IP enrichment of a single text."""
+    prompt = f"""
+You are an advanced text analysis agent. Your task is to analyze the provided text and generate a structured JSON object.
+This JSON object will form the core semantic attributes of an Insight Particle (IP).
+
+The JSON object MUST contain the following keys:
+- "resonance_keys": A list of 5-7 specific, core terms or short phrases that are crucial for identifying and searching this information. These should capture key entities, actions, concepts, and outcomes. Order them by perceived importance.
+- "signifiers": A list of 3-5 broader categorical or thematic labels for classification (e.g., "project management", "technical issue", "user feedback", "strategic decision").
+- "situational_imprint": A concise, single-sentence summary that captures the core context (what the text is about) and the most critical essence, key takeaway, or outcome from the text.
+- "extracted_entities": An optional list of key named entities (people, organizations, locations, products, projects) mentioned in the text. If none are prominent, provide an empty list.
 
-class SemanticOracleInterface:
+Text for Analysis:
+---
+{raw_text}
+---
+
+Strictly output ONLY the JSON object. Do not include any explanatory text before or after the JSON.
+Ensure the JSON is well-formed.
+"""
+    return [
+        {"role": "system", "content": ENRICHMENT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_enrichment_response(enriched_attributes_json_str: str) -> Optional[Dict]:
+    """Parses and validates the LLM output for IP enrichment. Returns None if invalid."""
+    try:
+        enriched_attributes = json.loads(enriched_attributes_json_str)
+        # Basic validation of expected keys
+        if not ENRICHMENT_EXPECTED_KEYS.issubset(enriched_attributes.keys()):
+            log_error(f"SOI: LLM output missing some expected keys. Got: {enriched_attributes.keys()}")
+            return None
+        return enriched_attributes
+    except json.JSONDecodeError as e:
+        log_error(f"SOI: Error parsing JSON response from LLM for IP enrichment: {e}")
+        log_error(f"Raw LLM response: {enriched_attributes_json_str}")
+        return None
+
+
+def build_batch_enrichment_messages(raw_texts: List[str]) -> List[Dict[str, str]]:
+    """Builds the chat messages for enriching several texts in a single request."""
+    formatted_texts = "\n".join([f"[Text {idx+1}]\n{text}\n[End of Text {idx+1}]" for idx, text in enumerate(raw_texts)])
+
+    prompt = f"""
+You are an advanced text analysis agent. Your task is to analyze EACH of the {len(raw_texts)} numbered texts below independently and generate structured attributes for each one.
+Each set of attributes will form the core semantic attributes of a separate Insight Particle (IP).
+
+For every text, produce an object that MUST contain the following keys:
+- "index": The number of the text the object describes (1 to {len(raw_texts)}).
+- "resonance_keys": A list of 5-7 specific, core terms or short phrases that are crucial for identifying and searching this information. These should capture key entities, actions, concepts, and outcomes. Order them by perceived importance.
+- "signifiers": A list of 3-5 broader categorical or thematic labels for classification (e.g., "project management", "technical issue", "user feedback", "strategic decision").
+- "situational_imprint": A concise, single-sentence summary that captures the core context (what the text is about) and the most critical essence, key takeaway, or outcome from the text.
+- "extracted_entities": An optional list of key named entities (people, organizations, locations, products, projects) mentioned in the text. If none are prominent, provide an empty list.
+
+Texts for Analysis:
+---
+{formatted_texts}
+---
+
+Strictly output ONLY a JSON object of the form {{"results": [ ... ]}} with exactly one object per text, in the same order as the texts.
+Do not include any explanatory text before or after the JSON. Ensure the JSON is well-formed.
+"""
+    return [
+        {"role": "system", "content": ENRICHMENT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_batch_enrichment_response(batch_json_str: str, item_count: int) -> List[Optional[Dict]]:
+    """
+    Parses the LLM output for batched IP enrichment.
+
+    Returns:
+        One entry per input text; entries that are missing or fail the same key
+        validation as single-text enrichment are None.
+    """
+    results: List[Optional[Dict]] = [None] * item_count
+    try:
+        items = json.loads(batch_json_str).get("results", [])
+    except (json.JSONDecodeError, AttributeError) as e:
+        log_error(f"SOI: Error parsing JSON response from LLM for batched IP enrichment: {e}")
+        return results
+    if not isinstance(items, list):
+        log_error("SOI: Batched IP enrichment response has no 'results' list.")
+        return results
+
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = item.pop("index", position + 1)
+        if not isinstance(index, int) or not 1 <= index <= item_count or results[index - 1] is not None:
+            continue
+        if not ENRICHMENT_EXPECTED_KEYS.issubset(item.keys()):
+            log_error(f"SOI: Batched LLM output for text {index} missing some expected keys. Got: {item.keys()}")
+            continue
+        results[index - 1] = item
+    return results
+
+
+def plan_enrichment_batches(raw_texts: List[str], token_budget: int = BATCH_ENRICHMENT_TOKEN_BUDGET,
+                            max_items: int = BATCH_ENRICHMENT_MAX_ITEMS) -> List[List[int]]:
+    """
+    Greedily packs text positions into batches whose estimated prompt size stays within
+    `token_budget`. The fixed instruction block is counted once per batch; a text that is
+    larger than the budget on its own gets a batch of its own.
+    """
+    overhead = estimate_token_count(build_batch_enrichment_messages([""])[1]["content"])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = overhead
+    for position, text in enumerate(raw_texts):
+        text_tokens = estimate_token_count(text) + 10 # Per-text delimiters
+        if current and (current_tokens + text_tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], overhead
+        current.append(position)
+        current_tokens += text_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_synthesis_messages(ip_imprints: List[str]) -> List[Dict[str, str]]:
+    """Builds the chat messages for IA synthesis from a list of imprints."""
+    formatted_imprints = "\n".join([f"- Imprint {idx+1}: \"{imprint}\"" for idx, imprint in enumerate(ip_imprints)])
+
+    prompt = f"""
+You are an advanced AI knowledge synthesizer. You are tasked with creating a new, higher-level Insight Aggregate (IA)
+from a collection of related situational imprints, each derived from a distinct Insight Particle (IP).
+
+Your goal is to:
+1. Identify the core, overarching theme, pattern, problem, or emergent conclusion that connects these imprints.
+2. Synthesize a new "ia_core_data" statement. This statement should be a concise, abstracted insight that is not explicitly stated in any single input but becomes evident from their combination. It should represent new, synthesized knowledge.
+3. Generate attributes specifically for this new IA.
+
+Input Information (Related IP Imprints):
+---
+{formatted_imprints}
+---
+
+Based on the collective information from these imprints, generate a single, valid JSON object with the following keys:
+- "ia_core_data": (String) The synthesized higher-level conclusion, summary, or identified pattern. This is the core knowledge of the new IA.
+- "ia_resonance_keys": (List of strings) 3-5 core terms or short phrases that are crucial for identifying this specific synthesized IA.
+- "ia_signifiers": (List of strings) 2-3 broad categorical labels for this IA (e.g., "strategic insight", "emergent trend", "risk assessment", "solution proposal").
+- "ia_situational_imprint": (String) A concise, single-sentence summary describing what this new Insight Aggregate itself represents or signifies.
+
+Strictly output ONLY the JSON object. Do not include any explanatory text before or after the JSON.
+Ensure the JSON is well-formed.
+"""
+    return [
+        {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_synthesis_response(synthesized_ia_json_str: str) -> Optional[InsightAggregateAttributes]:
+    """Parses the LLM output for IA synthesis and validates it against the Pydantic model."""
+    try:
+        ia_data_dict = json.loads(synthesized_ia_json_str)
+        # Validate using Pydantic model
+        ia_attributes = InsightAggregateAttributes(**ia_data_dict)
+        return ia_attributes
+    except json.JSONDecodeError as e:
+        log_error(f"SOI: Error parsing JSON response from LLM for IA synthesis: {e}")
+        log_error(f"Raw LLM response: {synthesized_ia_json_str}")
+        return None
+    except Exception as pydantic_error: # Catch Pydantic validation errors
+        log_error(f"SOI: Error validating IA attributes against Pydantic model: {pydantic_error}")
+        log_error(f"Raw LLM response: {synthesized_ia_json_str}")
+        return None
+
+
+class OracleCacheMixin:
+    """
+    Cache lookups shared by the sync and async SOI. Expects `self.cache`
+    (an OracleCache or None) and `self.model_deployment`.
+    """
+    cache: Optional[OracleCache] = None
+    model_deployment: str = AZURE_OAI_DEPLOYMENT_GPT4
+
+    def _cache_key(self, kind: str, temperature: float, payload) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return make_cache_key(kind, PROMPT_TEMPLATE_VERSION, self.model_deployment, temperature, payload)
+
+    def _cached_enrichment(self, raw_text: str) -> Optional[Dict]:
+        cache_key = self._cache_key("enrich", ENRICHMENT_TEMPERATURE, raw_text)
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        return parse_enrichment_response(cached) if cached is not None else None
+
+    def _store_enrichment(self, raw_text: str, attributes: Optional[Dict]):
+        cache_key = self._cache_key("enrich", ENRICHMENT_TEMPERATURE, raw_text)
+        if cache_key is not None and attributes is not None:
+            self.cache.put(cache_key, json.dumps(attributes, ensure_ascii=False))
+
+    def _cached_synthesis(self, ip_imprints: List[str]) -> Optional[InsightAggregateAttributes]:
+        cache_key = self._cache_key("synthesize", SYNTHESIS_TEMPERATURE, ip_imprints)
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        return parse_synthesis_response(cached) if cached is not None else None
+
+    def _store_synthesis(self, ip_imprints: List[str], synthesized_ia_json_str: str):
+        cache_key = self._cache_key("synthesize", SYNTHESIS_TEMPERATURE, ip_imprints)
+        if cache_key is not None:
+            self.cache.put(cache_key, synthesized_ia_json_str)
+
+
+class SemanticOracleInterface(OracleCacheMixin):
     """
     The Semantic Oracle Interface (SOI) uses an LLM (Azure OpenAI GPT-4)
     for deep semantic understanding, enrichment of information (IPs),
     and synthesis of higher-level insights (IAs).
+
+    Requests go through an LLMProvider; without one, an OpenAICompatibleProvider
+    wraps `client` (or the Azure client configured in utils.py).
+
+    If an OracleCache is given, validated enrichment and synthesis outputs are cached
+    by content and served without a network call on repeated input.
     """
-    def __init__(self):
-        self.client: AzureOpenAI = get_azure_openai_client()
-        self.model_deployment: str = AZURE_OAI_DEPLOYMENT_GPT4 # Using GPT-4 as requested
+    def __init__(self, client: Optional["AzureOpenAI"] = None, cache: Optional[OracleCache] = None,
+                 provider: Optional[LLMProvider] = None):
+        self.provider: LLMProvider = provider if provider is not None else ResilientProvider(OpenAICompatibleProvider(client=client))
+        self.model_deployment: str = self.provider.chat_model # GPT-4 deployment unless the provider says otherwise
+        self.embedding_deployment: str = self.provider.embedding_model
+        self.cache: Optional[OracleCache] = cache
 
+    @traced("soi.enrich")
     def enrich_text_to_ip_attributes(self, raw_text: str) -> Optional[Dict]:
         """
         Processes raw text to generate structured attributes for an Insight Particle (IP).
@@ -31,58 +275,91 @@ class SemanticOracleInterface:
             or None if an error occurs.
         """
         log_info(f"SOI: Enriching text to IP attributes. Input text length: {len(raw_text)} chars.")
-        
-        prompt = f"""
-You are an advanced text analysis agent. Your task is to analyze the provided text and generate a structured JSON object.
-This JSON object will form the core semantic attributes of an Insight Particle (IP).
-
-The JSON object MUST contain the following keys:
-- "resonance_keys": A list of 5-7 specific, core terms or short phrases that are crucial for identifying and searching this information. These should capture key entities, actions, concepts, and outcomes. Order them by perceived importance.
-- "signifiers": A list of 3-5 broader categorical or thematic labels for classification (e.g., "project management", "technical issue", "user feedback", "strategic decision").
-- "situational_imprint": A concise, single-sentence summary that captures the core context (what the text is about) and the most critical essence, key takeaway, or outcome from the text.
-- "extracted_entities": An optional list of key named entities (people, organizations, locations, products, projects) mentioned in the text. If none are prominent, provide an empty list.
 
-Text for Analysis:
----
-{raw_text}
----
+        cached_attributes = self._cached_enrichment(raw_text)
+        if cached_attributes is not None:
+            log_info("SOI: IP attributes served from cache.")
+            return cached_attributes
 
-Strictly output ONLY the JSON object. Do not include any explanatory text before or after the JSON.
-Ensure the JSON is well-formed.
-"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_deployment,
-                response_format={"type": "json_object"}, # Request JSON output
-                messages=[
-                    {"role": "system", "content": "You are an AI assistant specialized in extracting structured information from text and outputting it in valid JSON format, adhering strictly to the specified schema."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,  # Lower temperature for more deterministic and factual output
-                max_tokens=1000     # Adjust as needed based on expected output size
+            enriched_attributes_json_str = self.provider.complete(
+                build_enrichment_messages(raw_text),
+                temperature=ENRICHMENT_TEMPERATURE,
+                max_tokens=ENRICHMENT_MAX_TOKENS,
+                json_mode=True, # Request JSON output
+                model=self.model_deployment
             )
-            
-            enriched_attributes_json_str = response.choices[0].message.content
             log_info("SOI: Successfully received IP attributes from LLM.")
-            
+
             # Validate and parse the JSON
-            try:
-                enriched_attributes = json.loads(enriched_attributes_json_str)
-                # Basic validation of expected keys
-                expected_keys = {"resonance_keys", "signifiers", "situational_imprint", "extracted_entities"}
-                if not expected_keys.issubset(enriched_attributes.keys()):
-                    log_error(f"SOI: LLM output missing some expected keys. Got: {enriched_attributes.keys()}")
-                    return None
-                return enriched_attributes
-            except json.JSONDecodeError as e:
-                log_error(f"SOI: Error parsing JSON response from LLM for IP enrichment: {e}")
-                log_error(f"Raw LLM response: {enriched_attributes_json_str}")
-                return None
+            enriched_attributes = parse_enrichment_response(enriched_attributes_json_str)
+            self._store_enrichment(raw_text, enriched_attributes)
+            return enriched_attributes
 
         except Exception as e:
             log_error(f"SOI: An error occurred during API call for IP enrichment: {e}")
             return None
 
+    @traced("soi.enrich_batch")
+    def _enrich_batch(self, raw_texts: List[str]) -> List[Optional[Dict]]:
+        """Sends one packed enrichment request; returns one (possibly None) result per text."""
+        try:
+            batch_json_str = self.provider.complete(
+                build_batch_enrichment_messages(raw_texts),
+                temperature=ENRICHMENT_TEMPERATURE,
+                max_tokens=min(BATCH_ENRICHMENT_MAX_OUTPUT_TOKENS, BATCH_ENRICHMENT_OUTPUT_TOKENS_PER_ITEM * len(raw_texts)),
+                json_mode=True, # Request JSON output
+                model=self.model_deployment
+            )
+            return parse_batch_enrichment_response(batch_json_str, len(raw_texts))
+        except Exception as e:
+            log_error(f"SOI: An error occurred during API call for batched IP enrichment: {e}")
+            return [None] * len(raw_texts)
+
+    def enrich_texts_to_ip_attributes(self, raw_texts: List[str],
+                                      token_budget: int = BATCH_ENRICHMENT_TOKEN_BUDGET) -> List[Optional[Dict]]:
+        """
+        Batch variant of enrich_text_to_ip_attributes that packs several texts into one request.
+
+        Texts are grouped into batches sized to `token_budget`. Any item that is missing
+        from a batch response or fails validation is retried with an individual call.
+
+        Args:
+            raw_texts: The raw text inputs to be processed.
+            token_budget: Approximate prompt-token budget per batched request.
+
+        Returns:
+            A list with one entry per input text (in input order): the attribute
+            dictionary, or None if enrichment failed for that text.
+        """
+        results: List[Optional[Dict]] = [None] * len(raw_texts)
+        pending: List[int] = []
+        for position, raw_text in enumerate(raw_texts):
+            results[position] = self._cached_enrichment(raw_text)
+            if results[position] is None:
+                pending.append(position)
+        if len(pending) < len(raw_texts):
+            log_info(f"SOI: {len(raw_texts) - len(pending)} of {len(raw_texts)} texts served from cache.")
+
+        for batch in plan_enrichment_batches([raw_texts[position] for position in pending], token_budget):
+            batch = [pending[idx] for idx in batch]
+            batch_texts = [raw_texts[position] for position in batch]
+            if len(batch) == 1:
+                results[batch[0]] = self.enrich_text_to_ip_attributes(batch_texts[0])
+                continue
+
+            log_info(f"SOI: Enriching batch of {len(batch)} texts in a single request.")
+            for position, attributes in zip(batch, self._enrich_batch(batch_texts)):
+                if attributes is None:
+                    log_info(f"SOI: Falling back to an individual enrichment call for text {position+1}.")
+                    METRICS.inc("cognitive_weave_soi_retries_total", kind="enrich")
+                    attributes = self.enrich_text_to_ip_attributes(raw_texts[position])
+                else:
+                    self._store_enrichment(raw_texts[position], attributes)
+                results[position] = attributes
+        return results
+
+    @traced("soi.synthesize")
     def synthesize_ia_from_imprints(self, ip_imprints: List[str]) -> Optional[InsightAggregateAttributes]:
         """
         Synthesizes a new Insight Aggregate (IA) from a list of situational imprints
@@ -101,62 +378,49 @@ Ensure the JSON is well-formed.
             return None
 
         log_info(f"SOI: Synthesizing IA from {len(ip_imprints)} IP imprints.")
-        
-        formatted_imprints = "\n".join([f"- Imprint {idx+1}: \"{imprint}\"" for idx, imprint in enumerate(ip_imprints)])
-
-        prompt = f"""
-You are an advanced AI knowledge synthesizer. You are tasked with creating a new, higher-level Insight Aggregate (IA) 
-from a collection of related situational imprints, each derived from a distinct Insight Particle (IP).
 
-Your goal is to:
-1. Identify the core, overarching theme, pattern, problem, or emergent conclusion that connects these imprints.
-2. Synthesize a new "ia_core_data" statement. This statement should be a concise, abstracted insight that is not explicitly stated in any single input but becomes evident from their combination. It should represent new, synthesized knowledge.
-3. Generate attributes specifically for this new IA.
-
-Input Information (Related IP Imprints):
----
-{formatted_imprints}
----
-
-Based on the collective information from these imprints, generate a single, valid JSON object with the following keys:
-- "ia_core_data": (String) The synthesized higher-level conclusion, summary, or identified pattern. This is the core knowledge of the new IA.
-- "ia_resonance_keys": (List of strings) 3-5 core terms or short phrases that are crucial for identifying this specific synthesized IA.
-- "ia_signifiers": (List of strings) 2-3 broad categorical labels for this IA (e.g., "strategic insight", "emergent trend", "risk assessment", "solution proposal").
-- "ia_situational_imprint": (String) A concise, single-sentence summary describing what this new Insight Aggregate itself represents or signifies.
+        cached_ia = self._cached_synthesis(ip_imprints)
+        if cached_ia is not None:
+            log_info("SOI: IA attributes served from cache.")
+            return cached_ia
 
-Strictly output ONLY the JSON object. Do not include any explanatory text before or after the JSON.
-Ensure the JSON is well-formed.
-"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_deployment,
-                response_format={"type": "json_object"}, # Request JSON output
-                messages=[
-                    {"role": "system", "content": "You are an AI assistant specialized in synthesizing higher-level insights from related information snippets and outputting the result as a valid JSON object, adhering strictly to the specified schema."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,  # Slightly higher temperature for more abstractive/creative synthesis
-                max_tokens=1500     # Adjust as needed
+            synthesized_ia_json_str = self.provider.complete(
+                build_synthesis_messages(ip_imprints),
+                temperature=SYNTHESIS_TEMPERATURE,
+                max_tokens=SYNTHESIS_MAX_TOKENS,
+                json_mode=True, # Request JSON output
+                model=self.model_deployment
             )
-            
-            synthesized_ia_json_str = response.choices[0].message.content
             log_info("SOI: Successfully received IA attributes from LLM.")
-            
-            try:
-                ia_data_dict = json.loads(synthesized_ia_json_str)
-                # Validate using Pydantic model
-                ia_attributes = InsightAggregateAttributes(**ia_data_dict)
-                return ia_attributes
-            except json.JSONDecodeError as e:
-                log_error(f"SOI: Error parsing JSON response from LLM for IA synthesis: {e}")
-                log_error(f"Raw LLM response: {synthesized_ia_json_str}")
-                return None
-            except Exception as pydantic_error: # Catch Pydantic validation errors
-                log_error(f"SOI: Error validating IA attributes against Pydantic model: {pydantic_error}")
-                log_error(f"Raw LLM response: {synthesized_ia_json_str}")
-                return None
+
+            ia_attributes = parse_synthesis_response(synthesized_ia_json_str)
+            if ia_attributes is not None:
+                self._store_synthesis(ip_imprints, synthesized_ia_json_str)
+            return ia_attributes
 
         except Exception as e:
             log_error(f"SOI: An error occurred during API call for IA synthesis: {e}")
             return None
 
+    @traced("soi.embed")
+    def embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Computes embeddings for a batch of texts with the embedding deployment.
+
+        Args:
+            texts: The texts to embed, sent together in a single request.
+
+        Returns:
+            One embedding vector per input text (in input order),
+            or None if an error occurs.
+        """
+        if not texts:
+            return []
+
+        log_info(f"SOI: Embedding {len(texts)} text(s).")
+        try:
+            return self.provider.embed(texts, model=self.embedding_deployment)
+        except Exception as e:
+            log_error(f"SOI: An error occurred during API call for embeddings: {e}")
+            return None
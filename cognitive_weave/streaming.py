@@ -0,0 +1,81 @@
+# cognitive_weave_poc/cognitive_weave/streaming.py
+
+import time
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+
+def chunk_delta(chunk) -> str:
+    """Text delta of one streamed chat completion chunk ('' for role/keep-alive chunks)."""
+    if not chunk.choices:  # Azure sends a content-filter chunk without choices first
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+class _StreamTiming:
+    """Full-text accumulation and latency bookkeeping shared by both stream types."""
+    def __init__(self, started_at: Optional[float], on_complete: Optional[Callable[["_StreamTiming"], None]]):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self.done = False
+        self._parts: List[str] = []
+        self._on_complete = on_complete
+
+    @property
+    def text(self) -> str:
+        """Text received so far; the complete response once `done` is set."""
+        return "".join(self._parts)
+
+    def _record(self, delta: str):
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.started_at
+        self._parts.append(delta)
+
+    def _finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.total_time = time.perf_counter() - self.started_at
+        if self.time_to_first_token is None:
+            self.time_to_first_token = self.total_time
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+
+class ResponseStream(_StreamTiming):
+    """
+    Iterator over the token deltas of a streamed response.
+
+    Keeps the full text for use after the stream ends (e.g. memory ingestion) and
+    records time-to-first-token and total time, measured from `started_at`.
+    """
+    def __init__(self, deltas: Iterable[str], started_at: Optional[float] = None,
+                 on_complete: Optional[Callable[["ResponseStream"], None]] = None):
+        super().__init__(started_at, on_complete)
+        self._deltas = deltas
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for delta in self._deltas:
+                if delta:
+                    self._record(delta)
+                    yield delta
+        finally:
+            self._finish()
+
+
+class AsyncResponseStream(_StreamTiming):
+    """Async-iterator counterpart of ResponseStream."""
+    def __init__(self, deltas: AsyncIterator[str], started_at: Optional[float] = None,
+                 on_complete: Optional[Callable[["AsyncResponseStream"], None]] = None):
+        super().__init__(started_at, on_complete)
+        self._deltas = deltas
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for delta in self._deltas:
+                if delta:
+                    self._record(delta)
+                    yield delta
+        finally:
+            self._finish()
@@ -0,0 +1,286 @@
+# cognitive_weave_poc/cognitive_weave/telemetry.py
+
+import asyncio
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# Upper bounds of the histogram buckets; +Inf is implicit. Latency histograms (seconds) use
+# LATENCY_BUCKETS by default, token-count histograms pass TOKEN_BUCKETS to observe().
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters, gauges and histograms keyed by name and labels.
+
+    Names follow Prometheus conventions (`_total` for counters, `_seconds` for
+    durations) so `render_prometheus` can be served or scraped as-is. A histogram's
+    buckets are fixed by the first observation of its name.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                # Every series of a name shares the buckets it was first observed with
+                bounds = next(iter(series.values())).bounds if series else tuple(sorted(buckets))
+                histogram = series[key] = _Histogram(bounds)
+            histogram.observe(value)
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge series (0.0 if it was never touched)."""
+        key = _label_key(labels)
+        with self._lock:
+            for family in (self._counters, self._gauges):
+                if key in family.get(name, {}):
+                    return family[name][key]
+        return 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict copy of every series, e.g. for JSON export or tests."""
+        with self._lock:
+            return {
+                "counters": {name: {_format_labels(k): v for k, v in series.items()} for name, series in self._counters.items()},
+                "gauges": {name: {_format_labels(k): v for k, v in series.items()} for name, series in self._gauges.items()},
+                "histograms": {
+                    name: {_format_labels(k): {"count": h.count, "sum": h.total} for k, h in series.items()}
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """Renders every series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._gauges):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in sorted(self._gauges[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+class TraceWriter:
+    """Appends finished spans and structured log records to a JSONL file, one object per line."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self.path: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def open(self, path: str):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(path, "a", encoding="utf-8")
+            self.path = path
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+            self.path = None
+
+
+METRICS = MetricsRegistry()
+TRACE = TraceWriter()
+
+# Set to False to turn span() into a no-op (metrics calls made directly still count)
+SPANS_ENABLED = True
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("cognitive_weave_span", default=None)
+
+
+class Span:
+    """One timed operation; attributes set while it is open end up in its trace record."""
+    __slots__ = ("name", "span_id", "trace_id", "parent_id", "attributes", "start_time", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    span_id = trace_id = parent_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Times a block as a named span.
+
+    The duration is observed in the `cognitive_weave_span_seconds{span=...}` histogram
+    and failures count in `cognitive_weave_span_errors_total`; with a trace file open
+    the span is also written there with its parent, so nested SOI and agent stages
+    form a tree per turn. Works across threads and asyncio tasks.
+    """
+    if not SPANS_ENABLED:
+        yield _NOOP_SPAN
+        return
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    status = "ok"
+    try:
+        yield current
+    except BaseException:
+        status = "error"
+        METRICS.inc("cognitive_weave_span_errors_total", span=name)
+        raise
+    finally:
+        _current_span.reset(token)
+        duration = time.perf_counter() - current._started
+        METRICS.observe("cognitive_weave_span_seconds", duration, span=name)
+        if TRACE.enabled:
+            TRACE.write({
+                "type": "span",
+                "name": name,
+                "trace_id": current.trace_id,
+                "span_id": current.span_id,
+                "parent_id": current.parent_id,
+                "start": current.start_time,
+                "duration_ms": round(duration * 1000.0, 3),
+                "status": status,
+                "attributes": current.attributes,
+            })
+
+
+def traced(name: str):
+    """Decorator running each call of a function or coroutine function inside span(name)."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def record_token_usage(usage, kind: str, model: str):
+    """Counts the tokens reported in an API response's `usage` block (if any)."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    METRICS.inc("cognitive_weave_llm_prompt_tokens_total", prompt_tokens, kind=kind, model=model)
+    if completion_tokens:
+        METRICS.inc("cognitive_weave_llm_completion_tokens_total", completion_tokens, kind=kind, model=model)
+    open_span = _current_span.get()
+    if open_span is not None:
+        open_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
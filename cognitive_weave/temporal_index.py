@@ -0,0 +1,123 @@
+# cognitive_weave_poc/cognitive_weave/temporal_index.py
+
+import bisect
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .data_structures import InsightParticle
+
+TimePoint = Union[datetime, float]
+
+
+def to_epoch(value: Optional[Union[TimePoint, str]]) -> Optional[float]:
+    """
+    Seconds since the Unix epoch of a datetime, ISO timestamp or epoch value.
+    Naive datetimes are taken as UTC, which is how datetime.utcnow() stamps particles.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def particle_epoch(ip: InsightParticle) -> Optional[float]:
+    """
+    Where a particle sits on the time axis: its creation, or for a refreshed IA its
+    last refresh, since the aggregate's content is only that old.
+    """
+    if ip.is_aggregate and ip.modification_timestamp:
+        return to_epoch(ip.modification_timestamp)
+    return to_epoch(ip.creation_timestamp)
+
+
+class TemporalIndex:
+    """
+    Temporal layer of the STRG: particle IDs kept sorted by epoch seconds.
+
+    Particles mostly arrive in time order, so adding one is usually an append; an
+    out-of-order timestamp (e.g. an imported transcript) is placed with bisect. Range
+    queries, sliding windows and the newest-N lookup bisect the sorted epochs and
+    slice, costing O(log n + k) instead of a scan that parses every ISO string.
+    """
+    def __init__(self):
+        self._epochs: List[float] = []
+        self._ids: List[str] = []
+        self._epoch_by_id: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, particle_id: str) -> bool:
+        return particle_id in self._epoch_by_id
+
+    def add(self, ip: InsightParticle):
+        """Indexes a particle; re-adding one moves it to its current timestamp."""
+        epoch = particle_epoch(ip)
+        if epoch is None:
+            return
+        if ip.particle_id in self._epoch_by_id:
+            if self._epoch_by_id[ip.particle_id] == epoch:
+                return
+            self.remove(ip.particle_id)
+        self._epoch_by_id[ip.particle_id] = epoch
+        if not self._epochs or epoch >= self._epochs[-1]:
+            self._epochs.append(epoch)
+            self._ids.append(ip.particle_id)
+            return
+        position = bisect.bisect_right(self._epochs, epoch)
+        self._epochs.insert(position, epoch)
+        self._ids.insert(position, ip.particle_id)
+
+    def remove(self, particle_id: str):
+        epoch = self._epoch_by_id.pop(particle_id, None)
+        if epoch is None:
+            return
+        position = bisect.bisect_left(self._epochs, epoch)
+        while self._ids[position] != particle_id:  # Walk particles sharing the timestamp
+            position += 1
+        del self._epochs[position]
+        del self._ids[position]
+
+    def epoch_of(self, particle_id: str) -> Optional[float]:
+        return self._epoch_by_id.get(particle_id)
+
+    def range(self, start: Optional[TimePoint] = None, end: Optional[TimePoint] = None) -> List[str]:
+        """IDs of the particles with start <= time < end, oldest first; an open bound is unbounded."""
+        low = 0 if start is None else bisect.bisect_left(self._epochs, to_epoch(start))
+        high = len(self._epochs) if end is None else bisect.bisect_left(self._epochs, to_epoch(end))
+        return self._ids[low:high]
+
+    def window(self, seconds: float, now: Optional[TimePoint] = None) -> List[str]:
+        """IDs of the particles from the last `seconds` up to and including `now`, oldest first."""
+        now_epoch = time.time() if now is None else to_epoch(now)
+        low = bisect.bisect_left(self._epochs, now_epoch - seconds)
+        high = bisect.bisect_right(self._epochs, now_epoch)
+        return self._ids[low:high]
+
+    def latest(self, count: int, before: Optional[TimePoint] = None) -> List[str]:
+        """IDs of the `count` newest particles (strictly before `before`, if given), newest first."""
+        high = len(self._epochs) if before is None else bisect.bisect_left(self._epochs, to_epoch(before))
+        return self._ids[max(0, high - count):high][::-1]
+
+    def recency_decay(self, particle_ids: Sequence[str], half_life_seconds: float,
+                      now: Optional[TimePoint] = None) -> np.ndarray:
+        """
+        Per-particle recency factor in (0, 1]: halves every `half_life_seconds` of age.
+        Particles without a timestamp get 1.0, so the decay never hides them.
+        """
+        now_epoch = time.time() if now is None else to_epoch(now)
+        epochs = np.fromiter((self._epoch_by_id.get(pid, now_epoch) for pid in particle_ids),
+                             dtype=np.float64, count=len(particle_ids))
+        ages = np.maximum(0.0, now_epoch - epochs)
+        return np.power(0.5, ages / half_life_seconds)
@@ -1,7 +1,15 @@
 # cognitive_weave_poc/cognitive_weave/utils.py
 
 import os
-from openai import AzureOpenAI
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Optional, Set
+
+from .telemetry import TRACE, current_span
+
+if TYPE_CHECKING:  # openai and httpx are imported on first client creation, not with the package
+    from openai import AzureOpenAI, AsyncAzureOpenAI
 
 # --- Azure OpenAI Configuration ---
 # IMPORTANT: The values below are hardcoded as per your request.
@@ -13,63 +21,242 @@ _PLACEHOLDER_KEY = "YOUR_AZURE_OPENAI_KEY"
 _PLACEHOLDER_DEPLOYMENT = "YOUR_GPT4_DEPLOYMENT_NAME"
 
 # --- Hardcoded Azure OpenAI Credentials ---
-AZURE_OAI_ENDPOINT = "https://wow.cognitiveservices.azure.com"
-AZURE_OAI_KEY = "SXEWERrewfwegwegwzukcSZWNDiT99Hv6XJ3w3AAAAACOG4328ewbfVUYEG&#DacqCmH"
-AZURE_OAI_DEPLOYMENT_GPT4 = "gpt-4"
-API_VERSION = "2024-04-01-preview"
+# Each value can be overridden with an environment variable of the same name,
+# e.g. AZURE_OAI_ENDPOINT=http://localhost:8000 to run against a local mock endpoint.
+AZURE_OAI_ENDPOINT = os.environ.get("AZURE_OAI_ENDPOINT", "https://wow.cognitiveservices.azure.com")
+AZURE_OAI_KEY = os.environ.get("AZURE_OAI_KEY", "SXEWERrewfwegwegwzukcSZWNDiT99Hv6XJ3w3AAAAACOG4328ewbfVUYEG&#DacqCmH")
+AZURE_OAI_DEPLOYMENT_GPT4 = os.environ.get("AZURE_OAI_DEPLOYMENT_GPT4", "gpt-4")
+AZURE_OAI_DEPLOYMENT_EMBEDDING = os.environ.get("AZURE_OAI_DEPLOYMENT_EMBEDDING", "text-embedding-3-small")
+API_VERSION = os.environ.get("AZURE_OAI_API_VERSION", "2024-04-01-preview")
 # --- End of Hardcoded Credentials ---
 
-# Check if the current values are still the original placeholders
-# This warning will now only trigger if the values above are accidentally reverted to the _PLACEHOLDER_ strings.
-if AZURE_OAI_ENDPOINT == _PLACEHOLDER_ENDPOINT or \
-   AZURE_OAI_KEY == _PLACEHOLDER_KEY or \
-   AZURE_OAI_DEPLOYMENT_GPT4 == _PLACEHOLDER_DEPLOYMENT:
-    print("="*80)
-    print("CRITICAL WARNING: Azure OpenAI credentials in cognitive_weave/utils.py are still the original placeholders!")
-    print("This should not happen if you have hardcoded your actual credentials above.")
-    print("Please check the variable assignments for AZURE_OAI_ENDPOINT, AZURE_OAI_KEY, and AZURE_OAI_DEPLOYMENT_GPT4.")
-    print("="*80)
-elif AZURE_OAI_ENDPOINT == "https://wow.cognitiveservices.azure.com" and \
-     AZURE_OAI_KEY == "399BEACHYHv6XJ3fewfewJBFIEBIICEWBIIUWBIe32234686423cewjcw3AAAAACOGqCmH" and \
-     AZURE_OAI_DEPLOYMENT_GPT4 == "gpt-4":
-    print("="*80)
-    print("INFO: Using the specific Azure OpenAI credentials hardcoded in cognitive_weave/utils.py.")
-    print(f"  Endpoint: {AZURE_OAI_ENDPOINT}")
-    print(f"  Deployment: {AZURE_OAI_DEPLOYMENT_GPT4}")
-    print(f"  API Version: {API_VERSION}")
-    print("  Note: Ensure these credentials are correct and the API key is valid (typically 32 characters).")
-    print("="*80)
-
-
-def get_azure_openai_client():
-    """
-    Initializes and returns an AzureOpenAI client.
-    """
+# Limits of the process-wide HTTP connection pools (one sync, one async) shared by every
+# client, SOI and agent; change them with configure_client_pool() before the first request.
+HTTP_MAX_CONNECTIONS = int(os.environ.get("COGNITIVE_WEAVE_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("COGNITIVE_WEAVE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("COGNITIVE_WEAVE_KEEPALIVE_EXPIRY", "30"))
+
+
+def credentials_are_placeholders() -> bool:
+    """Whether the Azure credentials above are still the original placeholder strings."""
+    return AZURE_OAI_ENDPOINT == _PLACEHOLDER_ENDPOINT or \
+        AZURE_OAI_KEY == _PLACEHOLDER_KEY or \
+        AZURE_OAI_DEPLOYMENT_GPT4 == _PLACEHOLDER_DEPLOYMENT
+
+
+def _ensure_credentials_configured():
     # Validate that credentials are not the original placeholders before trying to connect
-    if AZURE_OAI_ENDPOINT == _PLACEHOLDER_ENDPOINT or \
-       AZURE_OAI_KEY == _PLACEHOLDER_KEY or \
-       AZURE_OAI_DEPLOYMENT_GPT4 == _PLACEHOLDER_DEPLOYMENT:
+    if credentials_are_placeholders():
         log_error("Cannot initialize Azure OpenAI client: Credentials are still set to original placeholders.")
         log_error("Please update cognitive_weave/utils.py with your actual Azure credentials.")
         raise ValueError("Azure OpenAI credentials are not configured.")
 
+
+_client_lock = threading.Lock()
+_shared_http_client = None
+_shared_async_http_client = None
+_shared_azure_client = None
+_shared_async_azure_client = None
+
+
+def configure_client_pool(max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                          keepalive_expiry: Optional[float] = None):
+    """
+    Sets the shared connection pool limits. Pools that already exist are closed and
+    rebuilt with the new limits on next use.
+    """
+    global HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY
+    if max_connections is not None:
+        HTTP_MAX_CONNECTIONS = max_connections
+    if max_keepalive_connections is not None:
+        HTTP_MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+    if keepalive_expiry is not None:
+        HTTP_KEEPALIVE_EXPIRY = keepalive_expiry
+    close_shared_clients()
+
+
+def _pool_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def get_shared_http_client():
+    """
+    Returns the process-wide (sync) HTTP client, creating it on first use.
+    All sync SOI and agent instances share its connection pool and keep-alive connections.
+    """
+    global _shared_http_client
+    with _client_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            from openai import DefaultHttpxClient
+            _shared_http_client = DefaultHttpxClient(limits=_pool_limits())
+        return _shared_http_client
+
+
+def get_shared_async_http_client():
+    """
+    Returns the process-wide async HTTP client, creating it on first use.
+    All async SOI and agent instances share its connection pool and keep-alive connections.
+    """
+    global _shared_async_http_client
+    with _client_lock:
+        if _shared_async_http_client is None or _shared_async_http_client.is_closed:
+            from openai import DefaultAsyncHttpxClient
+            _shared_async_http_client = DefaultAsyncHttpxClient(limits=_pool_limits())
+        return _shared_async_http_client
+
+
+def get_azure_openai_client(http_client=None) -> "AzureOpenAI":
+    """
+    Returns the process-wide AzureOpenAI client on the shared connection pool, creating
+    it on first use. With an explicit `http_client`, a new dedicated client is returned.
+    """
+    global _shared_azure_client
+    _ensure_credentials_configured()
+
+    try:
+        from openai import AzureOpenAI
+        if http_client is not None:
+            return AzureOpenAI(azure_endpoint=AZURE_OAI_ENDPOINT, api_key=AZURE_OAI_KEY,
+                               api_version=API_VERSION, http_client=http_client, max_retries=0)
+        pool = get_shared_http_client()
+        with _client_lock:
+            if _shared_azure_client is None or _shared_azure_client._client is not pool:
+                _shared_azure_client = AzureOpenAI(
+                    azure_endpoint=AZURE_OAI_ENDPOINT,
+                    api_key=AZURE_OAI_KEY,
+                    api_version=API_VERSION,
+                    http_client=pool,
+                    max_retries=0,  # Retried by resilience.ResilientProvider
+                )
+            return _shared_azure_client
+    except Exception as e:
+        log_error(f"Error initializing Azure OpenAI client: {e}")
+        log_error("Please ensure your Azure OpenAI endpoint, key, deployment name, and API version are correctly configured and valid in cognitive_weave/utils.py.")
+        raise
+
+
+def get_async_azure_openai_client(http_client=None) -> "AsyncAzureOpenAI":
+    """
+    Returns the process-wide AsyncAzureOpenAI client on the shared async connection pool,
+    creating it on first use. With an explicit `http_client`, a new dedicated client is returned.
+    """
+    global _shared_async_azure_client
+    _ensure_credentials_configured()
+
     try:
-        client = AzureOpenAI(
-            azure_endpoint=AZURE_OAI_ENDPOINT,
-            api_key=AZURE_OAI_KEY,
-            api_version=API_VERSION
-        )
-        return client
+        from openai import AsyncAzureOpenAI
+        if http_client is not None:
+            return AsyncAzureOpenAI(azure_endpoint=AZURE_OAI_ENDPOINT, api_key=AZURE_OAI_KEY,
+                                    api_version=API_VERSION, http_client=http_client, max_retries=0)
+        pool = get_shared_async_http_client()
+        with _client_lock:
+            if _shared_async_azure_client is None or _shared_async_azure_client._client is not pool:
+                _shared_async_azure_client = AsyncAzureOpenAI(
+                    azure_endpoint=AZURE_OAI_ENDPOINT,
+                    api_key=AZURE_OAI_KEY,
+                    api_version=API_VERSION,
+                    http_client=pool,
+                    max_retries=0,  # Retried by resilience.ResilientProvider
+                )
+            return _shared_async_azure_client
     except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {e}")
-        print("Please ensure your Azure OpenAI endpoint, key, deployment name, and API version are correctly configured and valid in cognitive_weave/utils.py.")
+        log_error(f"Error initializing async Azure OpenAI client: {e}")
         raise
 
-# Example of a simple logger if needed (optional for this PoC)
-def log_info(message: str):
+
+def close_shared_clients():
+    """Closes the shared sync pool and drops the shared clients (the async pool is closed if no loop needs it)."""
+    global _shared_http_client, _shared_async_http_client, _shared_azure_client, _shared_async_azure_client
+    with _client_lock:
+        if _shared_http_client is not None:
+            _shared_http_client.close()
+        # An httpx.AsyncClient can only be closed from a running loop; dropping it releases the sockets on GC
+        _shared_http_client = _shared_async_http_client = None
+        _shared_azure_client = _shared_async_azure_client = None
+
+
+def describe_azure_configuration() -> str:
+    """One-line summary of the Azure settings in use (the key is never included)."""
+    return f"Azure OpenAI endpoint {AZURE_OAI_ENDPOINT}, deployment {AZURE_OAI_DEPLOYMENT_GPT4}, API version {API_VERSION}"
+
+# --- Logging ---
+# Level-gated: messages below the current level return before doing any work. Set the
+# level with set_log_level() or the COGNITIVE_WEAVE_LOG_LEVEL environment variable.
+# Keyword fields are appended as key=value and, with a trace file open (see
+# telemetry.py), written there as structured records tied to the current span.
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "ERROR": 40, "OFF": 100}
+_log_level = LOG_LEVELS.get(os.environ.get("COGNITIVE_WEAVE_LOG_LEVEL", "INFO").upper(), LOG_LEVELS["INFO"])
+
+
+def set_log_level(level: str):
+    """Sets the minimum level that is printed: DEBUG, INFO, ERROR or OFF."""
+    global _log_level
+    _log_level = LOG_LEVELS[level.upper()]
+
+
+def log_enabled(level: str) -> bool:
+    """Whether messages of `level` are emitted; guard expensive log formatting with it."""
+    return LOG_LEVELS[level] >= _log_level
+
+
+def _emit(level: str, message: str, fields: dict):
+    if fields:
+        print(f"[{level}] {message} " + " ".join(f"{key}={value}" for key, value in fields.items()))
+    else:
+        print(f"[{level}] {message}")
+    if TRACE.enabled:
+        span = current_span()
+        TRACE.write({"type": "log", "level": level, "time": time.time(), "message": message.strip(),
+                     "span_id": span.span_id if span is not None else None, **fields})
+
+
+def log_debug(message: str, **fields):
+    """Detail logger for per-particle and per-prompt output (off by default)."""
+    if _log_level <= LOG_LEVELS["DEBUG"]:
+        _emit("DEBUG", message, fields)
+
+def log_info(message: str, **fields):
     """Simple informational logger."""
-    print(f"[INFO] {message}")
+    if _log_level <= LOG_LEVELS["INFO"]:
+        _emit("INFO", message, fields)
 
-def log_error(message: str):
+def log_error(message: str, **fields):
     """Simple error logger."""
-    print(f"[ERROR] {message}")
+    if _log_level <= LOG_LEVELS["ERROR"]:
+        _emit("ERROR", message, fields)
+
+
+# A simple list of common stopwords for basic relevance checking
+STOPWORDS = set([
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "should",
+    "can", "could", "may", "might", "must", "i", "you", "he", "she", "it",
+    "we", "they", "me", "him", "her", "us", "them", "my", "your", "his",
+    "its", "our", "their", "mine", "yours", "hers", "ours", "theirs",
+    "to", "of", "in", "on", "at", "for", "with", "about", "against",
+    "between", "into", "through", "during", "before", "after", "above",
+    "below", "from", "up", "down", "out", "over", "under", "again",
+    "further", "then", "once", "here", "there", "when", "where", "why",
+    "how", "all", "any", "both", "each", "few", "more", "most", "other",
+    "some", "such", "no", "nor", "not", "only", "own", "same", "so",
+    "than", "too", "very", "s", "t", "just", "don", "shouldve", "now",
+    "what", "tell", "me", "give", "explain", "about", "whats", "who", "whom"
+])
+
+def estimate_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+def extract_keywords(text: str) -> Set[str]:
+    """Simple preprocessing to extract potential keywords from text."""
+    text = text.lower()
+    text = _PUNCTUATION_RE.sub('', text) # Remove punctuation
+    words = text.split()
+    return {word for word in words if word not in STOPWORDS and len(word) > 2}
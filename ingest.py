@@ -0,0 +1,79 @@
+# cognitive_weave_poc/ingest.py
+
+import argparse
+import asyncio
+
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
+from cognitive_weave.ingestion import BulkIngestor, DEFAULT_PASSAGE_TOKENS, make_process_pool
+from cognitive_weave.telemetry import METRICS, TRACE
+from cognitive_weave.utils import (
+    LOG_LEVELS, configure_client_pool, credentials_are_placeholders, log_info, set_log_level
+)
+from main import (
+    ConversationalAgent, add_oracle_cache_arguments, add_provider_arguments, build_oracle_cache, build_provider,
+    provider_needs_azure_credentials
+)
+
+
+async def run_ingestion(args) -> dict:
+    provider = build_provider(args)
+    # Only the durable store is filled here; the retrieval indexes are built when the memory is next opened
+    agent = ConversationalAgent(memory_path=args.memory, provider=provider, defer_indexing=True)
+    oracle_cache = build_oracle_cache(args)
+    soi = AsyncSemanticOracleInterface(provider=provider, max_concurrency=args.concurrency, cache=oracle_cache)
+    executor = make_process_pool(args.workers)
+    try:
+        ingestor = BulkIngestor(agent, soi, checkpoint_path=args.checkpoint or f"{args.memory}.ingest.json",
+                                chunk_size=args.chunk_size, max_chunks_in_flight=args.max_chunks_in_flight,
+                                executor=executor, include_responses=args.include_responses,
+                                passage_tokens=args.passage_tokens)
+        return await ingestor.run(args.paths)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        agent.close()
+        if oracle_cache is not None:
+            oracle_cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load transcripts and document corpora into a Cognitive Weave memory")
+    parser.add_argument("paths", nargs="+", help="files or directories (.log transcripts, .jsonl records, .txt/.md documents)")
+    parser.add_argument("--memory", metavar="PATH", required=True, help="SQLite memory file to load into (created if missing)")
+    parser.add_argument("--checkpoint", metavar="PATH", help="resume file (default: <memory>.ingest.json); rerun to resume")
+    parser.add_argument("--chunk-size", type=int, default=256, help="records enriched and committed together")
+    parser.add_argument("--max-chunks-in-flight", type=int, default=4, help="chunks being enriched concurrently")
+    parser.add_argument("--concurrency", type=int, default=16, help="enrichment requests in flight")
+    parser.add_argument("--workers", type=int, help="processes for hashing and particle building (0 runs them inline)")
+    parser.add_argument("--include-responses", action="store_true", help="also ingest the agent responses of .log transcripts")
+    parser.add_argument("--passage-tokens", type=int, default=DEFAULT_PASSAGE_TOKENS,
+                        help="approximate size of the passages plain-text documents are split into")
+    add_provider_arguments(parser)
+    add_oracle_cache_arguments(parser)
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), default="ERROR")
+    parser.add_argument("--trace", metavar="PATH", help="append spans and structured log records to a JSONL trace file")
+    parser.add_argument("--metrics", metavar="PATH", help="write counters and latency histograms in Prometheus text format on exit")
+    parser.add_argument("--max-connections", type=int, help="size of the shared HTTP connection pool")
+    parser.add_argument("--max-keepalive-connections", type=int, help="idle connections the shared pool keeps alive")
+    args = parser.parse_args()
+    set_log_level(args.log_level)
+    configure_client_pool(max_connections=args.max_connections, max_keepalive_connections=args.max_keepalive_connections)
+
+    if args.provider == "http" and not args.base_url:
+        parser.error("--provider http requires --base-url")
+    if provider_needs_azure_credentials(args) and credentials_are_placeholders():
+        parser.error("Azure OpenAI credentials in cognitive_weave/utils.py are placeholders; "
+                     "configure them or use --provider offline")
+    if args.trace:
+        TRACE.open(args.trace)
+    try:
+        totals = asyncio.run(run_ingestion(args))
+        log_info(f"Ingested into {args.memory}: {totals}")
+        print(f"records {totals['records']}, ingested {totals['ingested']}, "
+              f"duplicates {totals['duplicates']}, failed {totals['failed']}")
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume from the last committed chunk.")
+    finally:
+        if args.metrics:
+            METRICS.write_prometheus(args.metrics)
+        TRACE.close()
@@ -1,85 +1,514 @@
 # cognitive_weave_poc/conversational_agent.py
 
-import re
-from typing import List, Optional, Dict, Set
+import argparse
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Deque, Iterable, Iterator, List, Optional, Dict, Sequence, Set, Tuple
 
-from openai import AzureOpenAI
+import numpy as np
 
 from cognitive_weave.semantic_oracle import SemanticOracleInterface
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
 from cognitive_weave.data_structures import InsightParticle, InsightAggregateAttributes
-from cognitive_weave.utils import get_azure_openai_client, AZURE_OAI_DEPLOYMENT_GPT4, log_info, log_error
-
-# A simple list of common stopwords for basic relevance checking
-STOPWORDS = set([
-    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being",
-    "have", "has", "had", "do", "does", "did", "will", "would", "should",
-    "can", "could", "may", "might", "must", "i", "you", "he", "she", "it",
-    "we", "they", "me", "him", "her", "us", "them", "my", "your", "his",
-    "its", "our", "their", "mine", "yours", "hers", "ours", "theirs",
-    "to", "of", "in", "on", "at", "for", "with", "about", "against",
-    "between", "into", "through", "during", "before", "after", "above",
-    "below", "from", "up", "down", "out", "over", "under", "again",
-    "further", "then", "once", "here", "there", "when", "where", "why",
-    "how", "all", "any", "both", "each", "few", "more", "most", "other",
-    "some", "such", "no", "nor", "not", "only", "own", "same", "so",
-    "than", "too", "very", "s", "t", "just", "don", "shouldve", "now",
-    "what", "tell", "me", "give", "explain", "about", "whats", "who", "whom"
-])
+from cognitive_weave.keyword_index import BM25FIndex
+from cognitive_weave.embedding_store import EmbeddingStore
+from cognitive_weave.resonance_graph import ResonanceGraph, EDGE_TEMPORAL_NEXT, EDGE_DERIVED_FROM
+from cognitive_weave.consolidation import ConsolidationEngine, SynthesisJob
+from cognitive_weave.consolidation_worker import ConsolidationWorker, AsyncConsolidationWorker
+from cognitive_weave.dedup import DuplicateDetector, DuplicateMatch
+from cognitive_weave.temporal_index import TemporalIndex, TimePoint, particle_epoch, to_epoch
+from cognitive_weave.response_cache import ResponseCache, context_signature
+from cognitive_weave.oracle_cache import OracleCache
+from cognitive_weave.context_assembler import ContextAssembler
+from cognitive_weave.streaming import ResponseStream, AsyncResponseStream
+from cognitive_weave.providers import LLMProvider, OpenAICompatibleProvider, RecordReplayProvider, RECORDING_MODES
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.persistence import PersistentMemoryStore
+from cognitive_weave.columnar_store import ColumnarMemoryStore
+from cognitive_weave.lifecycle import TieredMemoryManager
+from cognitive_weave.resilience import ResilientProvider, RetryPolicy, configure_deployment_limits
+from cognitive_weave.telemetry import METRICS, TRACE, traced
+from cognitive_weave.utils import (
+    log_debug, log_enabled, log_info, log_error, set_log_level, LOG_LEVELS, extract_keywords,
+    configure_client_pool, credentials_are_placeholders, describe_azure_configuration,
+)
+
+if TYPE_CHECKING:
+    from openai import AzureOpenAI, AsyncAzureOpenAI
+
+RESPONSE_TEMPERATURE = 0.7
+RESPONSE_MAX_TOKENS = 3000
+RESPONSE_ERROR_MESSAGE = "I encountered an error trying to process your request. Please try again."
+
+# Turn ordering: PIPELINED enriches the user's utterance while retrieval and the response run,
+# so a turn does not retrieve its own IP; SEQUENTIAL stores the IP first so the turn can see it.
+TURN_ORDERING_PIPELINED = "pipelined"
+TURN_ORDERING_SEQUENTIAL = "sequential"
 
 
 class ConversationalAgent:
     """
     A conversational agent that uses the Cognitive Weave memory system.
     """
-    def __init__(self):
-        self.soi = SemanticOracleInterface()
-        self.conversational_llm_client: AzureOpenAI = get_azure_openai_client()
-        self.conversational_llm_deployment: str = AZURE_OAI_DEPLOYMENT_GPT4
+    def __init__(self, embedder=None, soi=None, conversational_llm_client: Optional["AzureOpenAI"] = None,
+                 memory_path: Optional[str] = None, compact_memory: bool = False, provider: Optional[LLMProvider] = None,
+                 initial_embedding_capacity: int = 1024, hot_set_size: int = 10000, read_only: bool = False,
+                 oracle_cache: Optional[OracleCache] = None, synthesis_min_interval: float = 5.0,
+                 synthesis_token_budget: Optional[int] = None, defer_indexing: bool = False):
+        # All model calls go through the provider; by default it wraps conversational_llm_client
+        # (or the Azure client from utils.py). Pass e.g. OfflineProvider() to run without network.
+        self.provider: LLMProvider = provider if provider is not None else ResilientProvider(OpenAICompatibleProvider(client=conversational_llm_client))
+        # oracle_cache serves repeated enrichment and synthesis inputs without an LLM call (see oracle_cache.py)
+        self.soi = soi if soi is not None else SemanticOracleInterface(provider=self.provider, cache=oracle_cache)
+        self.conversational_llm_deployment: str = self.provider.chat_model
         
-        self.memory_store: List[InsightParticle] = []
+        # With memory_path, particles live in a durable SQLite store and are loaded lazily on access.
+        # With compact_memory, they live in columns and every holder gets short-lived views by ID.
+        # A read_only agent opens memory_path without write access and never records accesses
+        # (e.g. a knowledge base shared by many agents); only retrieval is supported.
+        self.read_only = read_only
+        if memory_path:
+            self.memory_store: List[InsightParticle] = PersistentMemoryStore(memory_path, read_only=read_only)
+        elif compact_memory:
+            self.memory_store = ColumnarMemoryStore()
+        else:
+            self.memory_store = []
+        # Store-backed memories hand out particles by ID, so indexes do not pin them in RAM
+        self._resolve_from_store = isinstance(self.memory_store, (ColumnarMemoryStore, PersistentMemoryStore))
+        # BM25F over resonance keys, signifiers, imprint and entities (see keyword_index.py)
+        self.keyword_index = BM25FIndex(tokenizer=self._preprocess_query_for_keywords,
+                                        resolver=self.memory_store.get if self._resolve_from_store else None)
+        # Vector recall fills result slots that keyword overlap leaves empty (e.g. paraphrases).
+        # To use the Azure embedding deployment instead of local hashing, pass an embedder built before the agent,
+        # e.g. embedder=OracleEmbedder(SemanticOracleInterface(provider=provider)) (see OracleEmbedder).
+        self.embedding_store = EmbeddingStore(embedder=embedder, initial_capacity=initial_embedding_capacity)
+        self.use_vector_recall = True
+        self.vector_recall_k = 20
+        self.vector_min_similarity = 0.2
+        # Relational layer of the STRG, built from relational_strands and IA provenance.
+        # Set graph_expansion_hops > 0 to add up to graph_expansion_k graph neighbours of the hits.
+        self.graph = ResonanceGraph()
+        self.graph_expansion_hops = 0
+        self.graph_expansion_k = 2
+        # Temporal layer of the STRG: particles sorted by time for range and window queries.
+        # With recency_weight > 0, keyword scores are blended with a recency factor that halves
+        # every recency_half_life_hours: score * (1 - recency_weight + recency_weight * decay).
+        self.temporal_index = TemporalIndex()
+        self.recency_weight = 0.0
+        self.recency_half_life_hours = 24 * 7
+        # Optional agent whose memories (e.g. shared domain knowledge) are retrieved alongside
+        # this agent's own through retrieve_knowledge, which records no accesses; open it with
+        # read_only=True so its file is never written to.
+        self.knowledge_base: Optional["ConversationalAgent"] = None
+        self.knowledge_top_k = 2
+        # Retrieval candidates per response; the assembler packs the best of them into its token budget
+        self.context_candidates = 6
+        self.context_assembler = ContextAssembler()
+        # Optional cache of responses to repeated or near-identical queries over the same
+        # retrieved memories (see response_cache.py); it can be shared by agents with distinct scopes.
+        self.response_cache: Optional[ResponseCache] = None
+        self.response_cache_scope = ""
+        # Groups related IPs so each synthesis run only revisits clusters that changed
+        self.consolidation = ConsolidationEngine()
+        # Restatements of stored IPs are merged into them instead of appended, and exact or
+        # near-exact ones skip enrichment (MinHash/LSH, see dedup.py). Set to None to disable.
+        self.deduplicator: Optional[DuplicateDetector] = DuplicateDetector()
+        # Batched access statistics, importance decay and collection of decayed IPs that an IA covers.
+        # With durable memory only the hot_set_size most recently used particles stay pinned in RAM.
+        self.lifecycle = TieredMemoryManager(
+            resolve=self._get_particle,
+            persist=self._persist_updates,
+            remove=self._remove_particles,
+            hot_capacity=hot_set_size if isinstance(self.memory_store, PersistentMemoryStore) else None
+        )
+        self.maintenance_interval = 20 # Flush access statistics and collect garbage every N turns
+        self._particles_by_id: Dict[str, InsightParticle] = {}
+        self._last_input_particle: Optional[InsightParticle] = None
+        # With defer_indexing (e.g. bulk loading), particles only go to the store until the
+        # indexes are built from it, by build_indexes() or the first write or retrieval that needs them
+        self._indexes_built = not self.memory_store and not defer_indexing
+        # The indexes of a warm-started store are built on a background thread (see start_index_build);
+        # until they are ready, retrieval keyword-searches only the index_build_window newest particles
+        # instead of waiting, and writes wait for the build
+        self.retrieve_while_indexing = True
+        self.index_build_window = 2000
+        self._index_build_lock = threading.Lock()
+        self._index_builder: Optional[threading.Thread] = None
+        self._index_build_error: Optional[BaseException] = None
+        self._window_index: Optional[BM25FIndex] = None
+        if isinstance(self.memory_store, PersistentMemoryStore):
+            self._last_input_particle = self.memory_store.last(is_aggregate=False)
         self.turn_count = 0
         self.ia_synthesis_interval = 3 # Synthesize IA every N turns
+        self.turn_ordering = TURN_ORDERING_PIPELINED
+        # A single worker keeps pipelined ingestion in turn order
+        self._ingestion_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+        # Also store the agent's own (complete) responses as IPs
+        self.ingest_agent_responses = False
+        # Per-turn response latency: {"turn", "time_to_first_token", "total_time", "streamed"}
+        self.turn_timings: Deque[Dict] = deque(maxlen=1000)
+        # Guards memory and indexes; the consolidation worker publishes IAs while turns retrieve
+        self._memory_lock = threading.RLock()
+        # start_chat hands synthesis to this worker so turns never wait on it. Its runs are at least
+        # synthesis_min_interval seconds apart and, with synthesis_token_budget, spend at most that
+        # many estimated tokens per rolling hour.
+        self.consolidation_worker = ConsolidationWorker(
+            plan=self._plan_synthesis_jobs,
+            synthesize=self.soi.synthesize_ia_from_imprints,
+            publish=self._store_aggregate,
+            min_interval_seconds=synthesis_min_interval,
+            token_budget_per_hour=synthesis_token_budget
+        )
 
-        log_info("ConversationalAgent initialized.")
+        log_info(f"{type(self).__name__} initialized.")
         log_info(f"  SOI ready: {'Yes' if self.soi else 'No'}")
-        log_info(f"  Conversational LLM client ready: {'Yes' if self.conversational_llm_client else 'No'}")
+        log_info(f"  LLM provider: {self.provider.name}")
         log_info(f"  Using LLM deployment for conversation: {self.conversational_llm_deployment}")
+        if memory_path:
+            log_info(f"  Persistent memory: {memory_path} ({len(self.memory_store)} particles, indexes built in the background)")
 
     def _preprocess_query_for_keywords(self, text: str) -> Set[str]:
         """Simple preprocessing to extract potential keywords from text."""
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text) # Remove punctuation
-        words = text.split()
-        return {word for word in words if word not in STOPWORDS and len(word) > 2}
+        return extract_keywords(text)
+
+    def start_index_build(self) -> bool:
+        """
+        Starts building the retrieval indexes of a warm-started memory store on a
+        background thread, unless they are built or being built. Returns whether they are ready.
+        """
+        with self._index_build_lock:
+            if self._indexes_built:
+                return True
+            if self._index_builder is None:
+                self._index_builder = threading.Thread(target=self._build_indexes, name="index-build", daemon=True)
+                self._index_builder.start()
+            return False
+
+    def build_indexes(self):
+        """Builds the retrieval indexes over every stored particle now, or waits for a running build."""
+        self._ensure_indexes()
+
+    def _ensure_indexes(self):
+        """Waits until the retrieval indexes of a warm-started memory store are built, starting the build if needed."""
+        if self._indexes_built:
+            return
+        self.start_index_build()
+        self._index_builder.join()
+        if self._index_build_error is not None:
+            raise RuntimeError("Building the retrieval indexes failed.") from self._index_build_error
+
+    def _build_indexes(self):
+        """Indexes every stored particle; runs on the index build thread."""
+        started_at = time.perf_counter()
+        try:
+            self._index_stored_particles()
+        except Exception as e:
+            self._index_build_error = e
+            log_error(f"Building the retrieval indexes failed: {e}")
+            return
+        self._window_index = None
+        self._indexes_built = True
+        elapsed = time.perf_counter() - started_at
+        METRICS.observe("cognitive_weave_index_build_seconds", elapsed)
+        log_info(f"Retrieval indexes over {len(self.memory_store)} stored particles built in {elapsed:.2f}s.")
+
+    def _index_stored_particles(self):
+        """Adds every particle of the memory store to the retrieval indexes in one scan."""
+        log_info(f"Building retrieval indexes over {len(self.memory_store)} stored particles...")
+        batch: List[InsightParticle] = []
+        aggregates: List[InsightParticle] = []
+        # The duplicate detector shingles core_data, so fetch payloads in the same scan
+        iter_with_core_data = getattr(self.memory_store, "iter_with_core_data", None)
+        particles = iter_with_core_data() if self.deduplicator is not None and iter_with_core_data else self.memory_store
+        for ip in particles:
+            if not self._resolve_from_store:
+                self._particles_by_id[ip.particle_id] = ip
+            self.keyword_index.add(ip)
+            self.temporal_index.add(ip)
+            if self.deduplicator is not None:
+                self.deduplicator.add(ip)
+            self.graph.add_particle(ip)
+            if ip.is_aggregate:
+                aggregates.append(ip)
+            else:
+                self.consolidation.add_particle(ip)
+            batch.append(ip)
+            if len(batch) >= 1000:
+                self.embedding_store.add_particles(batch)
+                batch = []
+        self.embedding_store.add_particles(batch)
+        # A refreshed IA can predate some of its sources in storage order, so attach IAs last
+        for ia in aggregates:
+            self.consolidation.register_aggregate(ia)
+            self.lifecycle.note_aggregate(ia)
+
+    def _persist_update(self, ip: InsightParticle):
+        """Writes in-place changes of a stored particle through to durable memory, if any."""
+        update = getattr(self.memory_store, "update", None)
+        if update is not None:
+            update(ip)
+
+    def _persist_updates(self, ips: List[InsightParticle]):
+        """Writes a batch of changed particles through to durable memory in one go, if supported."""
+        update_many = getattr(self.memory_store, "update_many", None)
+        if update_many is not None:
+            update_many(ips)
+            return
+        for ip in ips:
+            self._persist_update(ip)
+
+    def _get_particle(self, particle_id: str) -> Optional[InsightParticle]:
+        """Looks up a stored particle by ID, or returns None (e.g. for a dangling strand target)."""
+        if self._resolve_from_store:
+            return self.memory_store.get(particle_id)
+        return self._particles_by_id.get(particle_id)
+
+    def _index_particle(self, ip: InsightParticle):
+        """Registers a newly stored particle with every retrieval index."""
+        if not self._resolve_from_store:
+            self._particles_by_id[ip.particle_id] = ip
+        self.keyword_index.add(ip)
+        self.temporal_index.add(ip)
+        self.embedding_store.add_particle(ip)
+        self.graph.add_particle(ip)
+        self.consolidation.add_particle(ip)
+        self.lifecycle.admit(ip)
+        if self.deduplicator is not None:
+            self.deduplicator.add(ip)
+        METRICS.set("cognitive_weave_memory_particles", len(self.memory_store))
+
+    def _remove_particles(self, particle_ids: List[str]):
+        """Drops collected particles from memory and the indexes; graph nodes remain as dangling targets."""
+        remove_many = getattr(self.memory_store, "remove_many", None)
+        if remove_many is not None:
+            remove_many(particle_ids)
+        else:
+            removed = set(particle_ids)
+            self.memory_store[:] = [ip for ip in self.memory_store if ip.particle_id not in removed]
+        for particle_id in particle_ids:
+            self._particles_by_id.pop(particle_id, None)
+            self.keyword_index.remove(particle_id)
+            self.temporal_index.remove(particle_id)
+            self.consolidation.remove_particle(particle_id)
+            if self.deduplicator is not None:
+                self.deduplicator.remove(particle_id)
+        self.embedding_store.remove(particle_ids)
+        if self.response_cache is not None:
+            self.response_cache.invalidate(particle_ids)
+        METRICS.set("cognitive_weave_memory_particles", len(self.memory_store))
+
+    def _link_temporal_successor(self, new_ip: InsightParticle):
+        """Chains consecutive input particles with a temporal_next strand."""
+        previous = self._last_input_particle
+        strand = {"type": EDGE_TEMPORAL_NEXT, "target_id": new_ip.particle_id}
+        if previous is not None and previous is not new_ip and strand not in previous.relational_strands:
+            previous.relational_strands.append(strand)
+            self._persist_update(previous)
+            self.graph.add_edge(previous.particle_id, new_ip.particle_id, EDGE_TEMPORAL_NEXT)
+        self._last_input_particle = new_ip
+
+    def _merge_duplicate(self, match: DuplicateMatch) -> Optional[InsightParticle]:
+        """
+        Folds a restatement into the stored IP it matched: counts it as an access and
+        chains it into the conversation with a temporal_next strand, instead of storing a copy.
+        """
+        existing = self._get_particle(match.particle_id)
+        if existing is None:  # Collected since it was indexed
+            self.deduplicator.remove(match.particle_id)
+            return None
+        existing.access_frequency += 1
+        existing.last_access_timestamp = datetime.utcnow().isoformat()
+        self._persist_update(existing)
+        self._link_temporal_successor(existing)
+        self.lifecycle.admit(existing)
+        METRICS.inc("cognitive_weave_dedup_merged_total", kind=match.kind)
+        log_info(f"Merged restatement into IP {existing.particle_id} ({match.kind} match, similarity {match.similarity:.2f}).")
+        return existing
+
+    def _merge_if_restated(self, text_input: str) -> Optional[InsightParticle]:
+        """Merges `text_input` into a stored IP it exactly or near-exactly restates; None if there is none."""
+        if self.deduplicator is None:
+            return None
+        # Waits for a background index build outside the lock, so retrieval can fall back meanwhile
+        self._ensure_indexes()
+        with self._memory_lock:
+            match = self.deduplicator.match_text(text_input)
+            return self._merge_duplicate(match) if match is not None else None
+
+    @traced("agent.store")
+    def _store_enriched_particle(self, text_input: str, ip_attributes: Optional[Dict]) -> Optional[InsightParticle]:
+        """Creates an InsightParticle from enrichment output and commits it to memory."""
+        if ip_attributes:
+            self._ensure_indexes()
+        with self._memory_lock:
+            if ip_attributes and self.deduplicator is not None:
+                match = self.deduplicator.match_enriched(text_input, ip_attributes.get("situational_imprint"))
+                merged = self._merge_duplicate(match) if match is not None else None
+                if merged is not None:
+                    return merged
+            if ip_attributes:
+                new_ip = InsightParticle(
+                    core_data=text_input, # Store original text as core_data for this PoC
+                    resonance_keys=ip_attributes.get("resonance_keys", []),
+                    signifiers=ip_attributes.get("signifiers", []),
+                    situational_imprint=ip_attributes.get("situational_imprint"),
+                    extracted_entities=ip_attributes.get("extracted_entities", [])
+                )
+                self.memory_store.append(new_ip)
+                self._index_particle(new_ip)
+                self._link_temporal_successor(new_ip)
+                log_info(f"Successfully created and stored IP: {new_ip.particle_id}")
+                if log_enabled("DEBUG"):
+                    log_debug(f"  Situational Imprint: \"{new_ip.situational_imprint}\"")
+                    log_debug(f"  Resonance Keys: {new_ip.resonance_keys}")
+                    log_debug(f"  Total IPs in memory: {len(self.memory_store)}")
+                return new_ip
+            else:
+                log_error("Failed to enrich text for IP creation. Not added to memory.")
+                return None
 
-    def add_to_memory(self, text_input: str, source: str = "user_input"):
+    @traced("agent.add_to_memory")
+    def add_to_memory(self, text_input: str, source: str = "user_input") -> Optional[InsightParticle]:
         """
         Processes text input, creates an InsightParticle, and adds it to memory.
+
+        A restatement of a stored IP is merged into it instead (see _merge_duplicate) and
+        returns that IP; exact and near-exact restatements are not sent for enrichment.
         """
         log_info(f"\n--- Adding to Memory (Source: {source}) ---")
-        log_info(f"Raw text: \"{text_input}\"")
-        
+        log_debug(f"Raw text: \"{text_input}\"")
+
+        restated = self._merge_if_restated(text_input)
+        if restated is not None:
+            return restated
         ip_attributes = self.soi.enrich_text_to_ip_attributes(text_input)
-        if ip_attributes:
-            new_ip = InsightParticle(
-                core_data=text_input, # Store original text as core_data for this PoC
-                resonance_keys=ip_attributes.get("resonance_keys", []),
-                signifiers=ip_attributes.get("signifiers", []),
-                situational_imprint=ip_attributes.get("situational_imprint"),
-                extracted_entities=ip_attributes.get("extracted_entities", [])
-            )
-            self.memory_store.append(new_ip)
-            log_info(f"Successfully created and stored IP: {new_ip.particle_id}")
-            log_info(f"  Situational Imprint: \"{new_ip.situational_imprint}\"")
-            log_info(f"  Resonance Keys: {new_ip.resonance_keys}")
-            log_info(f"  Total IPs in memory: {len(self.memory_store)}")
-        else:
-            log_error("Failed to enrich text for IP creation. Not added to memory.")
+        return self._store_enriched_particle(text_input, ip_attributes)
+
+    def add_many_to_memory(self, text_inputs: List[str], source: str = "bulk_input") -> List[Optional[InsightParticle]]:
+        """
+        Enriches several texts with batched SOI requests and stores the results in input order.
+        Restatements of stored IPs are merged as in add_to_memory.
+        """
+        log_info(f"\n--- Adding {len(text_inputs)} texts to Memory (Source: {source}) ---")
+        results: List[Optional[InsightParticle]] = [self._merge_if_restated(text_input) for text_input in text_inputs]
+        pending = [position for position, ip in enumerate(results) if ip is None]
+        all_attributes = self.soi.enrich_texts_to_ip_attributes([text_inputs[position] for position in pending])
+        for position, ip_attributes in zip(pending, all_attributes):
+            results[position] = self._store_enriched_particle(text_inputs[position], ip_attributes)
+        return results
 
-    def retrieve_relevant_insights(self, query_text: str, top_k: int = 2) -> List[InsightParticle]:
+    @traced("agent.store_bulk")
+    def add_particles_bulk(self, ips: List[InsightParticle], vectors=None,
+                           temporal_links: Sequence[Tuple[str, str]] = ()):
+        """
+        Commits already-enriched particles in one store write (one transaction for durable memory).
+
+        Args:
+            ips: New particles, in order.
+            vectors: Optional pre-computed embeddings, one row per particle (e.g. built in a
+                worker process); computed here when omitted.
+            temporal_links: (previous ID, next ID) pairs to chain with temporal_next strands.
+                The previous particle may be in this batch or already stored.
+
+        Before the indexes of a warm-started memory are first built, only the store is
+        written; the build picks the particles up from there. While a build is running,
+        the batch waits for it.
+        """
+        if self._index_builder is not None:
+            self._ensure_indexes()
+        # Holding the build lock keeps a build from starting halfway through the write
+        with self._memory_lock, self._index_build_lock:
+            if self._index_builder is not None:
+                self._ensure_indexes()
+            batch = {ip.particle_id: ip for ip in ips}
+            updated = []
+            for previous_id, next_id in temporal_links:
+                previous = batch.get(previous_id)
+                if previous is None:
+                    previous = self._get_particle(previous_id)
+                    if previous is None:
+                        continue
+                    updated.append(previous)
+                previous.relational_strands.append({"type": EDGE_TEMPORAL_NEXT, "target_id": next_id})
+
+            self.memory_store.extend(ips)
+            self._persist_updates(updated)
+            if self._indexes_built:
+                for ip in ips:
+                    if not self._resolve_from_store:
+                        self._particles_by_id[ip.particle_id] = ip
+                    self.keyword_index.add(ip)
+                    self.temporal_index.add(ip)
+                    self.graph.add_particle(ip)
+                    self.consolidation.add_particle(ip)
+                    self.lifecycle.admit(ip)
+                    if self.deduplicator is not None:
+                        self.deduplicator.add(ip)
+                for previous in updated:
+                    self.graph.add_edge(previous.particle_id, previous.relational_strands[-1]["target_id"], EDGE_TEMPORAL_NEXT)
+                if vectors is not None:
+                    self.embedding_store.add_vectors([ip.particle_id for ip in ips], vectors)
+                else:
+                    self.embedding_store.add_particles(ips)
+            METRICS.set("cognitive_weave_memory_particles", len(self.memory_store))
+
+    def existing_particle_ids(self, particle_ids: Iterable[str]) -> Set[str]:
+        """The subset of `particle_ids` already in memory (one query per batch for durable memory)."""
+        existing_ids = getattr(self.memory_store, "existing_ids", None)
+        if existing_ids is not None:
+            return existing_ids(particle_ids)
+        self._ensure_indexes()
+        with self._memory_lock:
+            return {particle_id for particle_id in particle_ids if self._get_particle(particle_id) is not None}
+
+    def _vector_recall(self, query_text: str, exclude_ids: Set[str], limit: int) -> List[InsightParticle]:
+        """First-stage embedding recall, returning up to `limit` particles not already selected."""
+        recalled = []
+        hits = self.embedding_store.search(query_text, top_k=self.vector_recall_k, min_similarity=self.vector_min_similarity)
+        for particle_id, similarity in hits:
+            if len(recalled) >= limit:
+                break
+            if particle_id in exclude_ids:
+                continue
+            ip = self._get_particle(particle_id)
+            if ip is None: # No longer in memory
+                continue
+            log_debug(f"  Vector recall: IP ID: {ip.particle_id}, Imprint: \"{ip.situational_imprint}\" (Similarity: {similarity:.3f})")
+            recalled.append(ip)
+        return recalled
+
+    def _graph_expansion(self, seeds: List[InsightParticle], hops: int) -> List[InsightParticle]:
+        """Adds the strongest-resonating graph neighbours of the retrieved seeds."""
+        expanded = []
+        neighbours = self.graph.expand([ip.particle_id for ip in seeds], top_k=self.graph_expansion_k, max_hops=hops)
+        for particle_id, activation in neighbours:
+            ip = self._get_particle(particle_id)
+            if ip is None: # Dangling strand target
+                continue
+            log_debug(f"  Graph expansion: IP ID: {ip.particle_id}, Imprint: \"{ip.situational_imprint}\" (Resonance: {activation:.3f})")
+            expanded.append(ip)
+        return expanded
+
+    @traced("agent.retrieve")
+    def retrieve_relevant_insights(self, query_text: str, top_k: int = 2, use_vector_recall: Optional[bool] = None,
+                                   expand_hops: Optional[int] = None, fallback_to_recent: bool = True,
+                                   time_range: Optional[Tuple[Optional[TimePoint], Optional[TimePoint]]] = None,
+                                   record_access: bool = True) -> List[InsightParticle]:
         """
         Retrieves relevant InsightParticles from memory based on the query.
-        This is a simplified keyword-based retrieval for PoC.
+        Keyword hits, ranked by BM25F, come first; when they fill fewer than `top_k` slots,
+        embedding similarity recalls the remaining candidates before the recency fallback
+        (skipped with `fallback_to_recent=False`).
+        With `time_range` = (start, end) only particles from start <= time < end are returned
+        (e.g. "what did we discuss last Tuesday"): keyword hits from that period first, then
+        its newest other particles instead of vector recall.
+        With `expand_hops` > 0 the hits are further expanded into their STRG neighbourhood.
+        With `record_access=False` the hits are not counted as accesses, so nothing is written back.
         """
         log_info(f"\n--- Retrieving Relevant Insights from Memory ---")
         log_info(f"Query for retrieval: \"{query_text}\"")
@@ -89,140 +518,434 @@ class ConversationalAgent:
             return []
 
         query_keywords = self._preprocess_query_for_keywords(query_text)
-        log_info(f"Processed query keywords: {query_keywords}")
-
-        scored_ips = []
-        for ip in self.memory_store:
-            score = 0
-            # Score based on resonance key overlap
-            for r_key_phrase in ip.resonance_keys:
-                r_key_words = self._preprocess_query_for_keywords(r_key_phrase)
-                score += len(query_keywords.intersection(r_key_words)) * 2 # Higher weight for resonance keys
-            
-            # Score based on situational imprint overlap
-            if ip.situational_imprint:
-                imprint_words = self._preprocess_query_for_keywords(ip.situational_imprint)
-                score += len(query_keywords.intersection(imprint_words))
-            
-            if score > 0:
-                scored_ips.append({"ip": ip, "score": score})
-        
-        # Sort by score descending
-        sorted_ips = sorted(scored_ips, key=lambda x: x["score"], reverse=True)
-        
-        relevant_ips = [item["ip"] for item in sorted_ips[:top_k]]
+        if self.retrieve_while_indexing and not self.start_index_build():
+            return self._retrieve_from_window(query_keywords, top_k, fallback_to_recent, time_range, record_access)
+        self._ensure_indexes()
+        log_debug(f"Processed query keywords: {query_keywords}")
+
+        # Only the term columns of the query keywords are touched; see BM25FIndex for the weighting
+        in_range = self.temporal_index.range(*time_range) if time_range is not None else None
+        if in_range is not None or self.recency_weight > 0:
+            scored_ips = self._temporal_keyword_search(query_keywords, top_k, in_range)
+        else:
+            scored_ips = self.keyword_index.search(query_keywords, top_k=top_k)
+        relevant_ips = [ip for ip, _ in scored_ips]
+
+        if use_vector_recall is None:
+            use_vector_recall = self.use_vector_recall
+        if in_range is not None:
+            relevant_ips.extend(self._latest_in_range(in_range, {ip.particle_id for ip in relevant_ips}, top_k - len(relevant_ips)))
+            fallback_to_recent = False
+        elif use_vector_recall and len(relevant_ips) < top_k:
+            relevant_ips.extend(self._vector_recall(query_text, {ip.particle_id for ip in relevant_ips}, top_k - len(relevant_ips)))
         
         if relevant_ips:
-            log_info(f"Retrieved {len(relevant_ips)} relevant IP(s):")
-            for i, ip in enumerate(relevant_ips):
-                log_info(f"  {i+1}. IP ID: {ip.particle_id}, Imprint: \"{ip.situational_imprint}\" (Score: {next(item['score'] for item in sorted_ips if item['ip'].particle_id == ip.particle_id)})")
+            log_info(f"Retrieved {len(relevant_ips)} relevant IP(s).")
+            if log_enabled("DEBUG"):
+                for i, (ip, score) in enumerate(scored_ips):
+                    log_debug(f"  {i+1}. IP ID: {ip.particle_id}, Imprint: \"{ip.situational_imprint}\" (Score: {score:.3f})")
+            if len(relevant_ips) > len(scored_ips):
+                recalled_by = "recency within the time range" if in_range is not None else "embedding similarity"
+                log_info(f"  (+{len(relevant_ips) - len(scored_ips)} recalled by {recalled_by})")
+            if expand_hops is None:
+                expand_hops = self.graph_expansion_hops
+            if expand_hops > 0:
+                relevant_ips.extend(self._graph_expansion(relevant_ips, expand_hops))
+            if record_access:
+                self._record_access(relevant_ips)
         else:
             log_info("No sufficiently relevant IPs found in memory for this query.")
             # Fallback: retrieve the most recent IP if no keyword match
-            if self.memory_store and top_k > 0:
+            if fallback_to_recent and self.memory_store and top_k > 0:
                 log_info(f"Falling back to retrieving the most recent IP.")
                 most_recent_ip = [self.memory_store[-1]]
-                log_info(f"  1. IP ID: {most_recent_ip[0].particle_id}, Imprint: \"{most_recent_ip[0].situational_imprint}\" (Recent)")
+                log_debug(f"  1. IP ID: {most_recent_ip[0].particle_id}, Imprint: \"{most_recent_ip[0].situational_imprint}\" (Recent)")
+                if record_access:
+                    self._record_access(most_recent_ip)
                 return most_recent_ip
 
 
         return relevant_ips
 
-    def _attempt_ia_synthesis(self):
+    def _retrieve_from_window(self, query_keywords: Set[str], top_k: int, fallback_to_recent: bool,
+                              time_range: Optional[Tuple[Optional[TimePoint], Optional[TimePoint]]],
+                              record_access: bool = True) -> List[InsightParticle]:
         """
-        Attempts to synthesize an InsightAggregate if enough IPs are present.
+        Keyword retrieval over the index_build_window newest particles, used while the
+        indexes of a warm-started store are still being built. Writes wait for the build,
+        so the window does not change while it is in use.
         """
-        log_info(f"\n--- Attempting Insight Aggregate (IA) Synthesis ---")
-        if len(self.memory_store) < 2: # Need at least 2 IPs to synthesize something meaningful
-            log_info("Not enough IPs in memory to attempt IA synthesis.")
-            return
+        METRICS.inc("cognitive_weave_retrieval_while_indexing_total")
+        with self._memory_lock:
+            if self._window_index is None:
+                self._window_index = BM25FIndex(tokenizer=self._preprocess_query_for_keywords)
+                self._window_index.add_many(self.memory_store[-self.index_build_window:])
+            window_index = self._window_index
+        relevant_ips = []
+        start, end = (to_epoch(bound) for bound in time_range) if time_range is not None else (None, None)
+        for ip, _ in window_index.search(query_keywords):
+            if len(relevant_ips) >= top_k:
+                break
+            epoch = particle_epoch(ip) or 0.0
+            if (start is None or epoch >= start) and (end is None or epoch < end):
+                relevant_ips.append(ip)
+        log_info(f"Indexes still building; retrieved {len(relevant_ips)} IP(s) from the {len(window_index)} newest particles.")
+        if not relevant_ips and fallback_to_recent and time_range is None and top_k > 0:
+            relevant_ips = [self.memory_store[-1]]
+        if record_access:
+            self._record_access(relevant_ips)
+        return relevant_ips
 
-        # For this PoC, we'll use situational imprints of ALL current IPs
-        # In a real system, you'd select related IPs based on clustering or other metrics
-        imprints_for_synthesis = [ip.situational_imprint for ip in self.memory_store if ip.situational_imprint]
-        
-        if not imprints_for_synthesis or len(imprints_for_synthesis) < 2:
-            log_info("Not enough valid imprints available for IA synthesis.")
-            return
+    def _temporal_keyword_search(self, query_keywords: Set[str], top_k: int,
+                                 in_range: Optional[List[str]]) -> List[Tuple[InsightParticle, float]]:
+        """
+        Keyword search limited to the IDs in `in_range` (if given) and blended with recency
+        (if recency_weight > 0). Ties go to the newer particle; only the winners are loaded.
+        """
+        scores = self.keyword_index.score(query_keywords)
+        if in_range is not None:
+            allowed = set(in_range)
+            scores = {particle_id: score for particle_id, score in scores.items() if particle_id in allowed}
+        if not scores or top_k <= 0:
+            return []
+        particle_ids = list(scores)
+        values = np.fromiter(scores.values(), dtype=np.float64, count=len(particle_ids))
+        if self.recency_weight > 0:
+            decay = self.temporal_index.recency_decay(particle_ids, self.recency_half_life_hours * 3600.0)
+            values = values * (1.0 - self.recency_weight + self.recency_weight * decay)
+        epochs = np.fromiter((self.temporal_index.epoch_of(pid) or 0.0 for pid in particle_ids),
+                             dtype=np.float64, count=len(particle_ids))
+        ranked = []
+        for position in np.lexsort((-epochs, -values))[:top_k]:
+            ip = self._get_particle(particle_ids[position])
+            if ip is not None:
+                ranked.append((ip, float(values[position])))
+        return ranked
+
+    def _latest_in_range(self, in_range: List[str], exclude_ids: Set[str], limit: int) -> List[InsightParticle]:
+        """The newest particles of a time range (oldest-first IDs) not already selected."""
+        latest = []
+        for particle_id in reversed(in_range):
+            if len(latest) >= limit:
+                break
+            if particle_id in exclude_ids:
+                continue
+            ip = self._get_particle(particle_id)
+            if ip is not None:
+                log_debug(f"  In range: IP ID: {ip.particle_id}, Imprint: \"{ip.situational_imprint}\" (Recent)")
+                latest.append(ip)
+        return latest
+
+    def rank_queries(self, query_texts: List[str], top_k: Optional[int] = 10) -> List[List[Tuple[InsightParticle, float]]]:
+        """
+        BM25F keyword ranking of a batch of queries in one sparse product, for offline
+        evaluation and bulk re-ranking. Unlike retrieval, it records no accesses.
+        """
+        self._ensure_indexes()
+        with self._memory_lock:
+            return self.keyword_index.search_many([self._preprocess_query_for_keywords(text) for text in query_texts],
+                                                  top_k=top_k)
+
+    def _record_access(self, ips: List[InsightParticle]):
+        """Counts retrieval hits; the statistics are written back in batches."""
+        if self.lifecycle.record_access(ips):
+            with self._memory_lock:
+                self.lifecycle.flush()
+
+    def run_memory_maintenance(self) -> List[str]:
+        """
+        Applies pending access statistics, then collects decayed IPs already covered by an IA.
+        Returns the IDs of the collected particles.
+        """
+        self._ensure_indexes()
+        with self._memory_lock:
+            self.lifecycle.flush()
+            # The newest IP anchors the temporal chain the next input links to
+            protected = {self._last_input_particle.particle_id} if self._last_input_particle is not None else set()
+            return self.lifecycle.collect_garbage(protected)
+
+    def retrieve_knowledge(self, query_text: str, top_k: int) -> List[InsightParticle]:
+        """
+        Retrieval entry point for agents using this one as their shared knowledge base.
+        Records no accesses, so lookups never write to the knowledge memory.
+        """
+        with self._memory_lock:
+            return self.retrieve_relevant_insights(query_text, top_k=top_k, fallback_to_recent=False, record_access=False)
 
-        log_info(f"Using {len(imprints_for_synthesis)} IP imprints for IA synthesis:")
-        for i, imprint in enumerate(imprints_for_synthesis):
-            log_info(f"  Imprint {i+1}: \"{imprint}\"")
+    def _plan_synthesis_jobs(self) -> List[SynthesisJob]:
+        """Returns one synthesis job per dirty cluster of related IPs (possibly none)."""
+        self._ensure_indexes()
+        with self._memory_lock:
+            log_info(f"\n--- Attempting Insight Aggregate (IA) Synthesis ---")
+            jobs = self.consolidation.plan()
+            if not jobs:
+                log_info("No clusters with new related IPs to synthesize.")
+                return []
 
-        ia_attributes: Optional[InsightAggregateAttributes] = self.soi.synthesize_ia_from_imprints(imprints_for_synthesis)
+            for job in jobs:
+                action = f"Refreshing IA {job.aggregate_id}" if job.aggregate_id else "Synthesizing new IA"
+                log_info(f"{action} for cluster {job.cluster_id} from {len(job.imprints)} IP imprints.")
+                if log_enabled("DEBUG"):
+                    for i, imprint in enumerate(job.imprints):
+                        log_debug(f"  Imprint {i+1}: \"{imprint}\"")
+            return jobs
+
+    def _store_aggregate(self, ia_attributes: Optional[InsightAggregateAttributes], job: SynthesisJob) -> Optional[InsightParticle]:
+        """Creates (or refreshes in place) the Insight Aggregate of a cluster and commits it to memory."""
+        with self._memory_lock:
+            if not ia_attributes:
+                log_error(f"IA synthesis failed or produced no attributes for cluster {job.cluster_id}.")
+                return None
 
-        if ia_attributes:
             log_info("Successfully synthesized Insight Aggregate attributes.")
-            # Create a new IP for this IA and add it to memory
+            existing_ia = self._get_particle(job.aggregate_id) if job.aggregate_id else None
+            if existing_ia is not None:
+                # The job fed the current summary back in, so earlier sources stay covered;
+                # only the IPs whose imprints were in this call are added
+                known_sources = set(existing_ia.derived_from_ids)
+                new_sources = [pid for pid in job.member_ids if pid not in known_sources]
+                existing_ia.core_data = ia_attributes.ia_core_data
+                existing_ia.resonance_keys = ia_attributes.ia_resonance_keys
+                existing_ia.signifiers = ia_attributes.ia_signifiers
+                existing_ia.situational_imprint = ia_attributes.ia_situational_imprint
+                existing_ia.derived_from_ids = existing_ia.derived_from_ids + new_sources
+                existing_ia.modification_timestamp = datetime.utcnow().isoformat()
+                self._persist_update(existing_ia)
+                self.keyword_index.add(existing_ia)
+                self.temporal_index.add(existing_ia)
+                if self.response_cache is not None:
+                    self.response_cache.invalidate([existing_ia.particle_id])
+                self.embedding_store.add_particle(existing_ia)
+                for source_id in new_sources:
+                    self.graph.add_edge(existing_ia.particle_id, source_id, EDGE_DERIVED_FROM)
+                self.consolidation.mark_synthesized(job, existing_ia)
+                self.lifecycle.note_aggregate(existing_ia, job.member_ids)
+                log_info(f"IA (ID: {existing_ia.particle_id}) refreshed in place.")
+                log_debug(f"  IA Core Data: \"{existing_ia.core_data}\"")
+                return existing_ia
+
             new_ia_particle = InsightParticle(
                 core_data=ia_attributes.ia_core_data,
                 resonance_keys=ia_attributes.ia_resonance_keys,
                 signifiers=ia_attributes.ia_signifiers,
                 situational_imprint=ia_attributes.ia_situational_imprint,
                 is_aggregate=True,
-                # For PoC, assume it's derived from all IPs used for synthesis
-                derived_from_ids=[ip.particle_id for ip in self.memory_store if ip.situational_imprint in imprints_for_synthesis] 
+                derived_from_ids=list(job.member_ids)
             )
             self.memory_store.append(new_ia_particle) # Add the new IA to memory
+            self._index_particle(new_ia_particle)
+            self.consolidation.mark_synthesized(job, new_ia_particle)
+            self.lifecycle.note_aggregate(new_ia_particle, job.member_ids)
             log_info(f"New IA (ID: {new_ia_particle.particle_id}) added to memory.")
-            log_info(f"  IA Core Data: \"{new_ia_particle.core_data}\"")
-            log_info(f"  Total IPs in memory (including IA): {len(self.memory_store)}")
-        else:
-            log_error("IA synthesis failed or produced no attributes.")
+            log_debug(f"  IA Core Data: \"{new_ia_particle.core_data}\"")
+            log_debug(f"  Total IPs in memory (including IA): {len(self.memory_store)}")
+            return new_ia_particle
+
+    @traced("agent.synthesize")
+    def _attempt_ia_synthesis(self):
+        """
+        Synthesizes or refreshes the IAs of clusters that gained IPs since the last run.
+        """
+        for job in self._plan_synthesis_jobs():
+            ia_attributes: Optional[InsightAggregateAttributes] = self.soi.synthesize_ia_from_imprints(list(job.imprints))
+            self._store_aggregate(ia_attributes, job)
+
+    def _covering_aggregates(self, particle_id: str) -> List[InsightParticle]:
+        """The IAs derived from a particle, found through the STRG's derived_from edges."""
+        aggregates = []
+        for neighbour_id, _ in self.graph.neighbors(particle_id, [EDGE_DERIVED_FROM]):
+            ia = self._get_particle(neighbour_id)
+            if ia is not None and ia.is_aggregate:
+                aggregates.append(ia)
+        return aggregates
+
+    @traced("agent.prompt_build")
+    def _build_response_messages(self, user_query: str) -> Tuple[List[Dict[str, str]], List[InsightParticle]]:
+        """
+        Retrieves relevant memories and builds the chat messages for the conversational LLM.
+        Also returns the particles the prompt shows, in prompt order.
+        """
+        with self._memory_lock:
+            log_info(f"\n--- Generating Response for Query ---")
+            log_info(f"User query: \"{user_query}\"")
+
+            relevant_insights = self.retrieve_relevant_insights(user_query, top_k=self.context_candidates)
+            if self.knowledge_base is not None:
+                relevant_insights = relevant_insights + self.knowledge_base.retrieve_knowledge(user_query, self.knowledge_top_k)
+
+            # Packs the candidates into the token budget, preferring IAs over their sources
+            # The STRG is not consulted while a warm-start index build is still filling it
+            covering_aggregates = self._covering_aggregates if self._indexes_built else None
+            context = self.context_assembler.assemble(relevant_insights, covering_aggregates=covering_aggregates)
+            log_info(f"Context: {len(context.particles)} memories in ~{context.tokens} tokens "
+                     f"({context.dropped} candidate(s) left out).")
+            system_prompt = context.system_prompt
 
+            if log_enabled("DEBUG"):
+                log_debug(f"\n--- Prompt for Conversational LLM ---")
+                log_debug(f"System Prompt Snippet:\n{system_prompt[:300]}...") # Log a snippet
+                log_debug(f"User Query to LLM: \"{user_query}\"")
+            return [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ], context.particles
 
+    def _record_response_timing(self, time_to_first_token: float, total_time: float, streamed: bool):
+        self.turn_timings.append({
+            "turn": self.turn_count + 1,
+            "time_to_first_token": time_to_first_token,
+            "total_time": total_time,
+            "streamed": streamed,
+        })
+        METRICS.observe("cognitive_weave_response_first_token_seconds", time_to_first_token, streamed=streamed)
+        METRICS.observe("cognitive_weave_response_seconds", total_time, streamed=streamed)
+        log_info(f"Response timing: first token after {time_to_first_token:.3f}s, complete after {total_time:.3f}s.")
+
+    def _on_stream_complete(self, stream):
+        self._record_response_timing(stream.time_to_first_token, stream.total_time, streamed=True)
+
+    @traced("agent.respond")
     def generate_response(self, user_query: str) -> str:
         """
         Generates a response to the user's query, using retrieved memory.
         """
-        log_info(f"\n--- Generating Response for Query ---")
-        log_info(f"User query: \"{user_query}\"")
-
-        relevant_insights = self.retrieve_relevant_insights(user_query)
-        
-        memory_context_str = "No specific memories retrieved for this query."
-        if relevant_insights:
-            memory_context_parts = []
-            for i, insight in enumerate(relevant_insights):
-                context = f"Memory {i+1} (Type: {'Aggregate' if insight.is_aggregate else 'Particle'}): "
-                if insight.is_aggregate:
-                    context += f"Synthesized Insight: \"{insight.core_data}\" (Summary: \"{insight.situational_imprint}\")"
-                else:
-                    context += f"\"{insight.situational_imprint}\" (Keywords: {insight.resonance_keys})"
-                memory_context_parts.append(context)
-            memory_context_str = "\n".join(memory_context_parts)
-        
-        system_prompt = f"""You are a helpful AI assistant.
-You have access to some memories from previous interactions or synthesized insights.
-Use these memories to provide a comprehensive and contextually relevant answer to the user's query.
-If the memories are not directly relevant, answer the query based on your general knowledge but acknowledge if you are not using specific memories.
-
-Available Memories:
----
-{memory_context_str}
----
-"""
-        
-        log_info(f"\n--- Prompt for Conversational LLM ---")
-        log_info(f"System Prompt Snippet:\n{system_prompt[:300]}...") # Log a snippet
-        log_info(f"User Query to LLM: \"{user_query}\"")
-        
+        started_at = time.perf_counter()
+        messages, context_particles = self._build_response_messages(user_query)
+        cache_context = self._response_cache_context(context_particles)
         try:
-            response = self.conversational_llm_client.chat.completions.create(
-                model=self.conversational_llm_deployment,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_query}
-                ],
-                temperature=0.7,
-                max_tokens=3000
+            cached = self._cached_response(user_query, cache_context)
+            if cached is not None:
+                return cached
+            assistant_response = self.provider.complete(
+                messages,
+                temperature=RESPONSE_TEMPERATURE,
+                max_tokens=RESPONSE_MAX_TOKENS,
+                model=self.conversational_llm_deployment
             )
-            assistant_response = response.choices[0].message.content
             log_info("Successfully received response from conversational LLM.")
-            return assistant_response.strip()
+            response = assistant_response.strip()
+            self._cache_response(user_query, cache_context, context_particles, response)
+            return response
         except Exception as e:
             log_error(f"Error during conversational LLM call: {e}")
-            return "I encountered an error trying to process your request. Please try again."
+            return RESPONSE_ERROR_MESSAGE
+        finally:
+            total_time = time.perf_counter() - started_at
+            self._record_response_timing(total_time, total_time, streamed=False)
+
+    def _response_cache_context(self, context_particles: List[InsightParticle]) -> Optional[str]:
+        """Response cache key of the retrieved memory context, or None without a response cache."""
+        if self.response_cache is None:
+            return None
+        return context_signature(self.response_cache_scope, self.conversational_llm_deployment, context_particles)
+
+    def _cached_response(self, user_query: str, cache_context: Optional[str]) -> Optional[str]:
+        if cache_context is None:
+            return None
+        cached = self.response_cache.get(user_query, cache_context)
+        if cached is not None:
+            log_info("Response served from the response cache.")
+        return cached
+
+    def _cache_response(self, user_query: str, cache_context: Optional[str],
+                        context_particles: List[InsightParticle], response: str):
+        if cache_context is not None and response:
+            self.response_cache.put(user_query, cache_context, [ip.particle_id for ip in context_particles], response)
+
+    def _stream_completion(self, messages: List[Dict[str, str]],
+                           on_success: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+        """Yields the response deltas; `on_success` receives the full text if the stream completes."""
+        parts = []
+        try:
+            for delta in self.provider.stream_complete(
+                messages,
+                temperature=RESPONSE_TEMPERATURE,
+                max_tokens=RESPONSE_MAX_TOKENS,
+                model=self.conversational_llm_deployment
+            ):
+                parts.append(delta)
+                yield delta
+            log_info("Successfully streamed response from conversational LLM.")
+        except Exception as e:
+            log_error(f"Error during streaming conversational LLM call: {e}")
+            yield RESPONSE_ERROR_MESSAGE
+            return
+        if on_success is not None:
+            on_success("".join(parts).strip())
+
+    def generate_response_stream(self, user_query: str) -> ResponseStream:
+        """
+        Streaming variant of generate_response.
+
+        Returns:
+            A ResponseStream yielding token deltas as they arrive; its `text` holds the
+            complete response once iteration ends.
+        """
+        started_at = time.perf_counter()
+        messages, context_particles = self._build_response_messages(user_query)
+        cache_context = self._response_cache_context(context_particles)
+        cached = self._cached_response(user_query, cache_context)
+        if cached is not None:
+            deltas = iter([cached])
+        else:
+            deltas = self._stream_completion(messages, lambda text: self._cache_response(
+                user_query, cache_context, context_particles, text))
+        return ResponseStream(deltas, started_at=started_at, on_complete=self._on_stream_complete)
+
+    @traced("agent.turn")
+    def chat_turn(self, user_input: str) -> str:
+        """
+        Runs one full turn: memory ingestion, response, and periodic IA synthesis.
+
+        With TURN_ORDERING_PIPELINED the enrichment of `user_input` runs on the ingestion
+        thread while retrieval and the response proceed, and the new IP is merged into
+        memory when it arrives; the turn then costs the slower of the two LLM calls rather
+        than their sum. TURN_ORDERING_SEQUENTIAL stores the IP before retrieval.
+        Synthesis is queued on the consolidation worker when it is running, else run inline.
+        """
+        ingestion = self._begin_turn(user_input)
+        agent_response = self.generate_response(user_input)
+        self._finish_turn(ingestion, agent_response)
+        return agent_response
+
+    def chat_turn_stream(self, user_input: str) -> Iterator[str]:
+        """
+        Streaming variant of chat_turn: yields response token deltas as they arrive and
+        completes the turn (ingestion, synthesis) once the stream ends. A consumer that
+        stops early (close()) still completes the turn, but the truncated response is
+        never stored in memory.
+        """
+        ingestion = self._begin_turn(user_input)
+        response = self.generate_response_stream(user_input)
+        completed = False
+        try:
+            yield from response
+            completed = True
+        finally:
+            self._finish_turn(ingestion, response.text if completed else None)
+
+    def _begin_turn(self, user_input: str) -> Optional[Future]:
+        """Stores the user's IP now, or starts its enrichment on the ingestion thread when pipelined."""
+        if self.turn_ordering == TURN_ORDERING_SEQUENTIAL:
+            self.add_to_memory(user_input, source="user_input")
+            return None
+        # Run in a copy of this context so the ingestion span nests under the turn's span
+        return self._ingestion_executor.submit(contextvars.copy_context().run, self.add_to_memory, user_input, "user_input")
+
+    def _finish_turn(self, ingestion: Optional[Future], agent_response: Optional[str]):
+        if ingestion is not None:
+            ingestion.result()
+        if self.ingest_agent_responses and agent_response:
+            self.add_to_memory(agent_response, source="agent_response")
+
+        self.turn_count += 1
+        if self.turn_count % self.ia_synthesis_interval == 0:
+            if self.consolidation_worker.running:
+                self.consolidation_worker.request()
+            else:
+                self._attempt_ia_synthesis()
+        if self.turn_count % self.maintenance_interval == 0:
+            self.run_memory_maintenance()
 
     def start_chat(self):
         """
@@ -232,27 +955,40 @@ Available Memories:
         print("Type 'quit' to exit.")
         print("I will try to remember our conversation and synthesize insights.")
 
+        self.consolidation_worker.start()
         while True:
             user_input = input("\nYou: ")
             if user_input.lower() == 'quit':
                 print("Agent: Goodbye!")
                 break
 
-            # Add user input to memory
-            self.add_to_memory(user_input, source="user_input")
-            
-            # Generate and print agent's response
-            agent_response = self.generate_response(user_input)
-            print(f"Agent: {agent_response}")
+            # Add user input to memory and print the agent's response as it streams in.
+            # Set ingest_agent_responses to store the complete response in memory as well.
+            print("Agent: ", end="", flush=True)
+            for delta in self.chat_turn_stream(user_input):
+                print(delta, end="", flush=True)
+            print()
+        
+        self.consolidation_worker.stop()
+        self._ingestion_executor.shutdown()
+        with self._memory_lock:
+            self.lifecycle.flush()
+        self._log_session_summary()
 
-            # Add agent's response to memory as well (optional, but can be useful)
-            # self.add_to_memory(agent_response, source="agent_response")
+    def close(self):
+        """Releases the ingestion thread, writes back access statistics and closes durable memory, if any."""
+        self._ingestion_executor.shutdown(wait=True)
+        if not self.read_only:
+            with self._memory_lock:
+                self.lifecycle.flush()
+        close_store = getattr(self.memory_store, "close", None)
+        if close_store is not None:
+            close_store()
 
-            self.turn_count += 1
-            if self.turn_count % self.ia_synthesis_interval == 0:
-                self._attempt_ia_synthesis()
-        
+    def _log_session_summary(self):
         log_info("\nChat session ended.")
+        log_info(f"Consolidation: {self.consolidation_worker.stats()}")
+        log_info(f"Lifecycle: {self.lifecycle.stats()}")
         log_info(f"Final memory store contains {len(self.memory_store)} IPs:")
         for i, ip in enumerate(self.memory_store):
             type_info = "Aggregate" if ip.is_aggregate else "Particle"
@@ -260,14 +996,359 @@ Available Memories:
             log_info(f"  {i+1}. ID: {ip.particle_id} (Type: {type_info}), Content: \"{str(core_info)[:100]}...\"")
 
 
+class AsyncConversationalAgent(ConversationalAgent):
+    """
+    asyncio variant of the ConversationalAgent.
+
+    Memory indexing and retrieval are shared with the blocking agent. The LLM
+    round-trips (enrichment, synthesis, conversation) are awaited; all of them go
+    through the SOI's concurrency limiter and the shared async connection pool, so
+    concurrent turns and ingestion jobs overlap instead of queueing. Memory operations
+    that write to durable memory or wait for a warm-start index build run on worker
+    threads (asyncio.to_thread), so they never stall other coroutines on the loop,
+    such as the other sessions of a server.
+    """
+    def __init__(self, embedder=None, soi: Optional[AsyncSemanticOracleInterface] = None,
+                 conversational_llm_client: Optional["AsyncAzureOpenAI"] = None, max_concurrency: int = 8,
+                 memory_path: Optional[str] = None, compact_memory: bool = False, provider: Optional[LLMProvider] = None,
+                 initial_embedding_capacity: int = 1024, hot_set_size: int = 10000, oracle_cache: Optional[OracleCache] = None,
+                 synthesis_min_interval: float = 5.0, synthesis_token_budget: Optional[int] = None):
+        provider = provider if provider is not None else ResilientProvider(OpenAICompatibleProvider(async_client=conversational_llm_client))
+        super().__init__(
+            embedder=embedder,
+            memory_path=memory_path,
+            compact_memory=compact_memory,
+            soi=soi if soi is not None else AsyncSemanticOracleInterface(max_concurrency=max_concurrency, provider=provider,
+                                                                         cache=oracle_cache),
+            provider=provider,
+            initial_embedding_capacity=initial_embedding_capacity,
+            hot_set_size=hot_set_size
+        )
+        self.consolidation_worker = AsyncConsolidationWorker(
+            plan=self._plan_synthesis_jobs,
+            synthesize=self.soi.synthesize_ia_from_imprints,
+            publish=self._store_aggregate,
+            min_interval_seconds=synthesis_min_interval,
+            token_budget_per_hour=synthesis_token_budget
+        )
+
+    @traced("agent.add_to_memory")
+    async def add_to_memory(self, text_input: str, source: str = "user_input") -> Optional[InsightParticle]:
+        """
+        Async counterpart of ConversationalAgent.add_to_memory.
+        """
+        log_info(f"\n--- Adding to Memory (Source: {source}) ---")
+        log_debug(f"Raw text: \"{text_input}\"")
+
+        restated = await asyncio.to_thread(self._merge_if_restated, text_input)
+        if restated is not None:
+            return restated
+        ip_attributes = await self.soi.enrich_text_to_ip_attributes(text_input)
+        return await asyncio.to_thread(self._store_enriched_particle, text_input, ip_attributes)
+
+    async def add_many_to_memory(self, text_inputs: List[str], source: str = "bulk_input") -> List[Optional[InsightParticle]]:
+        """
+        Async counterpart of ConversationalAgent.add_many_to_memory; batches run concurrently.
+        """
+        log_info(f"\n--- Adding {len(text_inputs)} texts to Memory (Source: {source}) ---")
+        results: List[Optional[InsightParticle]] = await asyncio.to_thread(
+            lambda: [self._merge_if_restated(text_input) for text_input in text_inputs])
+        pending = [position for position, ip in enumerate(results) if ip is None]
+        all_attributes = await self.soi.enrich_texts_to_ip_attributes([text_inputs[position] for position in pending])
+        for position, ip_attributes in zip(pending, all_attributes):
+            results[position] = await asyncio.to_thread(self._store_enriched_particle, text_inputs[position], ip_attributes)
+        return results
+
+    @traced("agent.synthesize")
+    async def _attempt_ia_synthesis(self):
+        """
+        Async counterpart of ConversationalAgent._attempt_ia_synthesis.
+        """
+        jobs = await asyncio.to_thread(self._plan_synthesis_jobs)
+        # Clusters are independent, so their synthesis calls run concurrently
+        all_attributes = await asyncio.gather(*(self.soi.synthesize_ia_from_imprints(list(job.imprints)) for job in jobs))
+        for job, ia_attributes in zip(jobs, all_attributes):
+            await asyncio.to_thread(self._store_aggregate, ia_attributes, job)
+
+    @traced("agent.respond")
+    async def generate_response(self, user_query: str) -> str:
+        """
+        Async counterpart of ConversationalAgent.generate_response.
+        """
+        started_at = time.perf_counter()
+        messages, context_particles = await asyncio.to_thread(self._build_response_messages, user_query)
+        cache_context = self._response_cache_context(context_particles)
+        try:
+            cached = self._cached_response(user_query, cache_context)
+            if cached is not None:
+                return cached
+            async with self.soi.limiter:
+                assistant_response = await self.provider.acomplete(
+                    messages,
+                    temperature=RESPONSE_TEMPERATURE,
+                    max_tokens=RESPONSE_MAX_TOKENS,
+                    model=self.conversational_llm_deployment
+                )
+            log_info("Successfully received response from conversational LLM.")
+            response = assistant_response.strip()
+            self._cache_response(user_query, cache_context, context_particles, response)
+            return response
+        except Exception as e:
+            log_error(f"Error during conversational LLM call: {e}")
+            return RESPONSE_ERROR_MESSAGE
+        finally:
+            total_time = time.perf_counter() - started_at
+            self._record_response_timing(total_time, total_time, streamed=False)
+
+    async def _stream_completion(self, messages: List[Dict[str, str]],
+                                 on_success: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        parts = []
+        try:
+            async with self.soi.limiter:
+                async for delta in self.provider.astream_complete(
+                    messages,
+                    temperature=RESPONSE_TEMPERATURE,
+                    max_tokens=RESPONSE_MAX_TOKENS,
+                    model=self.conversational_llm_deployment
+                ):
+                    parts.append(delta)
+                    yield delta
+            log_info("Successfully streamed response from conversational LLM.")
+        except Exception as e:
+            log_error(f"Error during streaming conversational LLM call: {e}")
+            yield RESPONSE_ERROR_MESSAGE
+            return
+        if on_success is not None:
+            on_success("".join(parts).strip())
+
+    async def _response_deltas(self, user_query: str) -> AsyncIterator[str]:
+        """Builds the prompt off the event loop, then yields the cached response or the streamed deltas."""
+        messages, context_particles = await asyncio.to_thread(self._build_response_messages, user_query)
+        cache_context = self._response_cache_context(context_particles)
+        cached = self._cached_response(user_query, cache_context)
+        if cached is not None:
+            yield cached
+            return
+        async for delta in self._stream_completion(messages, lambda text: self._cache_response(
+                user_query, cache_context, context_particles, text)):
+            yield delta
+
+    def generate_response_stream(self, user_query: str) -> AsyncResponseStream:
+        """
+        Async counterpart of ConversationalAgent.generate_response_stream; iterate with `async for`.
+        Retrieval starts when iteration does.
+        """
+        started_at = time.perf_counter()
+        return AsyncResponseStream(self._response_deltas(user_query), started_at=started_at,
+                                   on_complete=self._on_stream_complete)
+
+    @traced("agent.turn")
+    async def chat_turn(self, user_input: str) -> str:
+        """
+        Async counterpart of ConversationalAgent.chat_turn; in pipelined mode enrichment
+        runs as a concurrent task and the new IP is merged when it completes.
+        """
+        ingestion = await self._begin_turn(user_input)
+        agent_response = await self.generate_response(user_input)
+        await self._finish_turn(ingestion, agent_response)
+        return agent_response
+
+    async def chat_turn_stream(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Async counterpart of ConversationalAgent.chat_turn_stream; a consumer that stops
+        early completes the turn when the generator is closed (aclose()).
+        """
+        ingestion = await self._begin_turn(user_input)
+        response = self.generate_response_stream(user_input)
+        completed = False
+        try:
+            async for delta in response:
+                yield delta
+            completed = True
+        finally:
+            await self._finish_turn(ingestion, response.text if completed else None)
+
+    async def _begin_turn(self, user_input: str) -> Optional[asyncio.Task]:
+        if self.turn_ordering == TURN_ORDERING_SEQUENTIAL:
+            await self.add_to_memory(user_input, source="user_input")
+            return None
+        return asyncio.create_task(self.add_to_memory(user_input, source="user_input"))
+
+    async def _finish_turn(self, ingestion: Optional[asyncio.Task], agent_response: Optional[str]):
+        if ingestion is not None:
+            await ingestion
+        if self.ingest_agent_responses and agent_response:
+            await self.add_to_memory(agent_response, source="agent_response")
+
+        self.turn_count += 1
+        if self.turn_count % self.ia_synthesis_interval == 0:
+            if self.consolidation_worker.running:
+                self.consolidation_worker.request()
+            else:
+                await self._attempt_ia_synthesis()
+        if self.turn_count % self.maintenance_interval == 0:
+            await asyncio.to_thread(self.run_memory_maintenance)
+
+    async def start_chat(self):
+        """
+        Async interactive chat loop; console input is read off the event loop.
+        """
+        print("\nWelcome to the Cognitive Weave Conversational Agent!")
+        print("Type 'quit' to exit.")
+        print("I will try to remember our conversation and synthesize insights.")
+
+        self.consolidation_worker.start()
+        while True:
+            user_input = await asyncio.to_thread(input, "\nYou: ")
+            if user_input.lower() == 'quit':
+                print("Agent: Goodbye!")
+                break
+
+            print("Agent: ", end="", flush=True)
+            async for delta in self.chat_turn_stream(user_input):
+                print(delta, end="", flush=True)
+            print()
+
+        await self.consolidation_worker.stop()
+        await asyncio.to_thread(self.lifecycle.flush)
+        self._log_session_summary()
+
+    async def aclose(self):
+        """Stops the consolidation task, then closes the agent like ConversationalAgent.close."""
+        await self.consolidation_worker.stop()
+        await asyncio.to_thread(self.close)
+
+
+def add_provider_arguments(parser: argparse.ArgumentParser):
+    """Adds the LLM backend options shared by the chat REPL and the session server."""
+    parser.add_argument("--provider", choices=["azure", "http", "offline"], default="azure",
+                        help="LLM backend: Azure OpenAI (utils.py), any OpenAI-compatible server, or the deterministic offline model")
+    parser.add_argument("--base-url", help="base URL of the OpenAI-compatible server for --provider http")
+    parser.add_argument("--model", help="chat model/deployment name (defaults to the Azure deployment in utils.py)")
+    parser.add_argument("--embedding-model", help="embedding model/deployment name")
+    parser.add_argument("--recording", metavar="PATH", help="JSONL file to record LLM responses to / replay them from")
+    parser.add_argument("--recording-mode", choices=RECORDING_MODES, default="auto",
+                        help="record every call, replay only (no network), or replay with recording of misses")
+    parser.add_argument("--max-retries", type=int, default=4, help="retries of a throttled or failed LLM call (jittered exponential backoff)")
+    parser.add_argument("--requests-per-minute", type=float, help="client-side request budget per model deployment")
+    parser.add_argument("--tokens-per-minute", type=float, help="client-side token budget (prompt + max_tokens) per model deployment")
+
+
+def add_response_cache_arguments(parser: argparse.ArgumentParser):
+    """Adds the response cache options shared by the chat REPL and the session server."""
+    parser.add_argument("--response-cache", action="store_true",
+                        help="reuse responses to repeated or near-identical queries while the retrieved memories are unchanged")
+    parser.add_argument("--response-cache-ttl", type=float, default=3600.0, help="seconds a cached response stays valid")
+    parser.add_argument("--response-cache-threshold", type=float, default=0.85,
+                        help="query similarity (0-1, character-shingle MinHash) at which a cached response is reused")
+
+
+def build_response_cache(args) -> Optional[ResponseCache]:
+    if not args.response_cache:
+        return None
+    return ResponseCache(ttl_seconds=args.response_cache_ttl, similarity_threshold=args.response_cache_threshold)
+
+
+def add_synthesis_arguments(parser: argparse.ArgumentParser):
+    """Adds the background IA synthesis limits shared by the chat REPL and the session server."""
+    parser.add_argument("--synthesis-min-interval", type=float, default=5.0,
+                        help="minimum seconds between two background IA synthesis runs")
+    parser.add_argument("--synthesis-token-budget", type=int,
+                        help="estimated LLM tokens IA synthesis may spend per rolling hour (unlimited by default)")
+
+
+def add_oracle_cache_arguments(parser: argparse.ArgumentParser):
+    """Adds the SOI output cache options shared by the chat REPL, the session server and bulk ingestion."""
+    parser.add_argument("--oracle-cache", metavar="PATH", nargs="?", const="",
+                        help="reuse validated enrichment and synthesis outputs for repeated inputs; with PATH they are "
+                             "also kept in an SQLite file that survives restarts (e.g. re-ingestion or replayed logs)")
+    parser.add_argument("--oracle-cache-entries", type=int, default=10000, help="entries kept in memory by the oracle cache")
+
+
+def build_oracle_cache(args) -> Optional[OracleCache]:
+    if args.oracle_cache is None:
+        return None
+    return OracleCache(max_entries=args.oracle_cache_entries, disk_path=args.oracle_cache or None)
+
+
+def provider_needs_azure_credentials(args) -> bool:
+    return args.provider == "azure" and not (args.recording and args.recording_mode == "replay")
+
+
+def build_provider(args) -> LLMProvider:
+    """Builds the LLM provider selected on the command line."""
+    if args.provider == "offline":
+        provider = OfflineProvider()
+    elif args.provider == "http":
+        provider = OpenAICompatibleProvider.from_base_url(args.base_url, chat_model=args.model, embedding_model=args.embedding_model)
+    else:
+        provider = OpenAICompatibleProvider(chat_model=args.model, embedding_model=args.embedding_model)
+    if args.provider != "offline":
+        configure_deployment_limits(requests_per_minute=args.requests_per_minute, tokens_per_minute=args.tokens_per_minute)
+        provider = ResilientProvider(provider, RetryPolicy(max_attempts=args.max_retries + 1))
+    if args.recording:
+        provider = RecordReplayProvider(args.recording, inner=provider, mode=args.recording_mode)
+    return provider
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cognitive Weave conversational agent")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="run the asyncio agent")
+    parser.add_argument("--memory", metavar="PATH", help="SQLite file for durable memory (warm-starts if it exists)")
+    parser.add_argument("--compact", action="store_true", help="keep in-process memory in the columnar store")
+    parser.add_argument("--turn-ordering", choices=[TURN_ORDERING_PIPELINED, TURN_ORDERING_SEQUENTIAL],
+                        default=TURN_ORDERING_PIPELINED, help="whether a turn waits for its own IP before retrieval")
+    add_provider_arguments(parser)
+    add_response_cache_arguments(parser)
+    add_oracle_cache_arguments(parser)
+    add_synthesis_arguments(parser)
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), help="DEBUG adds per-particle and prompt detail; ERROR or OFF silences the console")
+    parser.add_argument("--trace", metavar="PATH", help="append spans and structured log records to a JSONL trace file")
+    parser.add_argument("--metrics", metavar="PATH", help="write counters and latency histograms in Prometheus text format on exit")
+    parser.add_argument("--max-connections", type=int, help="size of the shared HTTP connection pool")
+    parser.add_argument("--max-keepalive-connections", type=int, help="idle connections the shared pool keeps alive")
+    args = parser.parse_args()
+    if args.log_level:
+        set_log_level(args.log_level)
+    configure_client_pool(max_connections=args.max_connections, max_keepalive_connections=args.max_keepalive_connections)
+
     # Ensure Azure credentials are set up (as per utils.py logic)
-    from cognitive_weave.utils import AZURE_OAI_ENDPOINT, AZURE_OAI_KEY, _PLACEHOLDER_ENDPOINT, _PLACEHOLDER_KEY
-    if AZURE_OAI_ENDPOINT == _PLACEHOLDER_ENDPOINT or AZURE_OAI_KEY == _PLACEHOLDER_KEY:
+    needs_azure = provider_needs_azure_credentials(args)
+    if args.provider == "http" and not args.base_url:
+        parser.error("--provider http requires --base-url")
+    if needs_azure and credentials_are_placeholders():
         print("="*80)
         print("ERROR: Azure OpenAI credentials in cognitive_weave/utils.py appear to be the original placeholders.")
         print("Please open cognitive_weave/utils.py and replace them with your actual Azure credentials before running the agent.")
+        print("(Use --provider offline to try the agent without any credentials.)")
         print("="*80)
     else:
-        agent = ConversationalAgent()
-        agent.start_chat()
+        if needs_azure:
+            log_info(f"Using {describe_azure_configuration()}.")
+        if args.trace:
+            TRACE.open(args.trace)
+        provider = build_provider(args)
+        oracle_cache = build_oracle_cache(args)
+        try:
+            if args.use_async:
+                agent = AsyncConversationalAgent(memory_path=args.memory, compact_memory=args.compact, provider=provider,
+                                                 oracle_cache=oracle_cache, synthesis_min_interval=args.synthesis_min_interval,
+                                                 synthesis_token_budget=args.synthesis_token_budget)
+                agent.start_index_build()
+                agent.turn_ordering = args.turn_ordering
+                agent.response_cache = build_response_cache(args)
+                asyncio.run(agent.start_chat())
+            else:
+                agent = ConversationalAgent(memory_path=args.memory, compact_memory=args.compact, provider=provider,
+                                            oracle_cache=oracle_cache, synthesis_min_interval=args.synthesis_min_interval,
+                                            synthesis_token_budget=args.synthesis_token_budget)
+                agent.start_index_build()
+                agent.turn_ordering = args.turn_ordering
+                agent.response_cache = build_response_cache(args)
+                agent.start_chat()
+        finally:
+            if oracle_cache is not None:
+                oracle_cache.close()
+            if args.metrics:
+                METRICS.write_prometheus(args.metrics)
+            TRACE.close()
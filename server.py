@@ -0,0 +1,483 @@
+# cognitive_weave_poc/server.py
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
+from cognitive_weave.embedding_store import HashingEmbedder
+from cognitive_weave.oracle_cache import OracleCache
+from cognitive_weave.providers import LLMProvider
+from cognitive_weave.response_cache import ResponseCache
+from cognitive_weave.telemetry import METRICS, TRACE
+from cognitive_weave.utils import (
+    LOG_LEVELS, configure_client_pool, credentials_are_placeholders, log_error, log_info, set_log_level
+)
+from main import (
+    AsyncConversationalAgent, ConversationalAgent, add_oracle_cache_arguments, add_provider_arguments,
+    add_response_cache_arguments, add_synthesis_arguments, build_oracle_cache, build_provider, build_response_cache,
+    provider_needs_azure_credentials
+)
+
+MEMORY_SCOPE_SESSION = "session"
+MEMORY_SCOPE_TENANT = "tenant"
+
+# Tenant and session IDs become file names, so they are restricted to a safe alphabet
+_ID_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,127}$")
+_TURN_ROUTE_RE = re.compile(r"^/v1/tenants/([^/]+)/sessions/([^/]+)/turns$")
+_SESSION_ROUTE_RE = re.compile(r"^/v1/tenants/([^/]+)/sessions/([^/]+)$")
+
+MAX_BODY_BYTES = 1024 * 1024
+# Sessions start with room for this many embeddings; the store grows on demand
+SESSION_EMBEDDING_CAPACITY = 16
+
+_HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class InvalidSessionId(ValueError):
+    pass
+
+
+class Session:
+    """One loaded memory namespace: its agent, a lock serializing its turns and LRU bookkeeping."""
+    __slots__ = ("key", "agent", "lock", "last_used", "turns", "users")
+
+    def __init__(self, key: Tuple[str, str], agent: AsyncConversationalAgent):
+        self.key = key
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.turns = 0
+        # Requests currently holding the session; a session in use is never evicted
+        self.users = 0
+
+
+class SessionManager:
+    """
+    Hosts many concurrent conversations in one process.
+
+    Every session gets its own AsyncConversationalAgent on its own SQLite memory file
+    (`data_dir/<tenant>/<session>.db`, or one file per tenant with the tenant memory
+    scope), so tenants never see each other's memories. The expensive parts are
+    shared: one provider and client pool, one AsyncSemanticOracleInterface whose
+    limiter bounds the LLM requests in flight across all sessions, one OracleCache,
+    an optional ResponseCache (scoped per tenant) and one embedder. An optional knowledge memory is attached read-only to every
+    session. Each session synthesizes IAs in the background with the given
+    `synthesis_min_interval` and per-session `synthesis_token_budget`.
+
+    Loaded sessions are kept in LRU order; sessions idle for `idle_timeout` seconds,
+    or the least recently used beyond `max_active_sessions`, are closed. Their memory
+    is already durable, so eviction only releases the in-process state and the next
+    request reloads the session lazily.
+    """
+    def __init__(self, provider: LLMProvider, data_dir: str, knowledge_path: Optional[str] = None,
+                 memory_scope: str = MEMORY_SCOPE_SESSION, max_active_sessions: int = 1000,
+                 idle_timeout: float = 600.0, max_concurrency: int = 64, turn_timeout: Optional[float] = 120.0,
+                 cache_entries: int = 10000, response_cache: Optional[ResponseCache] = None,
+                 oracle_cache: Optional[OracleCache] = None, synthesis_min_interval: float = 5.0,
+                 synthesis_token_budget: Optional[int] = None):
+        self.provider = provider
+        self.data_dir = data_dir
+        self.memory_scope = memory_scope
+        self.max_active_sessions = max_active_sessions
+        self.idle_timeout = idle_timeout
+        self.turn_timeout = turn_timeout
+        self.synthesis_min_interval = synthesis_min_interval
+        self.synthesis_token_budget = synthesis_token_budget
+        # Without an oracle_cache (e.g. one with a disk tier), a memory-only one of cache_entries entries is used
+        self.oracle_cache = oracle_cache if oracle_cache is not None else OracleCache(max_entries=cache_entries)
+        self.soi = AsyncSemanticOracleInterface(max_concurrency=max_concurrency, cache=self.oracle_cache, provider=provider)
+        self.embedder = HashingEmbedder()
+        # Shared by all sessions; each tenant is its own cache scope, so answers never cross tenants
+        self.response_cache = response_cache
+        self.knowledge: Optional[ConversationalAgent] = None
+        if knowledge_path:
+            self.knowledge = ConversationalAgent(memory_path=knowledge_path, provider=provider, embedder=self.embedder,
+                                                 read_only=True)
+            self.knowledge.start_index_build()
+        self._sessions: "OrderedDict[Tuple[str, str], Session]" = OrderedDict()
+        # One in-flight load per key, so concurrent first requests share the same agent
+        self._loading: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        os.makedirs(data_dir, exist_ok=True)
+
+    def namespace(self, tenant: str, session_id: str) -> Tuple[str, str]:
+        for value in (tenant, session_id):
+            if not _ID_RE.match(value):
+                raise InvalidSessionId(f"invalid tenant or session id: {value!r}")
+        return (tenant, session_id if self.memory_scope == MEMORY_SCOPE_SESSION else "")
+
+    def memory_path(self, key: Tuple[str, str]) -> str:
+        tenant, session_id = key
+        return os.path.join(self.data_dir, tenant, f"{session_id or '_tenant'}.db")
+
+    def _create_agent(self, key: Tuple[str, str]) -> AsyncConversationalAgent:
+        path = self.memory_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        agent = AsyncConversationalAgent(soi=self.soi, provider=self.provider, embedder=self.embedder, memory_path=path,
+                                         initial_embedding_capacity=SESSION_EMBEDDING_CAPACITY,
+                                         synthesis_min_interval=self.synthesis_min_interval,
+                                         synthesis_token_budget=self.synthesis_token_budget)
+        agent.knowledge_base = self.knowledge
+        agent.response_cache = self.response_cache
+        agent.response_cache_scope = key[0]
+        # Indexes of a stored memory build in the background; turns retrieve from its newest particles meanwhile
+        agent.start_index_build()
+        return agent
+
+    async def get(self, tenant: str, session_id: str) -> Session:
+        """Returns the session for (tenant, session_id), loading or creating its memory if needed."""
+        key = self.namespace(tenant, session_id)
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            session.last_used = time.monotonic()
+            return session
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = self._loading[key] = asyncio.get_running_loop().create_future()
+        try:
+            agent = await asyncio.to_thread(self._create_agent, key)
+            agent.consolidation_worker.start()
+            session = self._sessions[key] = Session(key, agent)
+            METRICS.inc("cognitive_weave_server_session_loads_total")
+            METRICS.set("cognitive_weave_server_active_sessions", len(self._sessions))
+            pending.set_result(session)
+        except BaseException as e:
+            pending.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting for this load
+            pending.exception()
+            raise
+        finally:
+            del self._loading[key]
+        return session
+
+    @asynccontextmanager
+    async def checkout(self, tenant: str, session_id: str) -> AsyncIterator[Session]:
+        """Holds a session for the duration of a request, then enforces the session limit."""
+        session = await self.get(tenant, session_id)
+        while self._sessions.get(session.key) is not session:
+            # Evicted while this request waited on a concurrent load; load it again
+            session = await self.get(tenant, session_id)
+        session.users += 1
+        try:
+            await self._enforce_capacity()
+            yield session
+        finally:
+            session.users -= 1
+
+    async def _enforce_capacity(self):
+        excess = len(self._sessions) - self.max_active_sessions
+        if excess > 0:
+            # Least recently used first; sessions in use stay loaded even if that overshoots the limit
+            idle = [session for session in self._sessions.values() if not session.users][:excess]
+            for session in idle:
+                await self._evict(session, reason="capacity")
+
+    async def chat(self, tenant: str, session_id: str, message: str) -> str:
+        async with self.checkout(tenant, session_id) as session:
+            async with session.lock:
+                response = await asyncio.wait_for(session.agent.chat_turn(message), self.turn_timeout)
+                self._touch(session)
+        return response
+
+    async def chat_stream(self, tenant: str, session_id: str, message: str) -> AsyncIterator[str]:
+        async with self.checkout(tenant, session_id) as session:
+            async with session.lock:
+                turn = session.agent.chat_turn_stream(message)
+                try:
+                    async for delta in turn:
+                        yield delta
+                finally:
+                    # A client that disconnects mid-stream still completes the turn under the session lock
+                    await turn.aclose()
+                self._touch(session)
+
+    def _touch(self, session: Session):
+        session.turns += 1
+        session.last_used = time.monotonic()
+        METRICS.inc("cognitive_weave_server_turns_total")
+
+    def session_stats(self, tenant: str, session_id: str) -> Dict:
+        key = self.namespace(tenant, session_id)
+        session = self._sessions.get(key)
+        if session is None:
+            return {"tenant": tenant, "session": session_id, "loaded": False,
+                    "persisted": os.path.exists(self.memory_path(key))}
+        return {
+            "tenant": tenant,
+            "session": session_id,
+            "loaded": True,
+            "particles": len(session.agent.memory_store),
+            "turns": session.turns,
+            "idle_seconds": round(time.monotonic() - session.last_used, 3),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "active_sessions": len(self._sessions),
+            "max_active_sessions": self.max_active_sessions,
+            "memory_scope": self.memory_scope,
+            "llm_concurrency": self.soi.max_concurrency,
+            "knowledge_particles": len(self.knowledge.memory_store) if self.knowledge is not None else 0,
+        }
+
+    async def evict(self, tenant: str, session_id: str) -> bool:
+        session = self._sessions.get(self.namespace(tenant, session_id))
+        if session is None:
+            return False
+        return await self._evict(session, reason="request")
+
+    async def _evict(self, session: Session, reason: str, force: bool = False) -> bool:
+        # Waiting for the lock lets a running turn (and its ingestion) finish first
+        async with session.lock:
+            if self._sessions.get(session.key) is not session or (session.users and not force):
+                return False
+            del self._sessions[session.key]
+            await session.agent.consolidation_worker.stop()
+            await asyncio.to_thread(session.agent.close)
+        METRICS.inc("cognitive_weave_server_session_evictions_total", reason=reason)
+        METRICS.set("cognitive_weave_server_active_sessions", len(self._sessions))
+        log_info(f"Server: evicted session {session.key} ({reason}).")
+        return True
+
+    async def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [session for session in self._sessions.values() if session.last_used < cutoff and not session.users]
+        for session in idle:
+            await self._evict(session, reason="idle")
+
+    async def _sweep(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                log_error(f"Server: idle-session sweep failed: {e}")
+
+    def start(self, sweep_interval: Optional[float] = None):
+        if self._sweeper is None:
+            interval = sweep_interval if sweep_interval is not None else max(1.0, min(60.0, self.idle_timeout / 4))
+            self._sweeper = asyncio.create_task(self._sweep(interval))
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for session in list(self._sessions.values()):
+            await self._evict(session, reason="shutdown", force=True)
+        if self.knowledge is not None:
+            self.knowledge.close()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AgentServer:
+    """
+    Minimal HTTP/1.1 JSON API over a SessionManager, built on asyncio streams.
+
+    Routes:
+        POST   /v1/tenants/{tenant}/sessions/{session}/turns  {"message": str, "stream": bool}
+        GET    /v1/tenants/{tenant}/sessions/{session}        session stats
+        DELETE /v1/tenants/{tenant}/sessions/{session}        evict the session (memory is kept)
+        GET    /v1/sessions                                   server stats
+        GET    /metrics                                       Prometheus text format
+        GET    /healthz
+
+    Connections are kept alive. A streamed turn is sent as chunked NDJSON: one
+    {"delta": ...} line per token delta, then {"done": true, "response": ...}.
+    """
+    def __init__(self, manager: SessionManager):
+        self.manager = manager
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(None, 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                keep_alive = version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY_BYTES:
+                    await self._send_json(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                await self._dispatch(method.upper(), unquote(target.split("?", 1)[0]), body, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter, keep_alive: bool):
+        try:
+            if path == "/healthz":
+                await self._send_json(writer, 200, {"status": "ok"}, keep_alive)
+            elif path == "/metrics":
+                await self._send(writer, 200, METRICS.render_prometheus().encode("utf-8"),
+                                 "text/plain; version=0.0.4", keep_alive)
+            elif path == "/v1/sessions":
+                await self._send_json(writer, 200, self.manager.stats(), keep_alive)
+            elif _TURN_ROUTE_RE.match(path):
+                if method != "POST":
+                    raise HTTPError(405, "use POST")
+                tenant, session_id = _TURN_ROUTE_RE.match(path).groups()
+                await self._turn(tenant, session_id, body, writer, keep_alive)
+            elif _SESSION_ROUTE_RE.match(path):
+                tenant, session_id = _SESSION_ROUTE_RE.match(path).groups()
+                if method == "GET":
+                    await self._send_json(writer, 200, self.manager.session_stats(tenant, session_id), keep_alive)
+                elif method == "DELETE":
+                    evicted = await self.manager.evict(tenant, session_id)
+                    await self._send_json(writer, 200, {"evicted": evicted}, keep_alive)
+                else:
+                    raise HTTPError(405, "use GET or DELETE")
+            else:
+                raise HTTPError(404, f"no route for {path}")
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+        except InvalidSessionId as e:
+            await self._send_json(writer, 400, {"error": str(e)}, keep_alive)
+        except asyncio.TimeoutError:
+            await self._send_json(writer, 504, {"error": "turn timed out"}, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            log_error(f"Server: error handling {method} {path}: {e}")
+            await self._send_json(writer, 500, {"error": "internal error"}, keep_alive)
+
+    async def _turn(self, tenant: str, session_id: str, body: bytes, writer: asyncio.StreamWriter, keep_alive: bool):
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HTTPError(400, "body must be JSON")
+        message = payload.get("message") if isinstance(payload, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "'message' must be a non-empty string")
+
+        if not payload.get("stream"):
+            response = await self.manager.chat(tenant, session_id, message)
+            await self._send_json(writer, 200, {"response": response}, keep_alive)
+            return
+
+        self.manager.namespace(tenant, session_id)  # reject bad IDs before the 200 goes out
+        writer.write(self._head(200, "application/x-ndjson", keep_alive, chunked=True))
+        parts = []
+        stream = self.manager.chat_stream(tenant, session_id, message)
+        try:
+            async for delta in stream:
+                parts.append(delta)
+                self._write_chunk(writer, json.dumps({"delta": delta}) + "\n")
+                await writer.drain()
+            final = {"done": True, "response": "".join(parts)}
+        except ConnectionError:
+            await stream.aclose()
+            raise
+        except Exception as e:
+            # The status line is already out, so the failure is reported in-band
+            log_error(f"Server: streamed turn for {tenant}/{session_id} failed: {e}")
+            final = {"done": True, "error": "internal error"}
+        self._write_chunk(writer, json.dumps(final) + "\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _head(status: int, content_type: str, keep_alive: bool, length: Optional[int] = None,
+              chunked: bool = False) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.append("Transfer-Encoding: chunked" if chunked else f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, text: str):
+        data = text.encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, data: bytes, content_type: str, keep_alive: bool):
+        writer.write(self._head(status, content_type, keep_alive, length=len(data)) + data)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool):
+        await self._send(writer, status, json.dumps(payload).encode("utf-8"), "application/json", keep_alive)
+
+    async def serve(self, host: str, port: int):
+        self.manager.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        log_info(f"Server: listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session Cognitive Weave agent server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="sessions", help="directory holding one SQLite memory file per namespace")
+    parser.add_argument("--memory-scope", choices=[MEMORY_SCOPE_SESSION, MEMORY_SCOPE_TENANT], default=MEMORY_SCOPE_SESSION,
+                        help="give every session its own memory, or share one memory across a tenant's sessions")
+    parser.add_argument("--knowledge", metavar="PATH", help="SQLite memory file attached read-only to every session")
+    parser.add_argument("--max-active-sessions", type=int, default=1000, help="loaded sessions kept before LRU eviction")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="seconds before an idle session is evicted")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="LLM requests in flight across all sessions")
+    parser.add_argument("--turn-timeout", type=float, default=120.0, help="seconds before a non-streamed turn fails with 504")
+    add_provider_arguments(parser)
+    add_response_cache_arguments(parser)
+    add_oracle_cache_arguments(parser)
+    add_synthesis_arguments(parser)
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), default="ERROR")
+    parser.add_argument("--trace", metavar="PATH", help="append spans and structured log records to a JSONL trace file")
+    parser.add_argument("--max-connections", type=int, help="size of the shared HTTP connection pool")
+    parser.add_argument("--max-keepalive-connections", type=int, help="idle connections the shared pool keeps alive")
+    args = parser.parse_args()
+    set_log_level(args.log_level)
+    configure_client_pool(max_connections=args.max_connections, max_keepalive_connections=args.max_keepalive_connections)
+
+    if args.provider == "http" and not args.base_url:
+        parser.error("--provider http requires --base-url")
+    if provider_needs_azure_credentials(args) and credentials_are_placeholders():
+        parser.error("Azure OpenAI credentials in cognitive_weave/utils.py are placeholders; "
+                     "configure them or use --provider offline")
+    if args.trace:
+        TRACE.open(args.trace)
+    manager = SessionManager(build_provider(args), args.data_dir, knowledge_path=args.knowledge,
+                             memory_scope=args.memory_scope, max_active_sessions=args.max_active_sessions,
+                             idle_timeout=args.idle_timeout, max_concurrency=args.max_concurrency,
+                             turn_timeout=args.turn_timeout, response_cache=build_response_cache(args),
+                             oracle_cache=build_oracle_cache(args), synthesis_min_interval=args.synthesis_min_interval,
+                             synthesis_token_budget=args.synthesis_token_budget)
+    try:
+        asyncio.run(AgentServer(manager).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.oracle_cache.close()
+        TRACE.close()
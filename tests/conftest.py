@@ -0,0 +1,126 @@
+# cognitive_weave_poc/tests/conftest.py
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognitive_weave import utils  # noqa: E402
+from cognitive_weave.offline_provider import OfflineProvider  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs(monkeypatch):
+    monkeypatch.setattr(utils, "_log_level", utils.LOG_LEVELS["OFF"])
+
+
+@pytest.fixture
+def offline_agent():
+    """A sequential in-memory agent backed by the deterministic OfflineProvider."""
+    from main import ConversationalAgent, TURN_ORDERING_SEQUENTIAL
+    agent = ConversationalAgent(provider=OfflineProvider())
+    agent.turn_ordering = TURN_ORDERING_SEQUENTIAL
+    return agent
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Local OpenAI-compatible endpoint (/v1/chat/completions, streaming included, and
+    /v1/embeddings) answered by the OfflineProvider. Status codes queued in
+    `fail_next` are returned, one per request, before any real answer.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _MockOpenAIHandler)
+        self.backend = OfflineProvider()
+        self.fail_next = []
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _MockOpenAIHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        with self.server._lock:
+            self.server.requests.append((self.path, request))
+            status = self.server.fail_next.pop(0) if self.server.fail_next else None
+        if status is not None:
+            self._send_json(status, {"error": {"message": "injected failure", "type": "server_error", "code": status}})
+            return
+        backend = self.server.backend
+        created = int(time.time())
+        if self.path.endswith("/embeddings"):
+            texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+            vectors = backend.embed(texts)
+            self._send_json(200, {
+                "object": "list", "model": request["model"],
+                "data": [{"object": "embedding", "index": i, "embedding": vector} for i, vector in enumerate(vectors)],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            })
+            return
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        text = backend.complete(request["messages"], temperature=request.get("temperature", 0.0),
+                                max_tokens=request.get("max_tokens", 256), json_mode=json_mode)
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": created, "model": request["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for delta in backend.stream_complete(request["messages"], temperature=0.0, max_tokens=0):
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created,
+                     "model": request["model"],
+                     "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+@pytest.fixture
+def mock_openai_server():
+    server = MockOpenAIServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fresh_deployment_limits():
+    """Isolates the process-wide rate limits and circuit breakers of a test."""
+    from cognitive_weave import resilience
+    saved = {model: dict(settings) for model, settings in resilience._limit_settings.items()}
+    resilience._guards.clear()
+    yield resilience.configure_deployment_limits
+    resilience._limit_settings.clear()
+    resilience._limit_settings.update(saved)
+    resilience._guards.clear()
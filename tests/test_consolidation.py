@@ -0,0 +1,41 @@
+# cognitive_weave_poc/tests/test_consolidation.py
+
+from cognitive_weave.consolidation import ConsolidationEngine
+from cognitive_weave.data_structures import InsightParticle
+
+
+def _ip(particle_id, keys=(), signifiers=(), entities=()):
+    return InsightParticle(particle_id=particle_id, core_data=particle_id, situational_imprint=particle_id,
+                           resonance_keys=list(keys), signifiers=list(signifiers), extracted_entities=list(entities))
+
+
+def test_one_shared_key_does_not_join_a_cluster():
+    engine = ConsolidationEngine()
+    knee = engine.add_particle(_ip("knee", keys=["knee", "physiotherapy"]))
+    assert engine.add_particle(_ip("knee again", keys=["knee", "physiotherapy", "brace"])) == knee
+    # Each link below shares a single key with the previous IP, which used to chain them all together
+    chain = [engine.add_particle(_ip("brace", keys=["brace", "shopping"])),
+             engine.add_particle(_ip("shopping", keys=["shopping", "groceries"])),
+             engine.add_particle(_ip("groceries", keys=["groceries", "budget"]))]
+    assert len({knee, *chain}) == 4
+    # Two broad signifiers are not enough either, but a key and a signifier are
+    assert engine.add_particle(_ip("health", keys=["sleep"], signifiers=["health", "physiotherapy"])) != knee
+    assert engine.add_particle(_ip("knee note", keys=["knee", "running"], signifiers=["physiotherapy"])) == knee
+
+
+def test_removed_members_stop_linking_their_terms():
+    engine = ConsolidationEngine()
+    trip = engine.add_particle(_ip("trip", keys=["lisbon", "flight"], entities=["TAP"]))
+    engine.add_particle(_ip("hotel", keys=["lisbon", "hotel"], entities=["TAP"]))
+    engine.remove_particle("trip")
+    assert "flight" not in engine._term_clusters
+    assert engine._term_clusters["lisbon"] == {trip: 1}
+    # Only "TAP" is still shared once the removed IP's "flight" is pruned
+    assert engine.add_particle(_ip("flight", keys=["flight", "booking"], entities=["TAP"])) != trip
+    assert engine.add_particle(_ip("museum", keys=["lisbon", "museum"], entities=["TAP"])) == trip
+
+    for particle_id in ("hotel", "museum"):
+        engine.remove_particle(particle_id)
+    assert engine.members(trip) == []
+    assert all(trip not in clusters for clusters in engine._term_clusters.values())
+    assert "lisbon" not in engine._term_clusters
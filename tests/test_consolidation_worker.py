@@ -0,0 +1,48 @@
+# cognitive_weave_poc/tests/test_consolidation_worker.py
+
+import argparse
+
+from cognitive_weave.consolidation import SynthesisJob
+from cognitive_weave.consolidation_worker import ConsolidationScheduler, estimate_job_tokens
+from cognitive_weave.offline_provider import OfflineProvider
+from main import AsyncConversationalAgent, ConversationalAgent, add_synthesis_arguments
+from server import SessionManager
+
+
+def _job(cluster_id, words):
+    return SynthesisJob(cluster_id=cluster_id, member_ids=("a", "b"),
+                        imprints=(" ".join(["imprint"] * words),) * 2, aggregate_id=None)
+
+
+def test_job_above_the_hourly_budget_runs_once_the_window_is_empty():
+    small, huge = _job(0, 10), _job(1, 2000)
+    budget = estimate_job_tokens(small) * 3
+    assert estimate_job_tokens(huge) > budget
+    scheduler = ConsolidationScheduler(plan=lambda: [], publish=lambda attributes, job: None,
+                                       token_budget_per_hour=budget)
+
+    assert scheduler._admit([small, huge], None, now=0.0) == [small]
+    assert scheduler.jobs_deferred == 1
+    assert scheduler._admit([huge], None, now=1800.0) == []
+
+    assert scheduler._admit([huge], None, now=3600.0) == [huge]
+    assert scheduler._spent_in_window(3600.0) == budget
+    assert scheduler._admit([small], None, now=3601.0) == []
+
+
+def test_synthesis_limits_reach_every_worker(tmp_path):
+    parser = argparse.ArgumentParser()
+    add_synthesis_arguments(parser)
+    args = parser.parse_args(["--synthesis-min-interval", "30", "--synthesis-token-budget", "5000"])
+    limits = dict(synthesis_min_interval=args.synthesis_min_interval, synthesis_token_budget=args.synthesis_token_budget)
+
+    for agent in (ConversationalAgent(provider=OfflineProvider(), **limits),
+                  AsyncConversationalAgent(provider=OfflineProvider(), **limits)):
+        assert agent.consolidation_worker.min_interval_seconds == 30.0
+        assert agent.consolidation_worker.token_budget_per_hour == 5000
+
+    manager = SessionManager(OfflineProvider(), str(tmp_path), **limits)
+    session_agent = manager._create_agent(manager.namespace("acme", "s1"))
+    worker = session_agent.consolidation_worker
+    assert (worker.min_interval_seconds, worker.token_budget_per_hour) == (30.0, 5000)
+    session_agent.close()
@@ -0,0 +1,64 @@
+# cognitive_weave_poc/tests/test_context_assembler.py
+
+from cognitive_weave.context_assembler import ContextAssembler
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.telemetry import METRICS, MetricsRegistry
+
+
+def _ip(name, timestamp):
+    return InsightParticle(particle_id=name, core_data=name, situational_imprint=name,
+                           creation_timestamp=f"2026-01-01T00:00:{timestamp:02d}")
+
+
+def _ia(name, sources, timestamp):
+    return InsightParticle(particle_id=name, core_data=name, situational_imprint=name, is_aggregate=True,
+                           derived_from_ids=[source.particle_id for source in sources],
+                           creation_timestamp=f"2026-01-01T00:00:{timestamp:02d}")
+
+
+def _names(context):
+    return [ip.particle_id for ip in context.particles]
+
+
+def test_an_aggregate_found_through_the_graph_replaces_the_ip_it_ties_with():
+    ip_a, ip_b = _ip("ip a", 1), _ip("ip b", 2)
+    ia = _ia("ia", [ip_a], 3)
+    context = ContextAssembler().assemble([ip_a, ip_b], lambda pid: [ia] if pid == ip_a.particle_id else [])
+    assert _names(context) == ["ip b", "ia"]
+    assert context.dropped == 1
+
+
+def test_a_retrieved_aggregate_replaces_its_higher_ranked_sources():
+    ip_a, ip_b, ip_c = _ip("ip a", 1), _ip("ip b", 2), _ip("ip c", 3)
+    ia = _ia("ia", [ip_a, ip_b], 4)
+    context = ContextAssembler().assemble([ip_a, ip_b, ip_c, ia])
+    assert _names(context) == ["ip c", "ia"]
+    assert context.dropped == 2
+
+
+def test_sources_stay_when_their_aggregate_does_not_fit():
+    ip_a, ip_b = _ip("ip a", 1), _ip("ip b", 2)
+    ia = _ia("ia " + "very long summary " * 40, [ip_a], 3)
+    assembler = ContextAssembler(token_budget=60)
+    context = assembler.assemble([ip_a, ip_b], lambda pid: [ia] if pid == ip_a.particle_id else [])
+    assert _names(context) == ["ip a", "ip b"]
+    assert context.dropped == 0 and context.tokens <= 60
+
+
+def test_histograms_keep_the_buckets_they_were_created_with():
+    metrics = MetricsRegistry()
+    metrics.observe("tokens", 700, buckets=(256, 1024))
+    metrics.observe("tokens", 5000, model="other")
+    metrics.observe("latency_seconds", 0.02)
+    rendered = metrics.render_prometheus()
+    assert 'tokens_bucket{le="256"} 0' in rendered and 'tokens_bucket{le="1024"} 1' in rendered
+    assert 'tokens_bucket{model="other",le="1024"} 0' in rendered
+    assert 'tokens_bucket{model="other",le="+Inf"} 1' in rendered
+    assert 'latency_seconds_bucket{le="0.025"} 1' in rendered
+
+
+def test_context_sizes_are_recorded_in_token_buckets():
+    ContextAssembler().assemble([_ip("ip a", 1), _ip("ip b", 2)], lambda pid: [])
+    rendered = METRICS.render_prometheus()
+    assert 'cognitive_weave_context_tokens_bucket{le="32"}' in rendered
+    assert 'cognitive_weave_context_tokens_bucket{le="0.001"}' not in rendered
@@ -0,0 +1,90 @@
+# cognitive_weave_poc/tests/test_dedup.py
+
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.dedup import MATCH_EXACT, MATCH_NEAR, DuplicateDetector, MinHasher, fact_tokens
+
+TEXT = "I started physiotherapy for my left knee last Tuesday and the exercises already help a lot."
+
+
+def _particle(particle_id, text, imprint=None):
+    return InsightParticle(particle_id=particle_id, core_data=text, situational_imprint=imprint)
+
+
+def test_minhash_estimates_shingle_similarity():
+    hasher = MinHasher()
+    signature = hasher.signature(TEXT)
+    assert MinHasher.similarity(signature, hasher.signature(TEXT)) == 1.0
+    assert MinHasher.similarity(signature, hasher.signature(TEXT.replace("Tuesday", "Monday"))) > 0.6
+    assert MinHasher.similarity(signature, hasher.signature("The quarterly budget review moved to Friday.")) < 0.2
+    assert hasher.signature(" ?! ") is None
+
+
+def test_exact_and_near_restatements_are_matched():
+    detector = DuplicateDetector()
+    detector.add(_particle("knee", TEXT))
+    detector.add(_particle("budget", "The quarterly budget review moved to Friday afternoon."))
+
+    exact = detector.match_text("  i STARTED physiotherapy for my left knee last tuesday and the exercises already help a lot.")
+    assert exact.particle_id == "knee" and exact.kind == MATCH_EXACT
+
+    near = detector.match_text(TEXT.replace("Tuesday and", "Tuesday, and").replace("lot.", "lot!"))
+    assert near.particle_id == "knee" and near.kind == MATCH_NEAR
+    assert detector.match_text(TEXT.replace("a lot", "quite a lot")) is None
+    assert detector.match_text("My sister is visiting from Lisbon next month for a week.") is None
+
+
+def test_removed_and_aggregate_particles_are_never_matched():
+    detector = DuplicateDetector()
+    detector.add(_particle("knee", TEXT))
+    detector.remove("knee")
+    assert detector.match_text(TEXT) is None and len(detector) == 0
+
+    aggregate = _particle("ia", TEXT)
+    aggregate.is_aggregate = True
+    detector.add(aggregate)
+    assert detector.match_text(TEXT) is None
+
+
+def test_agent_merges_a_restatement_instead_of_storing_it(offline_agent):
+    first = offline_agent.add_to_memory(TEXT)
+    again = offline_agent.add_to_memory(TEXT.upper())
+    assert again is first
+    assert len(offline_agent.memory_store) == 1
+    assert first.access_frequency == 1
+
+
+def test_fact_tokens_keep_numbers_in_order_and_count_negations():
+    assert fact_tokens("The dose is 20mg, not 10mg; she isn't sure and won’t say.") == (("20mg", "10mg"), 3)
+    assert fact_tokens("No change since 2024.") == (("2024",), 1)
+
+
+def test_contradictory_restatements_are_not_merged():
+    detector = DuplicateDetector()
+    allergy = "The patient is not allergic to penicillin and can take amoxicillin safely after the 2023 test."
+    lease = ("My apartment lease on Harbour Street ends in March 2025 and the landlord wants to renew it for "
+             "another two years at the same monthly rent.")
+    detector.add(_particle("allergy", allergy, imprint="Patient penicillin allergy status"))
+    detector.add(_particle("lease", lease, imprint="Apartment lease end date and renewal"))
+
+    assert detector.match_text(allergy.replace("is not allergic", "is allergic")) is None
+    assert detector.match_text(lease.replace("2025", "2024")) is None
+    assert detector.match_enriched(lease.replace("2025", "2024"), "Apartment lease end date and renewal") is None
+    assert detector.match_enriched(allergy.replace("not ", ""), "Patient penicillin allergy status") is None
+
+    # Same facts: punctuation-only restatements still merge before enrichment
+    assert detector.match_text(lease.replace("it for", "it, for")).particle_id == "lease"
+    assert detector.match_enriched(lease.replace("wants", "would like"), "Apartment lease end date and renewal").particle_id == "lease"
+
+    # The fact check holds even at a loose similarity threshold
+    loose = DuplicateDetector(near_threshold=0.8)
+    loose.add(_particle("allergy", allergy))
+    assert loose.match_text(allergy.replace("is not allergic", "is allergic")) is None
+    assert loose.match_text(allergy.replace("2023", "2021")) is None
+    assert loose.match_text(allergy.replace("safely", "safely indeed")).particle_id == "allergy"
+
+
+def test_agent_stores_a_contradicting_restatement(offline_agent):
+    first = offline_agent.add_to_memory("My apartment lease ends in March 2025 and the landlord wants to renew it.")
+    second = offline_agent.add_to_memory("My apartment lease ends in March 2024 and the landlord wants to renew it.")
+    assert second is not first
+    assert len(offline_agent.memory_store) == 2
@@ -0,0 +1,147 @@
+# cognitive_weave_poc/tests/test_ingestion.py
+
+import asyncio
+import json
+
+import pytest
+
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
+from cognitive_weave.ingestion import (
+    CHECKPOINT_VERSION, BulkIngestor, IngestCheckpoint, SourceRecord, parse_conversation_log
+)
+from cognitive_weave.offline_provider import OfflineProvider
+from main import ConversationalAgent
+
+TRANSCRIPT = """Welcome to the Cognitive Weave Conversational Agent!
+Type 'quit' to exit.
+
+You: My landlord wants to raise the rent by 12 percent.
+[INFO] 
+--- Adding to Memory (Source: user_input) ---
+Agent: That is a large increase.
+Check whether your lease caps it.
+[INFO] Turn finished.
+You: 
+You: [paste]
+You: Can they do that mid-lease?
+Agent: Usually not without a clause allowing it.
+You: quit
+Agent: Goodbye!
+"""
+
+
+class FailingSOI(AsyncSemanticOracleInterface):
+    """Async SOI that fails the whole enrichment of any chunk containing a text from `fail_on`."""
+    def __init__(self, fail_on=()):
+        super().__init__(provider=OfflineProvider())
+        self.fail_on = set(fail_on)
+        self.enriched = []
+
+    async def enrich_texts_to_ip_attributes(self, raw_texts, **kwargs):
+        if self.fail_on & set(raw_texts):
+            await asyncio.sleep(0.01)  # let later chunks finish enriching first
+            raise RuntimeError("enrichment unavailable")
+        self.enriched.extend(raw_texts)
+        return await super().enrich_texts_to_ip_attributes(raw_texts, **kwargs)
+
+
+def _records_file(tmp_path, name, count):
+    path = tmp_path / name
+    path.write_text("\n".join(json.dumps({"text": f"{name} record {i} about topic {i * 7}"}) for i in range(count)) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def _ingest(agent, soi, checkpoint_path, paths, chunk_size=4, max_chunks_in_flight=1):
+    ingestor = BulkIngestor(agent, soi, checkpoint_path=checkpoint_path, chunk_size=chunk_size,
+                            max_chunks_in_flight=max_chunks_in_flight)
+    return asyncio.run(ingestor.run(paths))
+
+
+def _stored_texts(agent):
+    return [ip.core_data for ip in agent.memory_store if not ip.is_aggregate]
+
+
+def test_parse_conversation_log_keeps_complete_user_turns(tmp_path):
+    path = tmp_path / "session.log"
+    path.write_text(TRANSCRIPT, encoding="utf-8")
+    assert parse_conversation_log(str(path)) == [
+        ("My landlord wants to raise the rent by 12 percent.", "That is a large increase.\nCheck whether your lease caps it."),
+        ("Can they do that mid-lease?", "Usually not without a clause allowing it."),
+    ]
+
+
+def test_checkpoint_round_trips_and_rejects_other_versions(tmp_path):
+    path = str(tmp_path / "job.ingest.json")
+    checkpoint = IngestCheckpoint(path)
+    assert checkpoint.resume_offset("a.jsonl") == 0
+    checkpoint.completed_sources.add("a.jsonl")
+    checkpoint.source, checkpoint.records, checkpoint.last_particle_id = "b.jsonl", 7, "IP_x"
+    checkpoint.stats["ingested"] = 9
+    checkpoint.save()
+
+    reloaded = IngestCheckpoint(path)
+    assert reloaded.completed_sources == {"a.jsonl"}
+    assert reloaded.resume_offset("b.jsonl") == 7 and reloaded.resume_offset("c.jsonl") == 0
+    assert reloaded.last_particle_id == "IP_x" and reloaded.stats["ingested"] == 9
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION + 1}, f)
+    with pytest.raises(ValueError):
+        IngestCheckpoint(path)
+
+
+def test_read_chunks_resumes_after_the_committed_records(tmp_path):
+    done, current = _records_file(tmp_path, "a.jsonl", 3), _records_file(tmp_path, "b.jsonl", 10)
+    checkpoint = IngestCheckpoint(str(tmp_path / "job.ingest.json"))
+    checkpoint.completed_sources.add(done)
+    checkpoint.source, checkpoint.records = current, 4
+    checkpoint.save()
+
+    ingestor = BulkIngestor(None, None, checkpoint_path=checkpoint.path, chunk_size=4)
+    chunks = list(ingestor._read_chunks([done, current]))
+    assert [[record.index for record in records] for records, _ in chunks] == [[4, 5, 6, 7], [8, 9]]
+    assert chunks[0][0][0] == SourceRecord(current, 4, "b.jsonl record 4 about topic 28")
+    assert [finished for _, finished in chunks] == [[], [current]]
+
+
+def test_chunks_after_a_failed_chunk_are_not_committed(tmp_path):
+    source = _records_file(tmp_path, "notes.jsonl", 12)
+    checkpoint_path = str(tmp_path / "memory.db.ingest.json")
+    agent = ConversationalAgent(memory_path=str(tmp_path / "memory.db"), provider=OfflineProvider())
+    soi = FailingSOI(fail_on={"notes.jsonl record 5 about topic 35"})
+
+    with pytest.raises(RuntimeError):
+        _ingest(agent, soi, checkpoint_path, [source], max_chunks_in_flight=3)
+    # The third chunk was enriched, but committing it would leave a gap at the second
+    assert "notes.jsonl record 9 about topic 63" in soi.enriched
+    assert _stored_texts(agent) == [f"notes.jsonl record {i} about topic {i * 7}" for i in range(4)]
+    assert IngestCheckpoint(checkpoint_path).resume_offset(source) == 4
+    agent.close()
+
+
+def test_interrupted_ingestion_resumes_without_duplicates_or_gaps(tmp_path):
+    sources = [_records_file(tmp_path, "a.jsonl", 6), _records_file(tmp_path, "b.jsonl", 9)]
+    expected = [f"{name} record {i} about topic {i * 7}" for name, count in (("a.jsonl", 6), ("b.jsonl", 9))
+                for i in range(count)]
+    memory_path, checkpoint_path = str(tmp_path / "memory.db"), str(tmp_path / "memory.db.ingest.json")
+
+    agent = ConversationalAgent(memory_path=memory_path, provider=OfflineProvider())
+    with pytest.raises(RuntimeError):
+        _ingest(agent, FailingSOI(fail_on={"b.jsonl record 3 about topic 21"}), checkpoint_path, sources)
+    interrupted = IngestCheckpoint(checkpoint_path)
+    assert interrupted.completed_sources == {sources[0]} and interrupted.resume_offset(sources[1]) == 2
+    agent.close()
+
+    agent = ConversationalAgent(memory_path=memory_path, provider=OfflineProvider())
+    soi = FailingSOI()
+    stats = _ingest(agent, soi, checkpoint_path, sources)
+    # Only the uncommitted records were read and enriched again
+    assert soi.enriched == expected[8:]
+    assert stats == {"records": 15, "ingested": 15, "duplicates": 0, "failed": 0}
+    assert sorted(_stored_texts(agent)) == sorted(expected)
+
+    # A finished job's checkpoint makes a rerun a no-op
+    soi = FailingSOI()
+    assert _ingest(agent, soi, checkpoint_path, sources)["ingested"] == 15 and soi.enriched == []
+    agent.close()
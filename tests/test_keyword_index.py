@@ -0,0 +1,69 @@
+# cognitive_weave_poc/tests/test_keyword_index.py
+
+import pytest
+
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.keyword_index import BM25FIndex
+
+
+def _particle(particle_id, keys=(), imprint=None, signifiers=()):
+    return InsightParticle(particle_id=particle_id, core_data=imprint or "", resonance_keys=list(keys),
+                           signifiers=list(signifiers), situational_imprint=imprint)
+
+
+def _ids(results):
+    return [ip.particle_id for ip, _ in results]
+
+
+def test_resonance_keys_outweigh_the_imprint():
+    index = BM25FIndex()
+    index.add(_particle("imprint", imprint="notes mention knee rehabilitation"))
+    index.add(_particle("key", keys=["knee"], imprint="notes mention rehabilitation"))
+    assert _ids(index.search({"knee"})) == ["key", "imprint"]
+
+
+def test_rare_terms_count_more_than_common_ones():
+    index = BM25FIndex()
+    for i in range(10):
+        index.add(_particle(f"common{i}", keys=["meeting"]))
+    index.add(_particle("rare", keys=["meeting", "budget"]))
+    index.add(_particle("other", keys=["budget", "deadline"]))
+    scores = index.score({"meeting", "budget"})
+    assert scores["rare"] > scores["other"] > scores["common0"] > 0
+
+
+def test_remove_and_readd_update_the_ranking():
+    index = BM25FIndex()
+    index.add(_particle("a", keys=["garden"]))
+    index.add(_particle("b", keys=["garden", "tomato"]))
+    index.remove("b")
+    assert _ids(index.search({"tomato"})) == []
+    assert "b" not in index and len(index) == 1
+
+    index.add(_particle("a", keys=["tomato"]))
+    assert _ids(index.search({"garden"})) == []
+    assert _ids(index.search({"tomato"})) == ["a"]
+
+
+def test_ties_keep_insertion_order_and_top_k_truncates():
+    index = BM25FIndex()
+    for name in ("first", "second", "third"):
+        index.add(_particle(name, keys=["apple"]))
+    assert _ids(index.search({"apple"})) == ["first", "second", "third"]
+    assert _ids(index.search({"apple"}, top_k=2)) == ["first", "second"]
+
+
+def test_search_many_matches_individual_searches_across_compaction():
+    index = BM25FIndex(initial_capacity=4)
+    for i in range(3000):
+        index.add(_particle(f"p{i}", keys=[f"topic{i % 7}", "shared"], imprint=f"entry {i % 11} about things"))
+    for i in range(0, 3000, 3):
+        index.remove(f"p{i}")
+    assert len(index) == 2000
+    queries = [{"topic1"}, {"topic2", "shared"}, {"missing"}, {"entry", "topic6"}]
+    batched = index.search_many(queries, top_k=5)
+    for query, results in zip(queries, batched):
+        single = index.search(query, top_k=5)
+        assert _ids(results) == _ids(single)
+        assert [score for _, score in results] == pytest.approx([score for _, score in single])
+    assert batched[2] == []
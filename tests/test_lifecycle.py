@@ -0,0 +1,48 @@
+# cognitive_weave_poc/tests/test_lifecycle.py
+
+from datetime import datetime, timedelta
+
+
+def _add_related_notes(agent, count):
+    return [agent.add_to_memory(f"My divorce case number {i} concerns custody of child {i} "
+                                f"and the house mortgage payment {i * 7}").particle_id
+            for i in range(count)]
+
+
+def test_gc_keeps_ips_no_aggregate_has_synthesized(offline_agent):
+    agent = offline_agent
+    agent.deduplicator = None
+    ids = _add_related_notes(agent, 30)
+
+    agent._attempt_ia_synthesis()
+    (ia,) = [ip for ip in agent.memory_store if ip.is_aggregate]
+    synthesized = set(ia.derived_from_ids)
+    assert len(synthesized) == agent.consolidation.max_imprints_per_call
+    assert f"{len(synthesized)} related notes" in ia.core_data
+
+    collected = agent.lifecycle.collect_garbage(now=datetime.utcnow() + timedelta(days=30))
+    assert set(collected) <= synthesized
+    remaining = {ip.particle_id for ip in agent.memory_store}
+    assert set(ids) - synthesized <= remaining
+
+
+def test_refresh_covers_earlier_sources_through_the_previous_summary(offline_agent):
+    agent = offline_agent
+    agent.deduplicator = None
+    ids = _add_related_notes(agent, 30)
+
+    first = agent.consolidation.plan()
+    assert all(job.aggregate_id is None for job in first)
+    agent._attempt_ia_synthesis()
+    (ia,) = [ip for ip in agent.memory_store if ip.is_aggregate]
+
+    (refresh,) = agent.consolidation.plan()
+    assert refresh.aggregate_id == ia.particle_id
+    assert refresh.imprints[0] == ia.core_data
+    assert len(refresh.imprints) == agent.consolidation.max_imprints_per_call
+    assert not set(refresh.member_ids) & set(ia.derived_from_ids)
+
+    while agent.consolidation.plan():
+        agent._attempt_ia_synthesis()
+    assert sorted(ia.derived_from_ids) == sorted(ids)
+    assert not agent.consolidation.dirty_clusters()
@@ -0,0 +1,110 @@
+# cognitive_weave_poc/tests/test_oracle_cache.py
+
+import argparse
+import asyncio
+
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.oracle_cache import OracleCache
+from cognitive_weave.semantic_oracle import SemanticOracleInterface
+from main import ConversationalAgent, add_oracle_cache_arguments, build_oracle_cache
+
+TEXT = "I started physiotherapy for my left knee last Tuesday and the exercises already help a lot."
+
+
+class CountingProvider(OfflineProvider):
+    """OfflineProvider that counts completion calls."""
+    def __init__(self):
+        super().__init__()
+        self.completions = 0
+
+    def complete(self, messages, **kwargs):
+        self.completions += 1
+        return super().complete(messages, **kwargs)
+
+    async def acomplete(self, messages, **kwargs):
+        self.completions += 1
+        return await super().acomplete(messages, **kwargs)
+
+
+def test_memory_tier_evicts_the_least_recently_used_entry():
+    cache = OracleCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1 and cache.stats()["memory_entries"] == 2
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "oracle.db")
+    cache = OracleCache(max_entries=1, disk_path=path)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1" and cache.disk_hits == 1
+    cache.close()
+
+    reopened = OracleCache(disk_path=path)
+    assert reopened.stats()["disk_entries"] == 2
+    assert reopened.get("b") == "2" and reopened.disk_hits == 1
+    assert reopened.get("b") == "2" and reopened.disk_hits == 1
+    reopened.close()
+
+
+def test_disk_tier_drops_its_least_recently_accessed_rows(tmp_path):
+    cache = OracleCache(max_entries=1, disk_path=str(tmp_path / "oracle.db"), max_disk_entries=10)
+    for i in range(10):
+        cache.put(f"k{i}", str(i))
+    cache._db.execute("UPDATE oracle_cache SET last_access = 0 WHERE key = 'k0'")
+    cache.put("k10", "10")
+
+    assert cache.stats()["disk_entries"] == 10 and cache.disk_evictions == 1
+    assert cache.get("k0") is None
+    assert cache.get("k1") == "1"
+    cache.close()
+
+
+def test_a_hit_makes_no_provider_call():
+    provider = CountingProvider()
+    soi = SemanticOracleInterface(provider=provider, cache=OracleCache())
+    first = soi.enrich_text_to_ip_attributes(TEXT)
+    calls = provider.completions
+    assert calls == 1
+    assert soi.enrich_text_to_ip_attributes(TEXT) == first
+    assert provider.completions == calls
+
+    async_provider = CountingProvider()
+    async_soi = AsyncSemanticOracleInterface(provider=async_provider, cache=soi.cache)
+    assert asyncio.run(async_soi.enrich_text_to_ip_attributes(TEXT)) == first
+    assert async_provider.completions == 0
+
+
+def test_agents_reuse_enrichments_from_a_disk_cache(tmp_path):
+    path = str(tmp_path / "oracle.db")
+    first_cache = OracleCache(disk_path=path)
+    ConversationalAgent(provider=CountingProvider(), oracle_cache=first_cache).add_to_memory(TEXT)
+    first_cache.close()
+
+    provider = CountingProvider()
+    second_cache = OracleCache(disk_path=path)
+    agent = ConversationalAgent(provider=provider, oracle_cache=second_cache)
+    agent.add_to_memory(TEXT)
+    assert provider.completions == 0
+    assert len(agent.memory_store) == 1
+    second_cache.close()
+
+
+def test_oracle_cache_arguments(tmp_path):
+    parser = argparse.ArgumentParser()
+    add_oracle_cache_arguments(parser)
+    assert build_oracle_cache(parser.parse_args([])) is None
+
+    memory_only = build_oracle_cache(parser.parse_args(["--oracle-cache", "--oracle-cache-entries", "5"]))
+    assert memory_only.max_entries == 5 and memory_only._db is None
+
+    path = str(tmp_path / "oracle.db")
+    on_disk = build_oracle_cache(parser.parse_args(["--oracle-cache", path]))
+    assert on_disk._db is not None
+    on_disk.close()
@@ -0,0 +1,142 @@
+# cognitive_weave_poc/tests/test_persistence.py
+
+import asyncio
+import threading
+
+import pytest
+
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.persistence import PersistentMemoryStore, StoredInsightParticle
+
+
+def _particle(text, **fields):
+    return InsightParticle(core_data=text, situational_imprint=text, **fields)
+
+
+def test_particles_survive_a_reopen_with_lazy_core_data(tmp_path):
+    path = str(tmp_path / "memory.db")
+    store = PersistentMemoryStore(path)
+    first = _particle("first note", resonance_keys=["first"])
+    store.append(first)
+    store.extend([_particle(f"note {i}") for i in range(5)])
+    first.access_frequency = 3
+    store.update(first)
+    store.close()
+
+    reopened = PersistentMemoryStore(path)
+    assert len(reopened) == 6
+    loaded = reopened.get(first.particle_id)
+    assert isinstance(loaded, StoredInsightParticle) and not loaded.core_data_loaded
+    assert loaded.access_frequency == 3 and loaded.resonance_keys == ["first"]
+    assert loaded.core_data == "first note"
+    assert reopened.get(first.particle_id) is loaded
+    assert [ip.core_data for ip in reopened[1:3]] == ["note 0", "note 1"]
+    reopened.close()
+
+
+def test_removed_particles_leave_gap_free_positions(tmp_path):
+    store = PersistentMemoryStore(str(tmp_path / "memory.db"))
+    particles = [_particle(f"note {i}") for i in range(4)]
+    store.extend(particles)
+    store.remove_many([particles[1].particle_id, particles[2].particle_id])
+    assert len(store) == 2
+    assert [ip.particle_id for ip in store] == [particles[0].particle_id, particles[3].particle_id]
+    assert store[-1].particle_id == particles[3].particle_id
+    assert store.get(particles[1].particle_id) is None
+    with pytest.raises(ValueError):
+        store.remove(particles[1].particle_id)
+    store.close()
+
+
+def test_agent_warm_starts_from_durable_memory(tmp_path):
+    from main import ConversationalAgent
+
+    path = str(tmp_path / "agent.db")
+    agent = ConversationalAgent(provider=OfflineProvider(), memory_path=path)
+    for i in range(3):
+        agent.add_to_memory(f"My knee pain {i} gets worse after running uphill on trail {i}.")
+    agent._attempt_ia_synthesis()
+    (aggregate,) = [ip for ip in agent.memory_store if ip.is_aggregate]
+    agent.memory_store.close()
+
+    restarted = ConversationalAgent(provider=OfflineProvider(), memory_path=path)
+    assert len(restarted.memory_store) == 4
+    restarted._ensure_indexes()
+    results = restarted.retrieve_relevant_insights("knee pain after running", top_k=4)
+    assert aggregate.particle_id in {ip.particle_id for ip in results}
+    assert not restarted.consolidation.dirty_clusters()
+    assert all(restarted.lifecycle.is_covered(pid) for pid in aggregate.derived_from_ids)
+    restarted.memory_store.close()
+
+
+def test_retrieval_searches_the_newest_particles_while_indexes_build(tmp_path, monkeypatch):
+    from main import ConversationalAgent
+
+    path = str(tmp_path / "agent.db")
+    agent = ConversationalAgent(provider=OfflineProvider(), memory_path=path)
+    for topic in ("knee pain after running", "landlord contract renewal", "knee brace fitting"):
+        agent.add_to_memory(f"A note about {topic}.")
+    agent.memory_store.close()
+
+    restarted = ConversationalAgent(provider=OfflineProvider(), memory_path=path)
+    restarted.index_build_window = 2
+    release = threading.Event()
+    build = restarted._index_stored_particles
+    monkeypatch.setattr(restarted, "_index_stored_particles", lambda: (release.wait(5), build()))
+    assert not restarted.start_index_build()
+
+    found = restarted.retrieve_relevant_insights("knee", top_k=3)
+    assert [ip.core_data for ip in found] == ["A note about knee brace fitting."]
+    assert not restarted._indexes_built
+
+    release.set()
+    restarted._ensure_indexes()
+    found = restarted.retrieve_relevant_insights("knee", top_k=3, use_vector_recall=False)
+    assert len(found) == 2
+    restarted.memory_store.close()
+
+
+def test_async_turns_wait_for_the_index_build_off_the_event_loop(tmp_path, monkeypatch):
+    from main import AsyncConversationalAgent, TURN_ORDERING_SEQUENTIAL
+
+    path = str(tmp_path / "agent.db")
+
+    async def converse():
+        agent = AsyncConversationalAgent(provider=OfflineProvider(), memory_path=path)
+        await agent.add_to_memory("A note about knee pain after running.")
+        await agent.aclose()
+
+        restarted = AsyncConversationalAgent(provider=OfflineProvider(), memory_path=path)
+        restarted.turn_ordering = TURN_ORDERING_SEQUENTIAL
+        release = threading.Event()
+        build = restarted._index_stored_particles
+        monkeypatch.setattr(restarted, "_index_stored_particles", lambda: (release.wait(5), build()))
+        restarted.start_index_build()
+
+        turn = asyncio.create_task(restarted.chat_turn("My knee still hurts after running."))
+        ticks = 0
+        while not turn.done() and ticks < 20:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 20 and not turn.done()
+        release.set()
+        assert await turn
+        assert restarted._indexes_built and len(restarted.memory_store) == 2
+        await restarted.aclose()
+
+    asyncio.run(converse())
+
+
+def test_deferred_indexing_only_fills_the_store_until_built(tmp_path):
+    from main import ConversationalAgent
+
+    agent = ConversationalAgent(provider=OfflineProvider(), memory_path=str(tmp_path / "bulk.db"), defer_indexing=True)
+    agent.add_particles_bulk([_particle("A note about knee brace fitting.", resonance_keys=["knee"]),
+                              _particle("Gym schedule moved to Friday.", resonance_keys=["gym"])])
+    assert len(agent.memory_store) == 2 and len(agent.keyword_index) == 0
+
+    agent.build_indexes()
+    found = agent.retrieve_relevant_insights("knee", top_k=3, use_vector_recall=False)
+    assert [ip.core_data for ip in found] == ["A note about knee brace fitting."]
+    agent.close()
@@ -0,0 +1,76 @@
+# cognitive_weave_poc/tests/test_providers.py
+
+import asyncio
+
+import pytest
+
+from cognitive_weave.async_semantic_oracle import AsyncSemanticOracleInterface
+from cognitive_weave.embedding_store import OracleEmbedder
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.providers import OpenAICompatibleProvider, RecordReplayProvider, ReplayMissError
+from cognitive_weave.resilience import ResilientProvider, RetryPolicy
+from cognitive_weave.semantic_oracle import SemanticOracleInterface
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Tell me about knee pain"}]
+
+
+def test_record_then_replay_without_the_recorded_provider(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    recorder = RecordReplayProvider(path, inner=OfflineProvider(), mode="record")
+    answer = recorder.complete(MESSAGES, temperature=0.0, max_tokens=32)
+    vectors = recorder.embed(["knee pain"])
+    assert recorder.recorded == 2
+
+    replayer = RecordReplayProvider(path, mode="replay")
+    assert replayer.chat_model == "offline-deterministic"
+    assert replayer.complete(MESSAGES, temperature=0.0, max_tokens=32) == answer
+    assert replayer.embed(["knee pain"]) == vectors
+    assert replayer.hits == 2
+    with pytest.raises(ReplayMissError):
+        replayer.complete(MESSAGES, temperature=0.5, max_tokens=32)
+
+
+def test_mock_endpoint_serves_completions_streams_and_embeddings(mock_openai_server):
+    provider = OpenAICompatibleProvider.from_base_url(mock_openai_server.base_url, chat_model="mock-chat",
+                                                      embedding_model="mock-embed")
+    expected = OfflineProvider().complete(MESSAGES, temperature=0.0, max_tokens=32)
+    assert provider.complete(MESSAGES, temperature=0.0, max_tokens=32) == expected
+    assert "".join(provider.stream_complete(MESSAGES, temperature=0.0, max_tokens=32)) == expected
+    assert len(provider.embed(["a", "b"])[1]) == 256
+    assert [path for path, _ in mock_openai_server.requests] == [
+        "/v1/chat/completions", "/v1/chat/completions", "/v1/embeddings"]
+
+
+def test_resilient_provider_retries_server_errors_from_the_endpoint(mock_openai_server, fresh_deployment_limits):
+    mock_openai_server.fail_next = [503, 500]
+    inner = OpenAICompatibleProvider.from_base_url(mock_openai_server.base_url, chat_model="mock-retry")
+    provider = ResilientProvider(inner, RetryPolicy(max_attempts=3, base_delay=0.0))
+    assert provider.complete(MESSAGES, temperature=0.0, max_tokens=32).startswith("(offline)")
+    assert len(mock_openai_server.requests) == 3
+
+
+def test_agents_converse_against_the_mock_endpoint(mock_openai_server, fresh_deployment_limits):
+    from main import AsyncConversationalAgent, ConversationalAgent
+
+    provider = OpenAICompatibleProvider.from_base_url(mock_openai_server.base_url, chat_model="mock-chat",
+                                                      embedding_model="mock-embed")
+    agent = ConversationalAgent(provider=ResilientProvider(provider))
+    agent.add_to_memory("My knee hurts after running uphill.")
+    assert "1 related memories" in agent.generate_response("What about my knee when running?")
+
+    async def converse():
+        async_agent = AsyncConversationalAgent(provider=ResilientProvider(provider))
+        await async_agent.add_to_memory("My knee hurts after running uphill.")
+        return await async_agent.generate_response("What about my knee when running?")
+
+    assert "1 related memories" in asyncio.run(converse())
+
+
+def test_oracle_embedder_needs_a_blocking_soi():
+    provider = OfflineProvider()
+    with pytest.raises(TypeError):
+        OracleEmbedder(AsyncSemanticOracleInterface(provider=provider))
+
+    embedder = OracleEmbedder(SemanticOracleInterface(provider=provider), dim=len(provider.embed(["x"])[0]))
+    vectors = embedder.embed(["knee pain", "mortgage payment"])
+    assert vectors.shape == (2, embedder.dim)
@@ -0,0 +1,113 @@
+# cognitive_weave_poc/tests/test_resilience.py
+
+import pytest
+
+from cognitive_weave import resilience
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.resilience import (CircuitBreaker, CircuitOpenError, ResilientProvider, RetryPolicy,
+                                        TokenBucket, deployment_guard)
+
+MESSAGES = [{"role": "user", "content": "hello there"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyProvider(OfflineProvider):
+    """Raises the queued errors, one per call, then answers like the OfflineProvider."""
+    def __init__(self, errors=()):
+        super().__init__()
+        self.chat_model = "flaky"
+        self.errors = list(errors)
+        self.calls = 0
+
+    def complete(self, messages, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return super().complete(messages, **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+
+def test_token_bucket_spends_its_burst_then_paces_by_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4.0)
+    assert [bucket.reserve(1) for _ in range(4)] == [0.0] * 4
+    assert bucket.reserve(1) == pytest.approx(0.5)
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    clock.now += 10.0
+    assert bucket.reserve(4) == 0.0
+    bucket.pause(3.0)
+    assert bucket.reserve(0) == pytest.approx(3.0)
+
+
+def test_circuit_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+    assert breaker.allow()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock.now += 30.0
+    assert breaker.allow()  # The single half-open probe
+    assert not breaker.allow()
+    assert breaker.record_failure()  # A failed probe re-opens at once
+    assert not breaker.allow()
+
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_transient_errors_are_retried_and_client_errors_are_not(fresh_deployment_limits):
+    inner = FlakyProvider([StatusError(503), ConnectionError("reset")])
+    provider = ResilientProvider(inner, RetryPolicy(max_attempts=3, base_delay=0.0))
+    assert provider.complete(MESSAGES, temperature=0.0, max_tokens=8).startswith("(offline)")
+    assert inner.calls == 3
+
+    inner.errors, inner.calls = [StatusError(400)], 0
+    with pytest.raises(StatusError):
+        provider.complete(MESSAGES, temperature=0.0, max_tokens=8)
+    assert inner.calls == 1
+
+
+def test_open_circuit_rejects_calls_without_reaching_the_deployment(fresh_deployment_limits):
+    fresh_deployment_limits("flaky", failure_threshold=2, reset_timeout=60.0)
+    inner = FlakyProvider([StatusError(500)] * 5)
+    provider = ResilientProvider(inner, RetryPolicy(max_attempts=5, base_delay=0.0))
+    with pytest.raises(StatusError):
+        provider.complete(MESSAGES, temperature=0.0, max_tokens=8)
+    assert inner.calls == 2
+    with pytest.raises(CircuitOpenError):
+        provider.complete(MESSAGES, temperature=0.0, max_tokens=8)
+    assert inner.calls == 2
+
+
+def test_throttling_pauses_the_shared_deployment_buckets(fresh_deployment_limits, monkeypatch):
+    fresh_deployment_limits("flaky", requests_per_minute=600)
+    sleeps = []
+    monkeypatch.setattr(resilience.time, "sleep", sleeps.append)
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    inner = FlakyProvider([StatusError(429)])
+    provider = ResilientProvider(inner, RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=2.0))
+    provider.complete(MESSAGES, temperature=0.0, max_tokens=8)
+    assert inner.calls == 2 and sleeps[0] == 2.0
+    # Every caller of the deployment now waits out the pause, not only the one that was throttled
+    assert deployment_guard("flaky").reserve(1) > 0.0
@@ -0,0 +1,42 @@
+# cognitive_weave_poc/tests/test_resonance_graph.py
+
+import random
+
+import numpy as np
+
+from cognitive_weave.resonance_graph import EDGE_DERIVED_FROM, EDGE_TEMPORAL_NEXT, ResonanceGraph
+
+
+def _full_csr(graph):
+    """The CSR a stable sort of the whole edge log gives."""
+    src = np.frombuffer(graph._src, dtype=np.int32)
+    order = np.argsort(src, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=graph.node_count))))
+    return indptr, np.frombuffer(graph._dst, dtype=np.int32)[order], np.frombuffer(graph._etype, dtype=np.uint16)[order]
+
+
+def test_incremental_compaction_matches_a_full_rebuild():
+    rng = random.Random(7)
+    graph = ResonanceGraph()
+    for step in range(40):
+        for _ in range(rng.randint(0, 6)):
+            graph.add_edge(f"p{rng.randrange(60)}", f"p{rng.randrange(60)}",
+                           rng.choice([EDGE_DERIVED_FROM, EDGE_TEMPORAL_NEXT, "contradicts"]))
+        graph.add_node(f"lonely{step}")
+        graph._compact()
+
+        indptr, indices, types = _full_csr(graph)
+        assert np.array_equal(graph._indptr, indptr)
+        assert np.array_equal(graph._indices, indices)
+        assert np.array_equal(graph._csr_types, types)
+
+
+def test_neighbors_sees_edges_added_after_a_read():
+    graph = ResonanceGraph()
+    graph.add_edge("ia", "a", EDGE_DERIVED_FROM)
+    assert graph.neighbors("a", [EDGE_DERIVED_FROM]) == [("ia", EDGE_DERIVED_FROM)]
+
+    graph.add_edge("a", "b", EDGE_TEMPORAL_NEXT)
+    graph.add_edge("ia2", "a", EDGE_DERIVED_FROM)
+    assert graph.neighbors("a") == [("ia", EDGE_DERIVED_FROM), ("b", EDGE_TEMPORAL_NEXT), ("ia2", EDGE_DERIVED_FROM)]
+    assert graph.traverse(["b"], max_hops=2) == {"b": 0, "a": 1, "ia": 2, "ia2": 2}
@@ -0,0 +1,83 @@
+# cognitive_weave_poc/tests/test_response_cache.py
+
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.response_cache import ResponseCache, context_signature
+
+QUERY = "What did my physiotherapist recommend for the knee pain after running?"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_normalized_and_similar_queries_hit_within_a_context():
+    cache = ResponseCache()
+    cache.put(QUERY, "ctx", ["ip1"], "Stretch daily.")
+    assert cache.get(QUERY.upper() + "  ", "ctx") == "Stretch daily."
+    assert cache.get("So, " + QUERY, "ctx") == "Stretch daily."
+    assert cache.get("Which restaurants did I like in Lisbon?", "ctx") is None
+    assert cache.get(QUERY, "other-ctx") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["similar_hits"], stats["misses"]) == (2, 1, 2)
+
+
+def test_context_signature_changes_when_a_particle_is_edited():
+    ip = InsightParticle(particle_id="ip1", core_data="knee", situational_imprint="knee pain")
+    before = context_signature("tenant", "model", [ip])
+    assert context_signature("tenant", "model", [ip]) == before
+    assert context_signature("other-tenant", "model", [ip]) != before
+    ip.situational_imprint = "knee pain after running"
+    assert context_signature("tenant", "model", [ip]) != before
+
+
+def test_entries_expire_and_the_least_recently_used_are_evicted():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl_seconds=10.0, clock=clock)
+    cache.put("first question about knees", "a", [], "one")
+    cache.put("second question about budgets", "b", [], "two")
+    assert cache.get("first question about knees", "a") == "one"
+    cache.put("third question about travel", "c", [], "three")
+    assert cache.get("second question about budgets", "b") is None
+    assert cache.evictions == 1
+
+    clock.now += 10.0
+    assert cache.get("first question about knees", "a") is None
+    assert cache.expirations == 1
+
+
+def test_invalidation_drops_every_entry_that_used_a_particle():
+    cache = ResponseCache()
+    cache.put("question one", "a", ["ip1", "ip2"], "one")
+    cache.put("question two", "b", ["ip2"], "two")
+    cache.put("question three", "c", ["ip3"], "three")
+    assert cache.invalidate(["ip2"]) == 2
+    assert len(cache) == 1 and cache.get("question three", "c") == "three"
+
+
+def test_agent_reuses_responses_until_its_memories_change(offline_agent):
+    agent = offline_agent
+    agent.response_cache = ResponseCache()
+    calls = []
+    complete = agent.provider.complete
+
+    def counting_complete(messages, **kwargs):
+        calls.append(messages)
+        return complete(messages, **kwargs)
+
+    agent.provider.complete = counting_complete
+    agent.provider.stream_complete = lambda messages, **kwargs: iter([counting_complete(messages, **kwargs)])
+    agent.add_to_memory("My physiotherapist recommended daily hamstring stretches for my knee.")
+    calls.clear()
+
+    answer = agent.generate_response(QUERY)
+    assert agent.generate_response(QUERY.lower()) == answer
+    assert len(calls) == 1
+
+    agent.add_to_memory("The physiotherapist also said to ice the knee after running.")
+    calls.clear()
+    agent.generate_response(QUERY)
+    assert len(calls) == 1
@@ -0,0 +1,206 @@
+# cognitive_weave_poc/tests/test_server.py
+
+import asyncio
+import hashlib
+import json
+import os
+
+import pytest
+
+from cognitive_weave.offline_provider import OfflineProvider
+from main import ConversationalAgent
+from server import MEMORY_SCOPE_TENANT, AgentServer, InvalidSessionId, SessionManager
+
+KNOWLEDGE = [
+    "Penicillin allergy patients should receive a macrolide antibiotic instead",
+    "Custody hearings require the parenting plan to be filed two weeks ahead",
+]
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _knowledge_file(tmp_path):
+    path = str(tmp_path / "knowledge.db")
+    agent = ConversationalAgent(memory_path=path, provider=OfflineProvider())
+    agent.add_many_to_memory(KNOWLEDGE)
+    agent.close()
+    return path
+
+
+def test_knowledge_memory_is_never_written(tmp_path):
+    knowledge_path = _knowledge_file(tmp_path)
+    before = _digest(knowledge_path)
+
+    async def converse():
+        manager = SessionManager(OfflineProvider(), str(tmp_path / "sessions"), knowledge_path=knowledge_path)
+        manager.knowledge._ensure_indexes()
+        assert manager.knowledge.retrieve_knowledge("which antibiotic for a penicillin allergy", top_k=2)
+        for turn in range(25):
+            await manager.chat("acme", f"s{turn % 3}", "Which antibiotic suits a penicillin allergy?")
+        await manager.close()
+
+    asyncio.run(converse())
+    assert _digest(knowledge_path) == before
+
+    reopened = ConversationalAgent(memory_path=knowledge_path, provider=OfflineProvider(), read_only=True)
+    assert all(ip.access_frequency == 0 and ip.last_access_timestamp is None for ip in reopened.memory_store)
+    reopened.close()
+
+
+def _stored_texts(path):
+    agent = ConversationalAgent(memory_path=path, provider=OfflineProvider(), read_only=True)
+    texts = {ip.core_data for ip in agent.memory_store if not ip.is_aggregate}
+    agent.close()
+    return texts
+
+
+async def _http(port, method, path, payload=None):
+    """One request over a fresh connection; returns (status, body bytes), de-chunking a streamed body."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        data = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            data += chunk[:-2]
+    else:
+        data = await reader.readexactly(int(headers["content-length"]))
+    writer.close()
+    return status, data
+
+
+def test_tenants_and_sessions_get_separate_memories(tmp_path):
+    manager = SessionManager(OfflineProvider(), str(tmp_path))
+
+    async def converse():
+        await manager.chat("acme", "s1", "Our warehouse in Rotterdam ships orders every Monday.")
+        await manager.chat("globex", "s1", "The quarterly audit is scheduled for late November.")
+        await manager.chat("acme", "s2", "The marketing budget was approved yesterday.")
+        await manager.close()
+
+    asyncio.run(converse())
+    acme, globex = manager.memory_path(("acme", "s1")), manager.memory_path(("globex", "s1"))
+    assert acme != globex
+    assert "Our warehouse in Rotterdam ships orders every Monday." in _stored_texts(acme)
+    assert not any("Rotterdam" in text for text in _stored_texts(globex))
+    assert not any("Rotterdam" in text for text in _stored_texts(manager.memory_path(("acme", "s2"))))
+
+    tenant_scoped = SessionManager(OfflineProvider(), str(tmp_path / "tenant"), memory_scope=MEMORY_SCOPE_TENANT)
+    assert tenant_scoped.namespace("acme", "s1") == tenant_scoped.namespace("acme", "s2") != tenant_scoped.namespace("globex", "s1")
+
+
+def test_sessions_are_evicted_and_reloaded_lazily(tmp_path):
+    manager = SessionManager(OfflineProvider(), str(tmp_path), max_active_sessions=2, idle_timeout=60.0)
+
+    async def converse():
+        await manager.chat("acme", "s1", "My physiotherapy appointment moved to Thursday morning.")
+        await manager.chat("acme", "s2", "Second session message about the garden fence.")
+        await manager.chat("acme", "s3", "Third session message about the train timetable.")
+        # The least recently used session went first; its memory stays on disk
+        assert manager.stats()["active_sessions"] == 2
+        assert manager.session_stats("acme", "s1") == {"tenant": "acme", "session": "s1", "loaded": False,
+                                                        "persisted": True}
+
+        # Only sessions idle longer than idle_timeout are swept
+        manager._sessions[("acme", "s2")].last_used -= 120.0
+        await manager.evict_idle()
+        assert manager.session_stats("acme", "s2")["loaded"] is False
+        assert manager.session_stats("acme", "s3")["loaded"] is True
+
+        session = await manager.get("acme", "s1")
+        texts = {ip.core_data for ip in session.agent.memory_store}
+        assert "My physiotherapy appointment moved to Thursday morning." in texts
+        assert manager.session_stats("acme", "s1")["loaded"] is True
+        await manager.close()
+        assert manager.stats()["active_sessions"] == 0
+
+    asyncio.run(converse())
+
+
+def test_concurrent_first_requests_share_one_load(tmp_path):
+    manager = SessionManager(OfflineProvider(), str(tmp_path))
+    loads = []
+    create_agent = manager._create_agent
+
+    def counting_create_agent(key):
+        loads.append(key)
+        return create_agent(key)
+
+    manager._create_agent = counting_create_agent
+
+    async def converse():
+        sessions = await asyncio.gather(*(manager.get("acme", "s1") for _ in range(8)))
+        assert all(session is sessions[0] for session in sessions)
+        responses = await asyncio.gather(*(manager.chat("acme", "s1", f"Note number {i} about the roadmap.")
+                                           for i in range(4)))
+        assert all(responses)
+        assert manager._sessions[("acme", "s1")].turns == 4
+        await manager.close()
+
+    asyncio.run(converse())
+    assert loads == [("acme", "s1")]
+
+
+def test_streamed_turn_is_sent_as_ndjson(tmp_path):
+    manager = SessionManager(OfflineProvider(), str(tmp_path))
+
+    async def converse():
+        server = await asyncio.start_server(AgentServer(manager).handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, body = await _http(port, "POST", "/v1/tenants/acme/sessions/s1/turns",
+                                       {"message": "Remind me what I said about the dentist.", "stream": True})
+            plain_status, plain_body = await _http(port, "POST", "/v1/tenants/acme/sessions/s1/turns",
+                                                   {"message": "And the dentist again?"})
+        finally:
+            server.close()
+            await server.wait_closed()
+            await manager.close()
+        return status, body, plain_status, plain_body
+
+    status, body, plain_status, plain_body = asyncio.run(converse())
+    assert status == 200 and plain_status == 200
+    lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    deltas, final = lines[:-1], lines[-1]
+    assert len(deltas) > 1 and all(set(line) == {"delta"} for line in deltas)
+    assert final == {"done": True, "response": "".join(line["delta"] for line in deltas)}
+    assert json.loads(plain_body)["response"]
+
+
+def test_invalid_ids_are_rejected_before_touching_disk(tmp_path):
+    manager = SessionManager(OfflineProvider(), str(tmp_path / "sessions"))
+    for tenant, session_id in (("..", "s1"), ("acme", "../../etc"), ("acme", ".hidden"), ("", "s1"), ("acme", "x" * 129)):
+        with pytest.raises(InvalidSessionId):
+            manager.namespace(tenant, session_id)
+
+    async def converse():
+        server = await asyncio.start_server(AgentServer(manager).handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await _http(port, "POST", "/v1/tenants/acme/sessions/bad%20id/turns",
+                                {"message": "hello", "stream": stream}) for stream in (False, True)]
+        finally:
+            server.close()
+            await server.wait_closed()
+            await manager.close()
+
+    for status, body in asyncio.run(converse()):
+        assert status == 400 and "invalid" in json.loads(body)["error"]
+    assert os.listdir(str(tmp_path / "sessions")) == []
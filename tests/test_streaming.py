@@ -0,0 +1,115 @@
+# cognitive_weave_poc/tests/test_streaming.py
+
+import asyncio
+import time
+
+from cognitive_weave.offline_provider import OfflineProvider
+from cognitive_weave.response_cache import ResponseCache
+from cognitive_weave.streaming import AsyncResponseStream, ResponseStream
+from main import AsyncConversationalAgent, TURN_ORDERING_SEQUENTIAL
+
+DELTAS = ["Stretch ", "", "daily ", "and ", "ice ", "the knee."]
+
+
+class CountingProvider(OfflineProvider):
+    """OfflineProvider that counts streamed completions."""
+    def __init__(self):
+        super().__init__()
+        self.streams = 0
+
+    def stream_complete(self, messages, **kwargs):
+        self.streams += 1
+        return super().stream_complete(messages, **kwargs)
+
+    def astream_complete(self, messages, **kwargs):
+        self.streams += 1
+        return super().astream_complete(messages, **kwargs)
+
+
+def _slow(deltas, delay=0.01):
+    for delta in deltas:
+        time.sleep(delay)
+        yield delta
+
+
+def test_response_stream_yields_deltas_in_order_and_times_them():
+    completed = []
+    stream = ResponseStream(_slow(DELTAS), on_complete=completed.append)
+    assert stream.text == "" and not stream.done
+
+    received = list(stream)
+    assert received == [delta for delta in DELTAS if delta]
+    assert stream.done and stream.text == "Stretch daily and ice the knee."
+    assert completed == [stream]
+    assert 0.01 <= stream.time_to_first_token < stream.total_time
+
+
+def test_async_response_stream_yields_deltas_in_order_and_times_them():
+    async def deltas():
+        for delta in DELTAS:
+            await asyncio.sleep(0.01)
+            yield delta
+
+    async def consume():
+        completed = []
+        stream = AsyncResponseStream(deltas(), on_complete=completed.append)
+        return [delta async for delta in stream], stream, completed
+
+    received, stream, completed = asyncio.run(consume())
+    assert received == [delta for delta in DELTAS if delta]
+    assert stream.text == "Stretch daily and ice the knee." and completed == [stream]
+    assert 0.01 <= stream.time_to_first_token < stream.total_time
+
+
+def test_streamed_turn_records_its_timing(offline_agent):
+    offline_agent.add_to_memory("My physiotherapist recommended daily stretches for the knee.")
+    deltas = list(offline_agent.chat_turn_stream("What did my physiotherapist recommend for the knee?"))
+    assert len(deltas) > 1
+    timing = offline_agent.turn_timings[-1]
+    assert timing["streamed"] and timing["turn"] == 1
+    assert 0 < timing["time_to_first_token"] <= timing["total_time"]
+    assert offline_agent.turn_count == 1
+
+
+def test_cached_response_is_replayed_without_a_provider_call(offline_agent):
+    provider = CountingProvider()
+    offline_agent.provider = provider
+    offline_agent.response_cache = ResponseCache()
+    offline_agent.add_to_memory("My physiotherapist recommended daily stretches for the knee.")
+    query = "What did my physiotherapist recommend for the knee?"
+
+    first = offline_agent.generate_response_stream(query)
+    text = "".join(first)
+    replay = offline_agent.generate_response_stream(query)
+    assert list(replay) == [text] and replay.text == text
+    assert provider.streams == 1
+    assert [timing["streamed"] for timing in offline_agent.turn_timings] == [True, True]
+
+
+def test_a_stream_closed_early_still_completes_the_turn(offline_agent):
+    offline_agent.ingest_agent_responses = True
+    offline_agent.ia_synthesis_interval = 100
+    turn = offline_agent.chat_turn_stream("My physiotherapist recommended daily stretches for the knee.")
+    next(turn)
+    turn.close()
+    assert offline_agent.turn_count == 1
+    # The user's IP is stored; the truncated response is not
+    assert [ip.core_data for ip in offline_agent.memory_store] == [
+        "My physiotherapist recommended daily stretches for the knee."]
+
+
+def test_async_stream_closed_early_still_completes_the_turn():
+    async def converse():
+        agent = AsyncConversationalAgent(provider=CountingProvider())
+        agent.ingest_agent_responses = True
+        turn = agent.chat_turn_stream("My physiotherapist recommended daily stretches for the knee.")
+        await turn.__anext__()
+        await turn.aclose()
+        texts = [ip.core_data for ip in agent.memory_store]
+        await agent.aclose()
+        return agent.turn_count, texts
+
+    turn_count, texts = asyncio.run(converse())
+    # Pipelined ingestion of the user's IP is awaited when the turn completes
+    assert turn_count == 1
+    assert texts == ["My physiotherapist recommended daily stretches for the knee."]
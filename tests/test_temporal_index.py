@@ -0,0 +1,107 @@
+# cognitive_weave_poc/tests/test_temporal_index.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from cognitive_weave.data_structures import InsightParticle
+from cognitive_weave.temporal_index import TemporalIndex, to_epoch
+
+MONDAY = datetime(2024, 6, 3, 9, 0)
+
+
+def _particle(particle_id, at, keys=(), imprint=None, **fields):
+    return InsightParticle(particle_id=particle_id, core_data=imprint or particle_id, resonance_keys=list(keys),
+                           situational_imprint=imprint, creation_timestamp=at.isoformat(), **fields)
+
+
+def _index(*particles):
+    index = TemporalIndex()
+    for ip in particles:
+        index.add(ip)
+    return index
+
+
+def test_range_is_half_open_and_accepts_any_time_point():
+    # Added out of order, as an imported transcript would be
+    index = _index(_particle("tue", MONDAY + timedelta(days=1)), _particle("mon", MONDAY),
+                   _particle("wed", MONDAY + timedelta(days=2)), _particle("mon-late", MONDAY + timedelta(hours=8)))
+
+    assert index.range() == ["mon", "mon-late", "tue", "wed"]
+    assert index.range(MONDAY, MONDAY + timedelta(days=1)) == ["mon", "mon-late"]
+    assert index.range((MONDAY + timedelta(days=1)).isoformat(), None) == ["tue", "wed"]
+    assert index.range(None, to_epoch(MONDAY + timedelta(days=2))) == ["mon", "mon-late", "tue"]
+    assert index.range(MONDAY + timedelta(days=3)) == []
+
+
+def test_window_latest_and_removal():
+    index = _index(*(_particle(f"h{hour}", MONDAY + timedelta(hours=hour)) for hour in range(6)))
+    now = MONDAY + timedelta(hours=4)
+    assert index.window(2 * 3600, now=now) == ["h2", "h3", "h4"]
+    assert index.latest(2) == ["h5", "h4"]
+    assert index.latest(3, before=now) == ["h3", "h2", "h1"]
+
+    index.remove("h4")
+    index.add(_particle("h1", MONDAY + timedelta(hours=10)))  # re-adding moves a particle
+    assert index.range() == ["h0", "h2", "h3", "h5", "h1"]
+    assert "h4" not in index and len(index) == 5
+    assert index.epoch_of("h1") == to_epoch(MONDAY + timedelta(hours=10))
+
+
+def test_refreshed_aggregates_sit_at_their_last_refresh():
+    aggregate = _particle("ia", MONDAY, is_aggregate=True,
+                          modification_timestamp=(MONDAY + timedelta(days=5)).isoformat())
+    index = _index(aggregate, _particle("ip", MONDAY + timedelta(days=1)))
+    assert index.latest(1) == ["ia"]
+
+
+def test_recency_decay_halves_every_half_life():
+    index = _index(_particle("now", MONDAY), _particle("day", MONDAY - timedelta(days=1)),
+                   _particle("two-days", MONDAY - timedelta(days=2)))
+    decay = index.recency_decay(["now", "day", "two-days", "unknown"], half_life_seconds=86400.0, now=MONDAY)
+    assert decay.tolist() == pytest.approx([1.0, 0.5, 0.25, 1.0])
+
+
+def _knee_week(agent):
+    agent.add_particles_bulk([
+        _particle("knee-mon", MONDAY, keys=["knee"], imprint="Knee pain after running"),
+        _particle("gym-tue", MONDAY + timedelta(days=1), keys=["gym"], imprint="Gym schedule moved"),
+        _particle("knee-tue", MONDAY + timedelta(days=1, hours=2), keys=["knee"], imprint="Knee brace fitting"),
+        _particle("diet-tue", MONDAY + timedelta(days=1, hours=3), keys=["diet"], imprint="New diet plan"),
+        _particle("knee-wed", MONDAY + timedelta(days=2), keys=["knee"], imprint="Knee physiotherapy booked"),
+    ])
+
+
+def test_retrieval_is_limited_to_the_time_range(offline_agent):
+    _knee_week(offline_agent)
+    tuesday = (MONDAY + timedelta(days=1), MONDAY + timedelta(days=2))
+
+    found = offline_agent.retrieve_relevant_insights("knee", top_k=3, time_range=tuesday)
+    # The keyword hit of that day first, then its newest other particles
+    assert [ip.particle_id for ip in found] == ["knee-tue", "diet-tue", "gym-tue"]
+
+    found = offline_agent.retrieve_relevant_insights("knee", top_k=5, time_range=(MONDAY + timedelta(days=1), None))
+    assert [ip.particle_id for ip in found][:2] == ["knee-wed", "knee-tue"]
+    assert "knee-mon" not in {ip.particle_id for ip in found}
+    assert offline_agent.retrieve_relevant_insights("knee", time_range=(MONDAY + timedelta(days=7), None)) == []
+
+
+def test_recency_weight_blends_keyword_scores_with_age(offline_agent):
+    # Recency is measured against the current time, as particles are stamped with utcnow()
+    now = datetime.utcnow()
+    offline_agent.add_particles_bulk([
+        _particle("old", now - timedelta(days=30), keys=["knee", "physiotherapy"],
+                  imprint="Knee physiotherapy exercises", signifiers=["knee"]),
+        _particle("new", now - timedelta(hours=1), keys=["schedule"], imprint="Knee check-up next week"),
+    ])
+    scores = offline_agent.keyword_index.score({"knee"})
+    assert scores["old"] > scores["new"]
+
+    def top():
+        return [ip.particle_id for ip, _ in offline_agent._temporal_keyword_search({"knee"}, 2, None)]
+
+    assert top() == ["old", "new"]
+    offline_agent.recency_weight = 0.9
+    offline_agent.recency_half_life_hours = 24
+    assert top() == ["new", "old"]
+    assert offline_agent.retrieve_relevant_insights("knee", top_k=1, use_vector_recall=False)[0].particle_id == "new"